@@ -0,0 +1,39 @@
+"""
+Measures how long it takes a fresh Python process to import `cface`, compared with importing the
+plotting and DataFrame dependencies it loads lazily.
+
+Usage:
+    python bench_import.py [repeats]
+"""
+import os
+import subprocess
+import sys
+import time
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+STATEMENTS = {
+    'python': 'pass',
+    'numpy': 'import numpy',
+    'cface': 'import cface',
+    'cface + FaceBatch': 'import cface, face_batch',
+    'matplotlib + pandas': 'import matplotlib.patches, pandas',
+    'cface + plotting': 'import cface, matplotlib.patches, pandas',
+}
+
+
+def best_time(statement, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', statement], cwd=SRC, check=True)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+if __name__ == '__main__':
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    print(f'{"import":>22} {"time":>9}')
+    for name, statement in STATEMENTS.items():
+        print(f'{name:>22} {best_time(statement, repeats) * 1000:7.1f}ms')
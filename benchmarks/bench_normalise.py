@@ -0,0 +1,55 @@
+"""
+Compares `CFace.normalise_df` against the previous per-cell normalisation path, which called
+`CFace._normalise_value` once per cell through `pandas.Series.apply`.
+
+Usage:
+    python bench_normalise.py [rows] [columns]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+from cface import CFace
+
+
+def normalise_df_per_cell(df):
+    '''
+    The per-cell normalisation path that `CFace.normalise_df` used to take.
+    '''
+    normalised_df = df.copy()
+    for column_name in normalised_df:
+        column = normalised_df[column_name]
+        old_min = column.min()
+        old_range = column.max() - old_min
+        normalised_df[column_name] = column.apply(lambda x: CFace._normalise_value(x, old_min, old_range))
+    return normalised_df
+
+
+def best_of(function, df, repeats=3):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = function(df)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+if __name__ == '__main__':
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    columns = int(sys.argv[2]) if len(sys.argv) > 2 else 15
+
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(size=(rows, columns)), columns=[f'col{i}' for i in range(columns)])
+
+    per_cell_time, per_cell_df = best_of(normalise_df_per_cell, df)
+    vectorised_time, (vectorised_df, _) = best_of(CFace.normalise_df, df)
+
+    assert np.allclose(per_cell_df.to_numpy(), vectorised_df.to_numpy())
+    print(f'{rows} rows x {columns} columns')
+    print(f'per-cell:   {per_cell_time:8.3f} s')
+    print(f'vectorised: {vectorised_time:8.3f} s')
+    print(f'speedup:    {per_cell_time / vectorised_time:8.1f}x')
@@ -0,0 +1,30 @@
+"""
+Measures the throughput of `render_pages` with an increasing number of worker processes.
+
+Usage:
+    python bench_pages.py [faces] [max_processes]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+from face_render import render_pages
+
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    max_processes = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+
+    features = np.random.default_rng(0).random((count, 15))
+
+    print(f'{"processes":>9} {"time":>9} {"faces/s":>9}')
+    for processes in range(1, max_processes + 1):
+        with tempfile.TemporaryDirectory() as directory:
+            start = time.perf_counter()
+            render_pages(features, directory, processes=processes)
+            elapsed = time.perf_counter() - start
+        print(f'{processes:9d} {elapsed:8.2f}s {count / elapsed:9.1f}')
@@ -0,0 +1,26 @@
+"""
+Measures the throughput of the NumPy face rasterizer at several thumbnail sizes.
+
+Usage:
+    python bench_raster.py [faces]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+from face_raster import rasterize
+
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    features = np.random.default_rng(0).random((count, 15))
+
+    print(f'{"size":>6} {"time":>9} {"faces/s":>9}')
+    for size in [16, 32, 64]:
+        start = time.perf_counter()
+        rasterize(features, size=size)
+        elapsed = time.perf_counter() - start
+        print(f'{size:6d} {elapsed:8.3f}s {count / elapsed:9.1f}')
@@ -0,0 +1,53 @@
+"""
+Compares drawing a grid of Chernoff Faces with one Axes and nine artists per face (`CFace.plot`)
+against drawing the same grid onto a single Axes with one collection per face part (`plot_face_grid`).
+
+Usage:
+    python bench_render.py [faces ...]
+"""
+import os
+import sys
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+from cface import CFace
+from face_batch import FaceBatch
+from face_collections import plot_face_grid
+
+
+def render_per_face(features):
+    ncols = int(np.ceil(np.sqrt(len(features))))
+    fig = plt.figure(figsize=(10, 10))
+    for i, row in enumerate(features):
+        ax = fig.add_subplot(ncols, ncols, i+1, aspect='equal')
+        CFace(**dict(zip(CFace.feature_ranges, row))).plot(ax)
+    fig.canvas.draw()
+    plt.close(fig)
+
+
+def render_collections(features):
+    fig, ax = plt.subplots(figsize=(10, 10))
+    plot_face_grid(ax, FaceBatch(features, CFace.feature_ranges))
+    fig.canvas.draw()
+    plt.close(fig)
+
+
+def timed(function, features):
+    start = time.perf_counter()
+    function(features)
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    counts = [int(count) for count in sys.argv[1:]] or [25, 100, 400]
+    rng = np.random.default_rng(0)
+
+    print(f'{"faces":>8} {"per-face":>10} {"collections":>12}')
+    for count in counts:
+        features = rng.random((count, len(CFace.feature_ranges)))
+        print(f'{count:8d} {timed(render_per_face, features):9.3f}s {timed(render_collections, features):11.3f}s')
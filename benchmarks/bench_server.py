@@ -0,0 +1,99 @@
+"""
+Load tests the face rendering service (`src/face_server.py`): concurrent clients, each on a keep-alive
+connection, send render requests for a mix of repeated and unique faces, and the throughput and latency
+percentiles are reported. Start the server first, or pass --start to run one in a subprocess.
+
+Usage:
+    python bench_server.py [--host 127.0.0.1] [--port 8765] [--requests 1000] [--concurrency 16]
+                           [--unique 100] [--format png] [--start] [--processes N]
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+SERVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'face_server.py')
+
+async def client(host, port, payloads, latencies, statuses):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for payload in payloads:
+            body = json.dumps(payload).encode('utf-8')
+            start = time.perf_counter()
+            writer.write(f'POST /render HTTP/1.1\r\nHost: {host}\r\nContent-Length: {len(body)}\r\n\r\n'
+                         .encode('latin-1') + body)
+            await writer.drain()
+            head = (await reader.readuntil(b'\r\n\r\n')).decode('latin-1').split('\r\n')
+            length = next(int(line.split(':', 1)[1]) for line in head if line.lower().startswith('content-length'))
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+            statuses.append(int(head[0].split(' ')[1]))
+    finally:
+        writer.close()
+
+async def load_test(host, port, requests, concurrency, unique, image_format):
+    rng = np.random.default_rng(0)
+    faces = rng.random((unique, 15)).round(3).tolist()
+    payloads = [{'features': faces[i], 'format': image_format} for i in rng.integers(unique, size=requests)]
+    latencies = []
+    statuses = []
+
+    start = time.perf_counter()
+    await asyncio.gather(*[client(host, port, payloads[i::concurrency], latencies, statuses)
+                           for i in range(concurrency)])
+    elapsed = time.perf_counter() - start
+
+    latencies = np.array(latencies) * 1000
+    print(f'{requests} requests ({unique} unique faces, {image_format}) from {concurrency} connections '
+          f'in {elapsed:.3f}s: {requests / elapsed:.1f} requests/s')
+    print(f'latency p50 {np.percentile(latencies, 50):.1f}ms, p95 {np.percentile(latencies, 95):.1f}ms, '
+          f'p99 {np.percentile(latencies, 99):.1f}ms, max {latencies.max():.1f}ms')
+    errors = sum(status != 200 for status in statuses)
+    if errors:
+        print(f'{errors} requests failed')
+
+async def wait_for_server(host, port, timeout=60):
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+            writer.close()
+            return
+        except OSError:
+            if time.perf_counter() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--unique', type=int, default=100, help='number of distinct faces requested')
+    parser.add_argument('--format', default='png', choices=['png', 'svg'])
+    parser.add_argument('--start', action='store_true', help='start a server in a subprocess')
+    parser.add_argument('--processes', type=int, help='worker processes of a started server')
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    args = parse_args(None)
+    server = None
+    if args.start:
+        command = [sys.executable, SERVER, '--host', args.host, '--port', str(args.port)]
+        if args.processes:
+            command += ['--processes', str(args.processes)]
+        server = subprocess.Popen(command)
+    try:
+        asyncio.run(wait_for_server(args.host, args.port))
+        asyncio.run(load_test(args.host, args.port, args.requests, args.concurrency, args.unique, args.format))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
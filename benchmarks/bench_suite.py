@@ -0,0 +1,263 @@
+"""
+Benchmarks each stage of the Chernoff Face pipeline on synthetic data, reporting wall time, faces per
+second and peak memory (measured with tracemalloc in a separate run, so that it doesn't slow the timed
+run). Results can be saved as JSON and compared against an earlier run to flag regressions.
+
+Usage:
+    python bench_suite.py [--rows 10 1000 ...] [--columns 15 200 ...] [--stages normalise_df ...]
+                          [--output results.json] [--compare baseline.json] [--threshold 0.2]
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import matplotlib
+matplotlib.use('Agg')
+import numpy as np
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+from cface import CFace
+from cface_array import CFaceArray
+from face_batch import FaceBatch
+from face_collections import cface_scatter, plot_face_grid
+from face_render import render_pdf
+
+DEFAULT_ROWS = [10, 1_000, 100_000, 1_000_000]
+DEFAULT_COLUMNS = [15, 200]
+DEFAULT_MAX_CELLS = 20_000_000
+
+
+def make_df(rows, columns, seed=0):
+    '''
+    Synthetic data: `columns` numeric columns of normally distributed values, plus one label column.
+    '''
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(rng.normal(size=(rows, columns)), columns=[f'col{i}' for i in range(columns)])
+    df['label'] = 'row'
+    return df
+
+
+def setup_raw(df):
+    return (df,)
+
+
+def setup_copy(df):
+    # For stages that modify the DataFrame, so that later stages see the original
+    return (df.copy(),)
+
+
+def setup_normalised(df):
+    return CFace.normalise_df(df)
+
+
+def setup_features(df):
+    normalised_df, feature_map = CFace.normalise_df(df)
+    return (CFaceArray.from_df(normalised_df, feature_map).features,)
+
+
+def stage_normalise_df(df):
+    CFace.normalise_df(df)
+
+
+def stage_normalise_df_quantile(df):
+    CFace.normalise_df(df, mode='quantile')
+
+
+def stage_normalise_df_inplace(df):
+    CFace.normalise_df(df, inplace=True)
+
+
+def stage_normalise_df_mapped_float32(df):
+    CFace.normalise_df(df, mapped_only=True, dtype=np.float32)
+
+
+def stage_create_cface_from_row(normalised_df, feature_map):
+    normalised_df.apply(CFace.create_cface_from_row, axis=1, feature_map=feature_map)
+
+
+def stage_cface_init(features):
+    for row in features.tolist():
+        CFace(**dict(zip(CFace.feature_ranges, row)))
+
+
+def stage_cface_array(normalised_df, feature_map):
+    CFaceArray.from_df(normalised_df, feature_map)
+
+
+def stage_face_batch(features):
+    FaceBatch(features, CFace.feature_ranges)
+
+
+def stage_plot(features):
+    ncols = int(np.ceil(np.sqrt(len(features))))
+    fig = Figure(figsize=(10, 10))
+    canvas = FigureCanvasAgg(fig)
+    for i, row in enumerate(features.tolist()):
+        ax = fig.add_subplot(ncols, ncols, i+1, aspect='equal')
+        CFace(**dict(zip(CFace.feature_ranges, row))).plot(ax)
+    canvas.draw()
+
+
+def stage_plot_face_grid(features):
+    fig = Figure(figsize=(10, 10))
+    canvas = FigureCanvasAgg(fig)
+    plot_face_grid(fig.add_subplot(), FaceBatch(features, CFace.feature_ranges))
+    canvas.draw()
+
+
+def stage_cface_scatter(features):
+    fig = Figure(figsize=(10, 10))
+    canvas = FigureCanvasAgg(fig)
+    positions = np.random.default_rng(0).normal(size=(2, len(features)))
+    cface_scatter(fig.add_subplot(), positions[0], positions[1], features, size=12)
+    canvas.draw()
+
+
+def stage_render_pdf(features):
+    # Peak memory should not grow with the number of rows, as one page is held at a time
+    render_pdf(features, os.devnull)
+
+
+# Each stage: (setup, function, maximum rows). Setup is not timed.
+STAGES = {
+    'normalise_df': (setup_raw, stage_normalise_df, None),
+    'normalise_df_quantile': (setup_raw, stage_normalise_df_quantile, None),
+    'normalise_df_inplace': (setup_copy, stage_normalise_df_inplace, None),
+    'normalise_df_mapped_float32': (setup_raw, stage_normalise_df_mapped_float32, None),
+    'create_cface_from_row': (setup_normalised, stage_create_cface_from_row, 100_000),
+    'cface_init': (setup_features, stage_cface_init, 100_000),
+    'cface_array': (setup_normalised, stage_cface_array, None),
+    'face_batch': (setup_features, stage_face_batch, None),
+    'plot': (setup_features, stage_plot, 400),
+    'plot_face_grid': (setup_features, stage_plot_face_grid, 100_000),
+    'cface_scatter': (setup_features, stage_cface_scatter, 100_000),
+    'render_pdf': (setup_features, stage_render_pdf, 1_000),
+}
+
+
+def measure(function, args, repeats):
+    '''
+    Returns the best wall time of `repeats` runs, and the peak memory allocated during one further run.
+    '''
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function(*args)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    function(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return min(timings), peak
+
+
+def run(stages, rows_list, columns_list, repeats, max_cells):
+    results = []
+    for columns in columns_list:
+        for rows in rows_list:
+            if rows * columns > max_cells:
+                print(f'skipping {rows} rows x {columns} columns (more than {max_cells} cells)', file=sys.stderr)
+                continue
+            df = make_df(rows, columns)
+            for stage in stages:
+                setup, function, max_rows = STAGES[stage]
+                if max_rows is not None and rows > max_rows:
+                    continue
+                wall_time, peak_memory = measure(function, setup(df), repeats)
+                result = {
+                    'stage': stage,
+                    'rows': rows,
+                    'columns': columns,
+                    'wall_time': wall_time,
+                    'faces_per_second': rows / wall_time if wall_time else None,
+                    'peak_memory': peak_memory
+                }
+                results.append(result)
+                print(format_result(result))
+    return results
+
+
+def format_result(result):
+    return (f'{result["stage"]:>22} {result["rows"]:>9} rows {result["columns"]:>4} cols '
+            f'{result["wall_time"]:10.4f}s {result["faces_per_second"] or 0:14.1f} faces/s '
+            f'{result["peak_memory"] / 2**20:10.1f} MiB')
+
+
+def compare(results, baseline, threshold):
+    '''
+    Compares results against a baseline run, returning the results that are slower (or use more peak
+    memory) than the baseline by more than `threshold` (a fraction, eg. 0.2 for 20%).
+    '''
+    baseline_results = {(result['stage'], result['rows'], result['columns']): result for result in baseline}
+    regressions = []
+    for result in results:
+        previous = baseline_results.get((result['stage'], result['rows'], result['columns']))
+        if previous is None:
+            continue
+        for metric in ['wall_time', 'peak_memory']:
+            if previous[metric] and result[metric] > previous[metric] * (1 + threshold):
+                regressions.append({
+                    'stage': result['stage'],
+                    'rows': result['rows'],
+                    'columns': result['columns'],
+                    'metric': metric,
+                    'baseline': previous[metric],
+                    'current': result[metric],
+                    'change': result[metric] / previous[metric] - 1
+                })
+    return regressions
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=DEFAULT_ROWS)
+    parser.add_argument('--columns', type=int, nargs='+', default=DEFAULT_COLUMNS)
+    parser.add_argument('--stages', nargs='+', choices=list(STAGES), default=list(STAGES))
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--max-cells', type=int, default=DEFAULT_MAX_CELLS,
+                        help='skip sizes with more than this many rows x columns')
+    parser.add_argument('--output', help='save results to this JSON file')
+    parser.add_argument('--compare', help='compare results against this JSON file from an earlier run')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='fractional slowdown (or memory increase) that counts as a regression')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = run(args.stages, args.rows, args.columns, args.repeats, args.max_cells)
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump({
+                'python': platform.python_version(),
+                'numpy': np.__version__,
+                'pandas': pd.__version__,
+                'matplotlib': matplotlib.__version__,
+                'results': results
+            }, output, indent=2)
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)['results']
+        regressions = compare(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f'REGRESSION {regression["stage"]} {regression["rows"]} rows {regression["columns"]} cols: '
+                  f'{regression["metric"]} {regression["baseline"]:.4g} -> {regression["current"]:.4g} '
+                  f'({regression["change"]:+.0%})')
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,42 @@
+"""
+Measures building a deep zoom tile pyramid of Chernoff Faces: the time to draw the detailed levels and to
+average the levels below them, and the time to resume a complete pyramid.
+
+Usage:
+    python bench_tiles.py [faces] [processes]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+from face_tiles import FaceTiles
+
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    processes = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    features = np.random.default_rng(0).random((count, 15))
+
+    with tempfile.TemporaryDirectory() as directory:
+        tiles = FaceTiles(features, directory)
+        detailed = range(tiles.max_zoom, tiles.max_zoom - tiles.detail_levels, -1)
+        print(f'{count} faces, {tiles.max_zoom + 1} levels, '
+              f'{sum(len(tiles.level(z)) for z in range(tiles.max_zoom + 1))} tiles')
+
+        start = time.perf_counter()
+        drawn = tiles.build(min_zoom=max(min(detailed), 0), processes=processes)
+        elapsed = time.perf_counter() - start
+        print(f'drawn    {drawn:7d} tiles {elapsed:8.3f}s {drawn / elapsed:9.1f} tiles/s')
+
+        start = time.perf_counter()
+        averaged = tiles.build(processes=processes)
+        elapsed = time.perf_counter() - start
+        print(f'averaged {averaged:7d} tiles {elapsed:8.3f}s {averaged / max(elapsed, 1e-9):9.1f} tiles/s')
+
+        start = time.perf_counter()
+        FaceTiles(features, directory).build(processes=processes)
+        print(f'resume (nothing to do) {time.perf_counter() - start:.3f}s')
@@ -3,10 +3,13 @@
 face to a supplied `Axes`. Static helper methods allow for the normalisation of a `pandas.DataFrame`
 to prepare it for use in Chernoff Face creation, and the creation of a Chernoff Face when supplied
 with a row from a normalised DataFrame.
+
+Importing this module only needs NumPy: matplotlib and pandas are imported the first time a face is
+plotted or a DataFrame is normalised.
 """
-import math
-import matplotlib
-from pandas.api.types import is_numeric_dtype
+import numpy as np
+
+from face_profile import instrumented
 
 class CFace():
     '''
@@ -37,6 +40,8 @@ class CFace():
     look weird.)
     '''
 
+    __slots__ = ('features',)
+
     feature_ranges = {
         'nose_width': {
             'min': 0.01,
@@ -173,7 +178,8 @@ class CFace():
                 raise ValueError(f'{feature} value {value} must be within the range 0 to 1')
 
     @staticmethod
-    def normalise_df(df):
+    @instrumented('normalise_df')
+    def normalise_df(df, mode='minmax', quantiles=(0.01, 0.99), inplace=False, mapped_only=False, dtype=np.float64):
         '''
         Normalises a `pandas.DataFrame` and returns a mapping between Chernoff Face features and
         and column names in the normalised DataFrame.
@@ -188,6 +194,16 @@ class CFace():
         normalised columns than features, then feature_map will only contain mappings to the first
         columns that were normalised.
 
+        By default each column is scaled between its minimum and maximum, so a single outlier can squash the
+        rest of a column into a narrow band of faces. The 'quantile' mode scales between two quantiles of
+        each column instead (clipping values outside them), and the 'rank' mode replaces each value with
+        its rank within the column. Both estimate quantiles with a `QuantileSketch`.
+
+        To keep the column ranges, eg. to normalise new rows consistently, use `FaceNormaliser`.
+
+        By default the whole DataFrame is copied, which doubles peak memory on wide DataFrames. To avoid that,
+        normalise in place, return only the columns mapped to features, and/or write float32 columns.
+
         All columns that can be normalised will be normalised, allowing you to edit feature_map to
         adjust the mappings manually. Multiple features can be mapped to the same column name. A complete
         feature_map looks like this:
@@ -214,37 +230,29 @@ class CFace():
 
         Parameters:
             df (`pandas.DataFrame`): A DataFrame of data to be normalised.
+            mode (str): default: 'minmax'
+                How to normalise each column: 'minmax', 'quantile' or 'rank'.
+            quantiles (tuple): default: (0.01, 0.99)
+                The lower and upper quantiles used in 'quantile' mode.
+            inplace (bool): default: False
+                Whether to normalise the columns of `df` itself, rather than a copy.
+            mapped_only (bool): default: False
+                Whether to return only the columns in feature_map, rather than every column.
+            dtype (`numpy.dtype`): default: float64
+                The dtype of the normalised columns, eg. float32 to halve their memory.
 
         Returns:
-            df (`pandas.DataFrame`): A normalised DataFrame.
+            df (`pandas.DataFrame`): A normalised DataFrame (`df` itself, if normalised in place).
             feature_map (dict): A mapping between Chernoff Face features and columns in the DataFrame.
         '''
-        normalised_df = df.copy()
-
-        feature_list = list(reversed(CFace.feature_ranges.keys()))
-        feature_map = {}
-
-        for column_name in normalised_df:
-            column = normalised_df[column_name]
-
-            # If the column is not numeric, ignore it
-            if not is_numeric_dtype(column):
-                continue
+        from face_normaliser import FaceNormaliser
 
-            #  Normalise the column, according to the range of the column
-            old_max = column.max()
-            old_min = column.min()
-            old_range = old_max - old_min
-
-            normalised_df[column_name] = column.apply(lambda x: CFace._normalise_value(x, old_min, old_range))
-
-            # Map the normalised column to the next available feature
-            if feature_list:
-                feature_map[feature_list.pop()] = column_name
-
-        return normalised_df, feature_map
+        normaliser = FaceNormaliser(clip=False, mode=mode, quantiles=quantiles)
+        normalised_df = normaliser.fit_transform(df, inplace=inplace, mapped_only=mapped_only, dtype=dtype)
+        return normalised_df, normaliser.feature_map
 
     @staticmethod
+    @instrumented('create_cface_from_row')
     def create_cface_from_row(row, feature_map):
         '''
         Creates a Chernoff Face based on a (normalised) dataframe row and a feature map defining
@@ -274,17 +282,40 @@ class CFace():
                      eyebrow_height = CFace._get_feature_from_row(row, 'eyebrow_height', feature_map))
 
 
-    def plot(self, ax=None, name=None):
+    def plot(self, ax=None, name=None, cache=None):
         '''
         Plots the Chernoff Face on the supplied axes, with a label set to the supplied name. 
 
         Parameters:
             axes (axes): The axes on which to plot the face.
             name (str): The label to add to the face.
+            cache (`GeometryCache`): An optional cache of face geometry, to avoid recomputing the
+                geometry of faces that are plotted repeatedly.
 
         Returns:
             ax (axes): The axes containing the plotted face.
         '''
+        self.draw(ax, name, cache)
+        return ax
+
+    def draw(self, ax, name=None, cache=None, animated=False):
+        '''
+        Plots the Chernoff Face on the supplied axes, as `plot` does, but returns a handle to the artists
+        of the face. The handle's `update` method changes the features of the face in place, which is much
+        faster than clearing the axes and plotting a new face (eg. for live dashboards and animations).
+
+        Parameters:
+            ax (axes): The axes on which to plot the face.
+            name (str): The label to add to the face.
+            cache (`GeometryCache`): An optional cache of face geometry.
+            animated (bool): default: False
+                Whether the artists are animated, for use with blitting (eg. `FuncAnimation(blit=True)`).
+
+        Returns:
+            `FaceArtists`: The artists of the face.
+        '''
+        from face_artists import FaceArtists
+
         # Set axes limits to support absolute drawing
         ax.set_xlim([-1, 1])
         ax.set_ylim([-1, 1])
@@ -294,85 +325,7 @@ class CFace():
         ax.set_yticks([])
         ax.set_title(name, loc='left', x=0.02, y=0.02)
 
-        # Scale features to appropriate, per feature ranges
-        scaled_features = self.features.copy()
-        for feature, value in self.features.items():
-            scaled_features[feature] = CFace._scale_feature(value,
-                                                            new_min=self.feature_ranges[feature]['min'],
-                                                            new_max=self.feature_ranges[feature]['max'])
-
-        # Draw nose
-        nose = matplotlib.patches.Ellipse(xy=[0,0+scaled_features['nose_length']/4],
-                                          width=scaled_features['nose_width'],
-                                          height=scaled_features['nose_length'])
-        nose.set(edgecolor='Black', fill=False)
-        ax.add_artist(nose)
-
-        # Draw head
-        head = matplotlib.patches.Ellipse(xy=[0,0],
-                                          width=scaled_features['head_width'],
-                                          height=scaled_features['head_length'])
-        head.set(edgecolor='Black', fill=False)
-        ax.add_artist(head)
-
-        # Draw eyes
-        right_eye = matplotlib.patches.Ellipse(xy=[scaled_features['eye_spacing'] + scaled_features['eye_width']/2,
-                                                   scaled_features['eye_height']],
-                                               width=scaled_features['eye_width'],
-                                               height=scaled_features['eye_length'],
-                                               angle=scaled_features['eye_angle'])
-        right_eye.set(edgecolor='Black', fill=False)
-        left_eye = matplotlib.patches.Ellipse(xy=[-scaled_features['eye_spacing'] - scaled_features['eye_width']/2,
-                                                  scaled_features['eye_height']],
-                                              width=scaled_features['eye_width'],
-                                              height=scaled_features['eye_length'],
-                                              angle=-scaled_features['eye_angle'])
-        left_eye.set(edgecolor='Black', fill=False)
-        ax.add_artist(right_eye)
-        ax.add_artist(left_eye)
-
-        # Draw pupils
-        right_pupil = matplotlib.patches.Circle(xy=[scaled_features['eye_spacing'] + scaled_features['eye_width']/2,
-                                                    scaled_features['eye_height']],
-                                                radius=scaled_features['pupil_size'])
-        right_pupil.set(color='Black')
-        left_pupil = matplotlib.patches.Circle(xy=[-scaled_features['eye_spacing'] - scaled_features['eye_width']/2,
-                                                   scaled_features['eye_height']],
-                                               radius=scaled_features['pupil_size'])
-        left_pupil.set(color='Black')
-        ax.add_artist(right_pupil)
-        ax.add_artist(left_pupil)
-
-        # Draw eyebrows
-        eyebrow_opp = math.sin(math.radians(scaled_features['eyebrow_angle'])) * scaled_features['eyebrow_length']
-        eyebrow_adj = math.cos(math.radians(scaled_features['eyebrow_angle'])) * scaled_features['eyebrow_length']
-        eyebrow_spacing = scaled_features['eye_spacing'] + \
-                          scaled_features['eye_width']/2 - \
-                          scaled_features['eyebrow_length']/2
-        eyebrow_height_adjusted = (scaled_features['eye_height'] + scaled_features['eyebrow_height'] +
-                                   scaled_features['eye_width']/2 + 0.05)
-        right_eyebrow = matplotlib.lines.Line2D(xdata=[eyebrow_spacing, eyebrow_spacing+eyebrow_adj],
-                                                ydata=[eyebrow_height_adjusted, eyebrow_height_adjusted+eyebrow_opp])
-        right_eyebrow.set(color='Black')
-        left_eyebrow = matplotlib.lines.Line2D(xdata=[-eyebrow_spacing, -eyebrow_spacing-eyebrow_adj],
-                                               ydata=[eyebrow_height_adjusted, eyebrow_height_adjusted+eyebrow_opp])
-        left_eyebrow.set(color='Black')
-        ax.add_artist(left_eyebrow)
-        ax.add_artist(right_eyebrow)
-
-        # Draw mouth
-        mouth_distance_from_center = min((scaled_features['mouth_height']),
-                                         (scaled_features['head_length']/2 - scaled_features['head_length']/6))
-        mouth = matplotlib.patches.Arc(xy=[0,-mouth_distance_from_center+0.01],
-                                       width=scaled_features['head_length']/3,
-                                       height=scaled_features['head_length']/3,
-                                       angle=-90-scaled_features['mouth_length']/2,
-                                       theta1=0,
-                                       theta2=scaled_features['mouth_length'])
-        mouth.set(edgecolor='Black')
-        ax.add_artist(mouth)
-
-        return ax
+        return FaceArtists(ax, self.features, cache, animated)
 
     @staticmethod
     def _scale_feature(value, new_min, new_max):
@@ -410,6 +363,25 @@ class CFace():
             return 1
         return (value - old_min) / old_range
 
+    @staticmethod
+    def _normalise_values(values, old_min, old_range):
+        '''
+        Vectorised equivalent of `_normalise_value`. Takes an array of values and normalises them to the
+        range 0 to 1, broadcasting `old_min` and `old_range` across the array (eg. one entry per column).
+        Wherever the old range is 0, the normalised value is 1.
+
+        Parameters:
+            values (`numpy.ndarray`): The values to be scaled.
+            old_min (float or `numpy.ndarray`): The minimum of the old range.
+            old_range (float or `numpy.ndarray`): The old range.
+
+        Returns:
+            `numpy.ndarray`
+        '''
+        values = np.asarray(values, dtype=np.float64)
+        old_range = np.broadcast_to(old_range, values.shape)
+        return np.divide(values - old_min, old_range, out=np.ones(values.shape), where=old_range != 0)
+
     @staticmethod
     def _get_feature_from_row(row, feature_name, feature_map):
         '''
@@ -0,0 +1,131 @@
+"""
+`CFaceArray` provides a compact container for many Chernoff Faces, backed by a single contiguous NumPy
+array with one row per face and one column per feature. Faces can be created from a normalised
+`pandas.DataFrame` in one vectorised step, validated all at once, and converted to and from `CFace`.
+"""
+import numpy as np
+
+from cface import CFace
+from face_batch import FaceBatch
+
+class CFaceArray():
+    '''
+    An array of Chernoff Faces, stored as an (N, 15) NumPy array `features`, with columns in the order
+    of `CFace.feature_ranges`. All features should be in the range 0-1, as for `CFace`.
+
+    Indexing with an integer returns a `CFace`. Indexing with a slice, boolean mask or array of indices
+    returns a `CFaceArray` (for slices, a view onto the same memory).
+    '''
+
+    feature_names = list(CFace.feature_ranges)
+
+    def __init__(self, features, dtype=np.float64, validate=True):
+        '''
+        Parameters:
+            features (array_like): An (N, 15) matrix of features, in the range 0-1.
+            dtype (`numpy.dtype`): default: float64
+                The dtype of the backing array, typically float32 or float64.
+            validate (bool): default: True
+                Whether to check that all features are in the range 0-1.
+        '''
+        features = np.ascontiguousarray(features, dtype=dtype)
+        if features.ndim != 2 or features.shape[1] != len(self.feature_names):
+            raise ValueError(f'features must have shape (N, {len(self.feature_names)}), not {features.shape}')
+
+        if validate:
+            CFaceArray.validate(features)
+
+        self.features = features
+
+    def __len__(self):
+        return self.features.shape[0]
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            return CFace(**dict(zip(self.feature_names, self.features[index].tolist())))
+        return CFaceArray(self.features[index], dtype=self.features.dtype, validate=False)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    @staticmethod
+    def validate(features):
+        '''
+        Checks that every feature of every face is within the range 0 to 1, reporting every offending
+        row at once.
+
+        Parameters:
+            features (`numpy.ndarray`): An (N, 15) matrix of features.
+
+        Raises:
+            ValueError: If any feature is outside the range 0 to 1.
+        '''
+        invalid = (features > 1) | (features < 0)
+        invalid_rows = np.flatnonzero(invalid.any(axis=1))
+        if invalid_rows.size == 0:
+            return
+
+        details = []
+        for row in invalid_rows:
+            row_details = ', '.join(f'{CFaceArray.feature_names[column]}={features[row, column]}'
+                                    for column in np.flatnonzero(invalid[row]))
+            details.append(f'row {row} ({row_details})')
+        raise ValueError(f'{invalid_rows.size} rows have feature values outside the range 0 to 1: '
+                         + '; '.join(details))
+
+    @staticmethod
+    def from_df(df, feature_map, dtype=np.float64):
+        '''
+        Creates a Chernoff Face for each row of a (normalised) DataFrame, using a feature map defining
+        the mapping between features (of the Chernoff Face) and columns (of the supplied DataFrame).
+        This is the vectorised equivalent of applying `CFace.create_cface_from_row` to every row.
+
+        If a feature is not present in the `feature_map`, it defaults to 0.5. If a feature is mapped to a
+        column that does not exist in the DataFrame, a KeyError is raised.
+
+        Parameters:
+            df (`pandas.DataFrame`): A normalised DataFrame.
+            feature_map (dict): A mapping between features and column names.
+            dtype (`numpy.dtype`): default: float64
+                The dtype of the backing array.
+
+        Returns:
+            `CFaceArray`: The Chernoff Faces.
+        '''
+        features = np.full((len(df), len(CFaceArray.feature_names)), 0.5, dtype=dtype)
+        for i, feature in enumerate(CFaceArray.feature_names):
+            if feature in feature_map:
+                features[:, i] = df[feature_map[feature]].to_numpy(dtype=dtype)
+        return CFaceArray(features, dtype=dtype)
+
+    @staticmethod
+    def from_cfaces(cfaces, dtype=np.float64):
+        '''
+        Creates a `CFaceArray` from individual Chernoff Faces.
+
+        Parameters:
+            cfaces (iterable of `CFace`): The Chernoff Faces.
+            dtype (`numpy.dtype`): default: float64
+                The dtype of the backing array.
+
+        Returns:
+            `CFaceArray`: The Chernoff Faces.
+        '''
+        features = [[cface.features[feature] for feature in CFaceArray.feature_names] for cface in cfaces]
+        return CFaceArray(np.array(features, dtype=dtype).reshape(-1, len(CFaceArray.feature_names)),
+                          dtype=dtype)
+
+    def to_cfaces(self):
+        '''
+        Returns:
+            list of `CFace`: One Chernoff Face per row.
+        '''
+        return list(self)
+
+    def to_batch(self):
+        '''
+        Returns:
+            `FaceBatch`: The geometry of all of the faces, ready to be drawn.
+        '''
+        return FaceBatch(self.features, CFace.feature_ranges)
@@ -0,0 +1,18 @@
+import numpy as np
+import pytest
+
+from cface import CFace
+
+@pytest.fixture
+def face_count():
+    '''
+    The number of faces in `features`. Override it in a test module, or parametrize it, to change the count.
+    '''
+    return 8
+
+@pytest.fixture
+def features(face_count):
+    '''
+    An (N, 15) matrix of random features, the same in every run.
+    '''
+    return np.random.default_rng(0).random((face_count, len(CFace.feature_ranges)))
@@ -0,0 +1,168 @@
+"""
+Normalises feature matrices that are not `pandas.DataFrame`s, without loading or copying them whole:
+2D or structured NumPy arrays, `.npy` files (memory mapped), and Arrow tables (if pyarrow is installed).
+Columns are read as zero-copy views wherever the source allows, the normaliser is fitted and applied a
+chunk of rows at a time, and the normalised output is written to a caller-supplied array or a memory
+mapped `.npy` file. Peak memory depends on the chunk size rather than the size of the input, so files
+much larger than RAM can be normalised and rendered.
+"""
+import numpy as np
+
+from cface import CFace
+from cface_array import CFaceArray
+from face_normaliser import FaceNormaliser
+
+DEFAULT_CHUNKSIZE = 100_000
+
+def column_arrays(source):
+    '''
+    Returns the numeric columns of a source of features as 1D NumPy arrays, without copying them wherever
+    the source allows.
+
+    Parameters:
+        source: One of:
+            - a path to a `.npy` file, which is memory mapped read-only;
+            - a structured NumPy array, whose numeric fields are the columns;
+            - a 2D NumPy array (including `numpy.memmap`), whose columns are named by index (0, 1, ...);
+            - a `pyarrow.Table` or `pyarrow.RecordBatch` (chunked columns are combined, which copies them);
+            - a `pandas.DataFrame`;
+            - a dict of 1D arrays, keyed by column name.
+
+    Returns:
+        columns (dict): The numeric columns, keyed by column name, in source order.
+    '''
+    if isinstance(source, str) or hasattr(source, '__fspath__'):
+        source = np.load(source, mmap_mode='r')
+
+    if isinstance(source, dict):
+        columns = {name: np.asarray(values) for name, values in source.items()}
+    elif type(source).__module__.startswith('pyarrow'):
+        columns = {name: source.column(name).to_numpy() for name in source.column_names}
+    elif type(source).__module__.startswith('pandas'):
+        columns = {name: source[name].to_numpy() for name in source}
+    elif isinstance(source, np.ndarray) and source.dtype.names is not None:
+        columns = {name: source[name] for name in source.dtype.names}
+    else:
+        source = np.asarray(source)
+        if source.ndim != 2:
+            raise ValueError(f'feature arrays must be 2D or structured, not {source.ndim}D')
+        columns = {i: source[:, i] for i in range(source.shape[1])}
+
+    return {name: values for name, values in columns.items() if values.dtype.kind in 'biuf'}
+
+def fit_arrays(source, normaliser=None, chunksize=DEFAULT_CHUNKSIZE):
+    '''
+    Fits a `FaceNormaliser` to a source of features a chunk of rows at a time.
+
+    Parameters:
+        source: The features, as accepted by `column_arrays`.
+        normaliser (`FaceNormaliser`): A normaliser to update with `partial_fit_values`, eg. to choose a
+            mode. Defaults to a new min-max normaliser, matching `CFace.normalise_df`.
+        chunksize (int): The number of rows to read at a time.
+
+    Returns:
+        `FaceNormaliser`: The fitted normaliser.
+    '''
+    columns = column_arrays(source)
+    if normaliser is None:
+        normaliser = FaceNormaliser(clip=False)
+    for start, stop in _chunks(columns, chunksize):
+        normaliser.partial_fit_values(_read_chunk(columns, list(columns), start, stop), list(columns))
+    return normaliser
+
+def normalise_array(source, out=None, normaliser=None, chunksize=DEFAULT_CHUNKSIZE, dtype=np.float64):
+    '''
+    The array equivalent of `CFace.normalise_df`: normalises each numeric column of a source of features
+    to the range 0 to 1, writing the result to `out` a chunk of rows at a time.
+
+    Parameters:
+        source: The features, as accepted by `column_arrays`.
+        out (`numpy.ndarray` or str): An (N, C) array to write the normalised columns to, or the path of a
+            `.npy` file to create and memory map. Defaults to a new array.
+        normaliser (`FaceNormaliser`): A fitted normaliser, eg. loaded from an earlier run. Defaults to
+            fitting a new min-max normaliser to the source (see `fit_arrays`).
+        chunksize (int): The number of rows to read at a time.
+        dtype (`numpy.dtype`): The dtype of a new output array or file.
+
+    Returns:
+        out (`numpy.ndarray`): The normalised columns, in the order of `normaliser.columns`.
+        feature_map (dict): A mapping between Chernoff Face features and column names.
+    '''
+    columns = column_arrays(source)
+    if normaliser is None:
+        normaliser = fit_arrays(columns, chunksize=chunksize)
+    out = _output(out, (_length(columns), len(normaliser.columns)), dtype)
+    for start, stop in _chunks(columns, chunksize):
+        normaliser.transform_values(_read_chunk(columns, normaliser.columns, start, stop), out[start:stop])
+    return out, normaliser.feature_map
+
+def face_features(source, out=None, feature_map=None, normaliser=None, chunksize=DEFAULT_CHUNKSIZE,
+                  dtype=np.float64):
+    '''
+    Normalises a source of features straight into the (N, 15) feature matrix of Chernoff Faces, as
+    `normalise_array` followed by `CFaceArray.from_df` would, but only reading and writing the mapped
+    columns. With a memory mapped source and output, faces can be rendered from files larger than RAM.
+
+    Parameters:
+        source: The features, as accepted by `column_arrays`.
+        out (`numpy.ndarray` or str): An (N, 15) array to write the features to, or the path of a `.npy` file
+            to create and memory map. Defaults to a new array.
+        feature_map (dict): A mapping between features and column names. Defaults to the feature map of
+            the normaliser. Features that are not mapped default to 0.5.
+        normaliser (`FaceNormaliser`): A fitted normaliser. Defaults to fitting a new min-max normaliser
+            to the source.
+        chunksize (int): The number of rows to read at a time.
+        dtype (`numpy.dtype`): The dtype of a new output array or file, typically float32 or float64.
+
+    Returns:
+        `CFaceArray`: The faces, backed by `out` where its dtype allows.
+    '''
+    columns = column_arrays(source)
+    if normaliser is None:
+        normaliser = fit_arrays(columns, chunksize=chunksize)
+    if feature_map is None:
+        feature_map = normaliser.feature_map
+    for feature, column in feature_map.items():
+        if column not in normaliser.columns:
+            raise KeyError(f'{feature} is mapped to {column}, which is not a normalised column')
+
+    out = _output(out, (_length(columns), len(CFace.feature_ranges)), dtype)
+    features = [feature for feature in CFace.feature_ranges if feature in feature_map]
+    mapped = [CFaceArray.feature_names.index(feature) for feature in features]
+    names = list(dict.fromkeys(feature_map[feature] for feature in features))
+    index = [names.index(feature_map[feature]) for feature in features]
+    for start, stop in _chunks(columns, chunksize):
+        chunk = out[start:stop]
+        chunk[...] = 0.5
+        normalised = normaliser.transform_values(_read_chunk(columns, names, start, stop), columns=names)
+        chunk[:, mapped] = normalised[:, index]
+    return CFaceArray(out, dtype=out.dtype, validate=False)
+
+def _length(columns):
+    return len(next(iter(columns.values()))) if columns else 0
+
+def _chunks(columns, chunksize):
+    length = _length(columns)
+    return ((start, min(start + chunksize, length)) for start in range(0, length, chunksize))
+
+def _read_chunk(columns, names, start, stop):
+    '''
+    Reads rows `start` to `stop` of the named columns into an (rows, len(names)) float64 matrix.
+    '''
+    chunk = np.empty((stop - start, len(names)))
+    for i, name in enumerate(names):
+        chunk[:, i] = columns[name][start:stop]
+    return chunk
+
+def _output(out, shape, dtype):
+    '''
+    Returns `out` after checking its shape, or a new array (or memory mapped `.npy` file, if `out` is a path)
+    of the supplied shape and dtype.
+    '''
+    if out is None:
+        return np.empty(shape, dtype=dtype)
+    if isinstance(out, str) or hasattr(out, '__fspath__'):
+        return np.lib.format.open_memmap(out, mode='w+', dtype=dtype, shape=shape)
+    if out.shape != shape:
+        raise ValueError(f'out must have shape {shape}, not {out.shape}')
+    return out
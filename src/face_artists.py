@@ -0,0 +1,185 @@
+"""
+`FaceArtists` is a handle to the matplotlib artists of a Chernoff Face drawn on an `Axes`, returned by
+`CFace.draw`. Its `update` method changes the features of the face by modifying the existing artists in
+place, so live dashboards and animations don't need to clear the axes and redraw the face from scratch.
+"""
+import matplotlib.lines
+import matplotlib.patches
+
+from cface import CFace
+from face_batch import PART_FEATURES, FaceBatch
+from face_profile import stage
+
+class FaceArtists():
+    '''
+    The artists of a Chernoff Face drawn on an `Axes`:
+    nose, head, right_eye, left_eye : `matplotlib.patches.Ellipse`
+    right_pupil, left_pupil : `matplotlib.patches.Circle`
+    right_eyebrow, left_eyebrow : `matplotlib.lines.Line2D`
+    mouth : `matplotlib.patches.Arc`
+
+    `artists` lists all nine, eg. to return from a `FuncAnimation` update function when blitting:
+
+    ```
+    handle = CFace().draw(ax, animated=True)
+
+    def animate(frame):
+        return handle.update({'mouth_length': frame / 100})
+
+    animation = FuncAnimation(fig, animate, frames=100, blit=True)
+    ```
+    '''
+
+    def __init__(self, ax, features, cache=None, animated=False):
+        '''
+        Draws a Chernoff Face on the supplied axes. Typically created with `CFace.draw`.
+
+        Parameters:
+            ax (axes): The axes on which to draw the face.
+            features (dict): The features of the face, as `CFace.features`.
+            cache (`GeometryCache`): An optional cache of face geometry.
+            animated (bool): default: False
+                Whether the artists are animated, ie. excluded from normal drawing for use with blitting.
+        '''
+        self.ax = ax
+        self.cache = cache
+        self.features = dict(features)
+        face = self._geometry()
+
+        # Draw nose
+        self.nose = matplotlib.patches.Ellipse(xy=face.nose_center[0],
+                                               width=face.nose_width[0],
+                                               height=face.nose_height[0])
+        self.nose.set(edgecolor='Black', fill=False)
+
+        # Draw head
+        self.head = matplotlib.patches.Ellipse(xy=face.head_center[0],
+                                               width=face.head_width[0],
+                                               height=face.head_height[0])
+        self.head.set(edgecolor='Black', fill=False)
+
+        # Draw eyes
+        self.right_eye = matplotlib.patches.Ellipse(xy=face.right_eye_center[0],
+                                                    width=face.eye_width[0],
+                                                    height=face.eye_height[0],
+                                                    angle=face.right_eye_angle[0])
+        self.right_eye.set(edgecolor='Black', fill=False)
+        self.left_eye = matplotlib.patches.Ellipse(xy=face.left_eye_center[0],
+                                                   width=face.eye_width[0],
+                                                   height=face.eye_height[0],
+                                                   angle=face.left_eye_angle[0])
+        self.left_eye.set(edgecolor='Black', fill=False)
+
+        # Draw pupils
+        self.right_pupil = matplotlib.patches.Circle(xy=face.right_pupil_center[0],
+                                                     radius=face.pupil_radius[0])
+        self.right_pupil.set(color='Black')
+        self.left_pupil = matplotlib.patches.Circle(xy=face.left_pupil_center[0],
+                                                    radius=face.pupil_radius[0])
+        self.left_pupil.set(color='Black')
+
+        # Draw eyebrows
+        self.right_eyebrow = matplotlib.lines.Line2D(xdata=face.right_eyebrow[0, :, 0],
+                                                     ydata=face.right_eyebrow[0, :, 1])
+        self.right_eyebrow.set(color='Black')
+        self.left_eyebrow = matplotlib.lines.Line2D(xdata=face.left_eyebrow[0, :, 0],
+                                                    ydata=face.left_eyebrow[0, :, 1])
+        self.left_eyebrow.set(color='Black')
+
+        # Draw mouth
+        self.mouth = matplotlib.patches.Arc(xy=face.mouth_center[0],
+                                            width=face.mouth_width[0],
+                                            height=face.mouth_height[0],
+                                            angle=face.mouth_angle[0],
+                                            theta1=face.mouth_theta1[0],
+                                            theta2=face.mouth_theta2[0])
+        self.mouth.set(edgecolor='Black')
+
+        self.artists = [self.nose, self.head, self.right_eye, self.left_eye, self.right_pupil, self.left_pupil,
+                        self.left_eyebrow, self.right_eyebrow, self.mouth]
+        for artist in self.artists:
+            artist.set_animated(animated)
+            with stage('plot.add_artist'):
+                ax.add_artist(artist)
+
+    def update(self, features):
+        '''
+        Changes the features of the face, updating the existing artists in place. Features that are not
+        supplied keep their current values. Only the parts that depend on a changed feature (see
+        `face_batch.PART_FEATURES`) are recomputed and updated, and the other artists are left untouched.
+
+        Parameters:
+            features (dict or `CFace`): The new values of some or all features, in the range 0-1.
+
+        Returns:
+            artists (list): The artists of the face.
+        '''
+        if isinstance(features, CFace):
+            features = features.features
+        for feature, value in features.items():
+            if feature not in self.features:
+                raise KeyError(f'{feature} is not a Chernoff Face feature')
+            if value > 1 or value < 0:
+                raise ValueError(f'{feature} value {value} must be within the range 0 to 1')
+        changed = {feature for feature, value in features.items() if self.features[feature] != value}
+        parts = [part for part, part_features in PART_FEATURES.items() if changed & part_features]
+        if not parts:
+            return self.artists
+        self.features.update(features)
+        face = self._geometry(parts)
+
+        if 'nose' in parts:
+            self.nose.set_center(face.nose_center[0])
+            self.nose.set_width(face.nose_width[0])
+            self.nose.set_height(face.nose_height[0])
+
+        if 'head' in parts:
+            self.head.set_width(face.head_width[0])
+            self.head.set_height(face.head_height[0])
+
+        if 'eyes' in parts:
+            for eye, center, angle in [(self.right_eye, face.right_eye_center[0], face.right_eye_angle[0]),
+                                       (self.left_eye, face.left_eye_center[0], face.left_eye_angle[0])]:
+                eye.set_center(center)
+                eye.set_width(face.eye_width[0])
+                eye.set_height(face.eye_height[0])
+                eye.set_angle(angle)
+
+        if 'pupils' in parts:
+            self.right_pupil.set_center(face.right_pupil_center[0])
+            self.right_pupil.set_radius(face.pupil_radius[0])
+            self.left_pupil.set_center(face.left_pupil_center[0])
+            self.left_pupil.set_radius(face.pupil_radius[0])
+
+        if 'eyebrows' in parts:
+            self.right_eyebrow.set_data(face.right_eyebrow[0, :, 0], face.right_eyebrow[0, :, 1])
+            self.left_eyebrow.set_data(face.left_eyebrow[0, :, 0], face.left_eyebrow[0, :, 1])
+
+        if 'mouth' in parts:
+            self.mouth.set_center(face.mouth_center[0])
+            self.mouth.set_width(face.mouth_width[0])
+            self.mouth.set_height(face.mouth_height[0])
+            self.mouth.set_angle(face.mouth_angle[0])
+            self.mouth.theta1 = face.mouth_theta1[0]
+            self.mouth.theta2 = face.mouth_theta2[0]
+            self.mouth.stale = True
+
+        return self.artists
+
+    def remove(self):
+        '''
+        Removes the artists of the face from the axes.
+        '''
+        for artist in self.artists:
+            artist.remove()
+
+    def _geometry(self, parts=None):
+        '''
+        Scales the features to their per feature ranges, and computes the geometry of the face: of only the
+        given parts, unless the geometry comes from the cache, which holds every part.
+        '''
+        with stage('plot.geometry'):
+            features = [self.features[feature] for feature in CFace.feature_ranges]
+            if self.cache is None:
+                return FaceBatch([features], CFace.feature_ranges, parts)
+            return self.cache.get(features)
@@ -0,0 +1,139 @@
+"""
+`FaceBatch` computes the geometry of many Chernoff Faces at once. Given a matrix of features (one row
+per face, one column per feature) it scales every feature to its drawing range and derives the centers,
+sizes and angles of every part of every face as NumPy arrays, without creating any Python objects per face.
+"""
+import numpy as np
+
+# The features that the geometry of each part of a face depends on
+PART_FEATURES = {
+    'nose': {'nose_width', 'nose_length'},
+    'head': {'head_width', 'head_length'},
+    'eyes': {'eye_width', 'eye_length', 'eye_spacing', 'eye_height', 'eye_angle'},
+    'pupils': {'eye_width', 'eye_spacing', 'eye_height', 'pupil_size'},
+    'eyebrows': {'eye_width', 'eye_spacing', 'eye_height', 'eyebrow_length', 'eyebrow_angle', 'eyebrow_height'},
+    'mouth': {'head_length', 'mouth_length', 'mouth_height'},
+}
+
+class FaceBatch():
+    '''
+    The geometry of a batch of Chernoff Faces, stored as NumPy arrays with one entry per face.
+
+    Features are supplied as an (N, F) matrix, with columns in the order of the keys of `feature_ranges`
+    (the same order as `CFace.feature_ranges`). Each feature is scaled from the range 0-1 to the range
+    given by `feature_ranges`, and the scaled features are available as `scaled`, an (N, F) array.
+
+    All geometry is in face coordinates, where the face is centered on the origin and drawn within the
+    square -1 to 1. Centers are (N, 2) arrays, eyebrows are (N, 2, 2) arrays of line segments and all
+    other attributes are arrays of length N. Angles are in degrees:
+    nose_center, nose_width, nose_height : The nose ellipse.
+    head_center, head_width, head_height : The head ellipse.
+    right_eye_center, left_eye_center, eye_width, eye_height, right_eye_angle, left_eye_angle : The eye ellipses.
+    right_pupil_center, left_pupil_center, pupil_radius : The pupil circles.
+    right_eyebrow, left_eyebrow : The eyebrow line segments, as [[x0, y0], [x1, y1]].
+    mouth_center, mouth_width, mouth_height, mouth_angle, mouth_theta1, mouth_theta2 : The mouth arc.
+    '''
+
+    def __init__(self, features, feature_ranges, parts=None):
+        '''
+        Parameters:
+            features (array_like): An (N, F) matrix of features, in the range 0-1.
+            feature_ranges (dict): A mapping between each of the F features and its drawing range, as
+                `{'feature': {'min': float, 'max': float}}`.
+            parts (iterable): The parts whose geometry to compute, from the keys of `PART_FEATURES`. The
+                attributes of other parts are not set. Defaults to every part.
+        '''
+        self.feature_names = list(feature_ranges)
+
+        features = np.asarray(features, dtype=np.float64)
+        if features.ndim != 2 or features.shape[1] != len(self.feature_names):
+            raise ValueError(f'features must have shape (N, {len(self.feature_names)}), not {features.shape}')
+
+        new_min = np.array([feature_ranges[feature]['min'] for feature in self.feature_names], dtype=np.float64)
+        new_max = np.array([feature_ranges[feature]['max'] for feature in self.feature_names], dtype=np.float64)
+        self.scaled = features * (new_max - new_min) + new_min
+
+        self._eye_center_cache = None
+        self._compute_geometry(PART_FEATURES if parts is None else parts)
+
+    def __len__(self):
+        return self.scaled.shape[0]
+
+    def scaled_feature(self, feature):
+        '''
+        Returns the scaled values of a single feature, one per face.
+
+        Parameters:
+            feature (str): The name of the feature.
+
+        Returns:
+            `numpy.ndarray`
+        '''
+        return self.scaled[:, self.feature_names.index(feature)]
+
+    def _compute_geometry(self, parts):
+        '''
+        Derives the geometry of the requested face parts from the scaled features.
+        '''
+        for part in parts:
+            getattr(self, f'_compute_{part}')()
+
+    def _compute_nose(self):
+        nose_length = self.scaled_feature('nose_length')
+        self.nose_center = np.column_stack([np.zeros(len(self)), nose_length/4])
+        self.nose_width = self.scaled_feature('nose_width')
+        self.nose_height = nose_length
+
+    def _compute_head(self):
+        zeros = np.zeros(len(self))
+        self.head_center = np.column_stack([zeros, zeros])
+        self.head_width = self.scaled_feature('head_width')
+        self.head_height = self.scaled_feature('head_length')
+
+    def _compute_eyes(self):
+        self.right_eye_center, self.left_eye_center = self._eye_centers()
+        self.eye_width = self.scaled_feature('eye_width')
+        self.eye_height = self.scaled_feature('eye_length')
+        self.right_eye_angle = self.scaled_feature('eye_angle')
+        self.left_eye_angle = -self.right_eye_angle
+
+    def _compute_pupils(self):
+        self.right_pupil_center, self.left_pupil_center = self._eye_centers()
+        self.pupil_radius = self.scaled_feature('pupil_size')
+
+    def _compute_eyebrows(self):
+        eye_width = self.scaled_feature('eye_width')
+        eyebrow_length = self.scaled_feature('eyebrow_length')
+        eyebrow_angle = self.scaled_feature('eyebrow_angle')
+        eyebrow_opp = np.sin(np.radians(eyebrow_angle)) * eyebrow_length
+        eyebrow_adj = np.cos(np.radians(eyebrow_angle)) * eyebrow_length
+        eyebrow_spacing = self.scaled_feature('eye_spacing') + eye_width/2 - eyebrow_length/2
+        eyebrow_height_adjusted = (self.scaled_feature('eye_height') + self.scaled_feature('eyebrow_height')
+                                   + eye_width/2 + 0.05)
+        self.right_eyebrow = np.stack([np.column_stack([eyebrow_spacing, eyebrow_height_adjusted]),
+                                       np.column_stack([eyebrow_spacing + eyebrow_adj,
+                                                        eyebrow_height_adjusted + eyebrow_opp])], axis=1)
+        self.left_eyebrow = np.stack([np.column_stack([-eyebrow_spacing, eyebrow_height_adjusted]),
+                                      np.column_stack([-eyebrow_spacing - eyebrow_adj,
+                                                       eyebrow_height_adjusted + eyebrow_opp])], axis=1)
+
+    def _compute_mouth(self):
+        head_length = self.scaled_feature('head_length')
+        mouth_length = self.scaled_feature('mouth_length')
+        mouth_distance_from_center = np.minimum(self.scaled_feature('mouth_height'), head_length/2 - head_length/6)
+        self.mouth_center = np.column_stack([np.zeros(len(self)), -mouth_distance_from_center + 0.01])
+        self.mouth_width = head_length/3
+        self.mouth_height = head_length/3
+        self.mouth_angle = -90 - mouth_length/2
+        self.mouth_theta1 = np.zeros(len(self))
+        self.mouth_theta2 = mouth_length
+
+    def _eye_centers(self):
+        '''
+        Returns the (N, 2) centers of the right and left eyes, which are also the centers of the pupils.
+        '''
+        if self._eye_center_cache is None:
+            eye_x = self.scaled_feature('eye_spacing') + self.scaled_feature('eye_width')/2
+            eye_height = self.scaled_feature('eye_height')
+            self._eye_center_cache = (np.column_stack([eye_x, eye_height]), np.column_stack([-eye_x, eye_height]))
+        return self._eye_center_cache
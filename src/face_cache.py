@@ -0,0 +1,120 @@
+"""
+`GeometryCache` memoises the geometry of Chernoff Faces, so that faces that are drawn again and again
+(such as in a dashboard that is redrawn regularly) don't have their geometry recomputed each time.
+"""
+from collections import OrderedDict
+
+import numpy as np
+
+from cface import CFace
+from face_batch import FaceBatch
+
+class GeometryCache():
+    '''
+    A least recently used cache of face geometry, keyed on the features of a face quantized to a
+    resolution. Faces whose features round to the same multiples of the resolution share an entry,
+    and the geometry is computed from the quantized features, so it is the same however the entry was
+    first created.
+
+    Pass a cache to `CFace.plot` to use it:
+
+    ```
+    cache = GeometryCache(maxsize=1024, resolution=0.001)
+    cface.plot(ax, cache=cache)
+    ```
+
+    The cache counts its `hits`, `misses` and `evictions`, to help tune `maxsize` and `resolution`.
+    '''
+
+    def __init__(self, maxsize=1024, resolution=0.001, feature_ranges=None):
+        '''
+        Parameters:
+            maxsize (int): default: 1024
+                The maximum number of entries. When the cache is full, the least recently used entry is
+                evicted.
+            resolution (float): default: 0.001
+                The resolution to which features are quantized. If None, features are not quantized.
+            feature_ranges (dict): default: `CFace.feature_ranges`
+                The drawing range of each feature.
+        '''
+        if maxsize < 1:
+            raise ValueError(f'maxsize {maxsize} must be at least 1')
+        if resolution is not None and resolution <= 0:
+            raise ValueError(f'resolution {resolution} must be greater than 0')
+
+        self.maxsize = maxsize
+        self.resolution = resolution
+        self.feature_ranges = CFace.feature_ranges if feature_ranges is None else feature_ranges
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, features):
+        '''
+        Returns the geometry of a face, computing and caching it if it is not already cached.
+
+        Parameters:
+            features (array_like): The features of the face, in the order of `feature_ranges`.
+
+        Returns:
+            `FaceBatch`: The geometry of the face (a batch of one).
+        '''
+        key = self.quantize(features)
+        geometry = self._entries.get(key)
+        if geometry is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return geometry
+
+        self.misses += 1
+        quantized = np.array(key, dtype=np.float64)
+        if self.resolution is not None:
+            quantized *= self.resolution
+        geometry = FaceBatch(quantized[np.newaxis, :], self.feature_ranges)
+
+        self._entries[key] = geometry
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return geometry
+
+    def quantize(self, features):
+        '''
+        Returns the cache key for a face: its features, rounded to multiples of the resolution.
+
+        Parameters:
+            features (array_like): The features of the face.
+
+        Returns:
+            tuple
+        '''
+        features = np.asarray(features, dtype=np.float64)
+        if self.resolution is None:
+            return tuple(features.tolist())
+        return tuple(np.rint(features / self.resolution).astype(np.int64).tolist())
+
+    def clear(self):
+        '''
+        Removes all entries from the cache and resets the counters.
+        '''
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self):
+        '''
+        Returns:
+            dict: The number of hits, misses and evictions, and the current and maximum size of the cache.
+        '''
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self._entries),
+            'maxsize': self.maxsize
+        }
@@ -0,0 +1,296 @@
+"""
+Draws many Chernoff Faces onto a single `Axes` using one matplotlib collection per face part, rather
+than one artist per part per face. The geometry of the faces is supplied as a `FaceBatch`, so the
+number of artists (and the per-artist drawing overhead) is constant, regardless of the number of faces.
+"""
+import matplotlib
+import matplotlib.collections
+import matplotlib.path
+import matplotlib.transforms
+import numpy as np
+
+from cface import CFace
+from face_batch import FaceBatch
+
+ARC_RESOLUTION = 32
+DEFAULT_MARKER_SIZE = 24
+
+def plot_faces(ax, batch, offsets):
+    '''
+    Draws a batch of Chernoff Faces on the supplied axes, with the center of each face placed at the
+    matching offset (in data coordinates). Faces are drawn at a scale of one data unit per face unit,
+    so each face occupies a 2x2 square around its offset.
+
+    Parameters:
+        ax (axes): The axes on which to plot the faces.
+        batch (`FaceBatch`): The geometry of the faces.
+        offsets (array_like): An (N, 2) array of face centers, one per face in the batch.
+
+    Returns:
+        collections (dict): The collections added to the axes, keyed by face part: 'heads', 'noses',
+            'eyes', 'pupils', 'eyebrows' and 'mouths'.
+    '''
+    collections = part_collections(ax, face_parts(batch, offsets))
+    for collection in collections.values():
+        ax.add_collection(collection, autolim=False)
+
+    return collections
+
+def face_parts(batch, offsets):
+    '''
+    Computes the geometry of each part of a batch of faces in data coordinates, with the center of each
+    face placed at the matching offset. Every array has one entry per face along its first axis (paired
+    parts have a second axis of length 2, for the right and left part), so the geometry of a subset of the
+    faces can be selected with `select_parts`.
+
+    Parameters:
+        batch (`FaceBatch`): The geometry of the faces.
+        offsets (array_like): An (N, 2) array of face centers, one per face in the batch.
+
+    Returns:
+        parts (dict): The geometry of each face part, keyed by face part: 'heads', 'noses', 'eyes' and
+            'pupils' (each a dict of 'centers', 'widths', 'heights' and 'angles'), 'eyebrows' and 'mouths'
+            (each a dict of 'segments').
+    '''
+    offsets = np.asarray(offsets, dtype=np.float64).reshape(len(batch), 2)
+    zeros = np.zeros(len(batch))
+    eye_centers = np.stack([offsets + batch.right_eye_center, offsets + batch.left_eye_center], axis=1)
+
+    return {
+        'heads': {'centers': offsets + batch.head_center,
+                  'widths': batch.head_width,
+                  'heights': batch.head_height,
+                  'angles': zeros},
+        'noses': {'centers': offsets + batch.nose_center,
+                  'widths': batch.nose_width,
+                  'heights': batch.nose_height,
+                  'angles': zeros},
+        'eyes': {'centers': eye_centers,
+                 'widths': np.column_stack([batch.eye_width, batch.eye_width]),
+                 'heights': np.column_stack([batch.eye_height, batch.eye_height]),
+                 'angles': np.column_stack([batch.right_eye_angle, batch.left_eye_angle])},
+        'pupils': {'centers': eye_centers,
+                   'widths': np.column_stack([2 * batch.pupil_radius, 2 * batch.pupil_radius]),
+                   'heights': np.column_stack([2 * batch.pupil_radius, 2 * batch.pupil_radius]),
+                   'angles': np.column_stack([zeros, zeros])},
+        'eyebrows': {'segments': np.stack([offsets[:, np.newaxis, :] + batch.right_eyebrow,
+                                           offsets[:, np.newaxis, :] + batch.left_eyebrow], axis=1)},
+        'mouths': {'segments': offsets[:, np.newaxis, :] + mouth_arcs(batch)}
+    }
+
+def select_parts(parts, faces):
+    '''
+    Selects the geometry of a subset of faces from the output of `face_parts`.
+
+    Parameters:
+        parts (dict): The geometry of each face part, as returned by `face_parts`.
+        faces (array_like): A boolean mask or integer index of the faces to select.
+
+    Returns:
+        parts (dict): The geometry of each face part of the selected faces.
+    '''
+    return {part: {name: values[faces] for name, values in geometry.items()} for part, geometry in parts.items()}
+
+def part_collections(ax, parts):
+    '''
+    Creates one collection for each face part in `parts` (as returned by `face_parts`, or a subset of its
+    keys), without adding them to the axes.
+
+    Parameters:
+        ax (axes): The axes whose data coordinates the collections are drawn in.
+        parts (dict): The geometry of each face part.
+
+    Returns:
+        collections (dict): The collections, keyed by face part.
+    '''
+    patch_linewidth = matplotlib.rcParams['patch.linewidth']
+    line_linewidth = matplotlib.rcParams['lines.linewidth']
+    styles = {
+        'heads': {'facecolors': 'none', 'edgecolors': 'Black', 'linewidths': patch_linewidth},
+        'noses': {'facecolors': 'none', 'edgecolors': 'Black', 'linewidths': patch_linewidth},
+        'eyes': {'facecolors': 'none', 'edgecolors': 'Black', 'linewidths': patch_linewidth},
+        'pupils': {'facecolors': 'Black', 'edgecolors': 'Black', 'linewidths': patch_linewidth},
+        'eyebrows': {'colors': 'Black', 'linewidths': line_linewidth},
+        'mouths': {'colors': 'Black', 'linewidths': patch_linewidth}
+    }
+
+    collections = {}
+    for part, geometry in parts.items():
+        if 'segments' in geometry:
+            collections[part] = matplotlib.collections.LineCollection(_unpair(geometry['segments'], part),
+                                                                      **styles[part])
+        else:
+            collections[part] = matplotlib.collections.EllipseCollection(_unpair(geometry['widths'], part),
+                                                                         _unpair(geometry['heights'], part),
+                                                                         _unpair(geometry['angles'], part),
+                                                                         units='xy',
+                                                                         offsets=_unpair(geometry['centers'], part),
+                                                                         offset_transform=ax.transData,
+                                                                         **styles[part])
+    return collections
+
+def _unpair(values, part):
+    '''
+    Flattens the geometry of a paired face part to all of the right parts followed by all of the left parts.
+    '''
+    if part in ('eyes', 'pupils', 'eyebrows'):
+        return np.concatenate([values[:, 0], values[:, 1]])
+    return values
+
+def cface_scatter(ax, x, y, faces, size=DEFAULT_MARKER_SIZE):
+    '''
+    Draws Chernoff Faces as scatter plot markers, with the center of each face at the matching (x, y)
+    position in data coordinates. Like scatter markers, the faces are sized in points, so they keep
+    their size and shape as the axes are zoomed, and the axes limits are autoscaled to the positions.
+    All of the faces are drawn through three collections, with one compound path per face.
+
+    Parameters:
+        ax (axes): The axes on which to plot the faces.
+        x (array_like): The x positions of the faces.
+        y (array_like): The y positions of the faces.
+        faces (`CFaceArray` or array_like): The faces to draw, or an (N, 15) matrix of their features.
+        size (float or array_like): The width of each face (or of every face), in points.
+
+    Returns:
+        collections (dict): The collections added to the axes: 'outlines' (heads, noses, eyes and
+            mouths), 'pupils' and 'eyebrows'.
+    '''
+    features = np.asarray(getattr(faces, 'features', faces))
+    batch = FaceBatch(features, CFace.feature_ranges)
+    offsets = np.column_stack([np.ravel(x), np.ravel(y)]).astype(np.float64)
+    if len(offsets) != len(batch):
+        raise ValueError(f'x and y must have one position per face, not {len(offsets)} for {len(batch)} faces')
+
+    # Face units are scaled to points (half the face size per unit), then points to display pixels
+    scale = np.broadcast_to(np.asarray(size, dtype=np.float64), (len(batch),))[:, np.newaxis, np.newaxis] / 2
+    transform = matplotlib.transforms.Affine2D().scale(1 / 72) + ax.figure.dpi_scale_trans
+    patch_linewidth = matplotlib.rcParams['patch.linewidth']
+    line_linewidth = matplotlib.rcParams['lines.linewidth']
+    styles = {
+        'outlines': {'facecolors': 'none', 'edgecolors': 'Black', 'linewidths': patch_linewidth},
+        'pupils': {'facecolors': 'Black', 'edgecolors': 'Black', 'linewidths': patch_linewidth},
+        'eyebrows': {'facecolors': 'none', 'edgecolors': 'Black', 'linewidths': line_linewidth}
+    }
+
+    collections = {}
+    for part, (vertices, codes) in face_paths(batch).items():
+        paths = [matplotlib.path.Path(face_vertices, codes) for face_vertices in vertices * scale]
+        collections[part] = matplotlib.collections.PathCollection(paths,
+                                                                  offsets=offsets,
+                                                                  offset_transform=ax.transData,
+                                                                  transform=transform,
+                                                                  **styles[part])
+        ax.add_collection(collections[part])
+    ax.autoscale_view()
+
+    return collections
+
+def face_paths(batch):
+    '''
+    Computes one compound path per face for each of the outlines (heads, noses, eyes and mouths), pupils
+    and eyebrows of a batch of faces, in face coordinates. Ellipses are drawn with cubic Bezier curves (as
+    matplotlib draws an `Ellipse`), and mouths with polylines. Every face has the same path codes.
+
+    Parameters:
+        batch (`FaceBatch`): The geometry of the faces.
+
+    Returns:
+        paths (dict): For each of 'outlines', 'pupils' and 'eyebrows', a tuple of an (N, V, 2) array of
+            the vertices of each face, and the V path codes shared by every face.
+    '''
+    circle = matplotlib.path.Path.unit_circle()
+    segment_codes = np.array([matplotlib.path.Path.MOVETO, matplotlib.path.Path.LINETO])
+    arc_codes = np.full(ARC_RESOLUTION, matplotlib.path.Path.LINETO)
+    arc_codes[0] = matplotlib.path.Path.MOVETO
+
+    def ellipses(centers, widths, heights, angles):
+        angles = np.radians(angles)[:, np.newaxis]
+        x = circle.vertices[:, 0] * widths[:, np.newaxis] / 2
+        y = circle.vertices[:, 1] * heights[:, np.newaxis] / 2
+        return np.stack([centers[:, 0:1] + x * np.cos(angles) - y * np.sin(angles),
+                         centers[:, 1:2] + x * np.sin(angles) + y * np.cos(angles)], axis=-1)
+
+    zeros = np.zeros(len(batch))
+    outlines = np.concatenate([ellipses(batch.head_center, batch.head_width, batch.head_height, zeros),
+                               ellipses(batch.nose_center, batch.nose_width, batch.nose_height, zeros),
+                               ellipses(batch.right_eye_center, batch.eye_width, batch.eye_height,
+                                        batch.right_eye_angle),
+                               ellipses(batch.left_eye_center, batch.eye_width, batch.eye_height,
+                                        batch.left_eye_angle),
+                               mouth_arcs(batch)], axis=1)
+    pupils = np.concatenate([ellipses(batch.right_pupil_center, 2 * batch.pupil_radius, 2 * batch.pupil_radius, zeros),
+                             ellipses(batch.left_pupil_center, 2 * batch.pupil_radius, 2 * batch.pupil_radius, zeros)],
+                            axis=1)
+
+    return {
+        'outlines': (outlines, np.concatenate([circle.codes] * 4 + [arc_codes])),
+        'pupils': (pupils, np.concatenate([circle.codes] * 2)),
+        'eyebrows': (np.concatenate([batch.right_eyebrow, batch.left_eyebrow], axis=1),
+                     np.concatenate([segment_codes] * 2))
+    }
+
+def plot_face_grid(ax, batch, ncols=None):
+    '''
+    Draws a batch of Chernoff Faces on the supplied axes, laid out in a grid of `ncols` columns, filled
+    left to right and top to bottom. The axes limits are set to fit the grid exactly.
+
+    Parameters:
+        ax (axes): The axes on which to plot the faces.
+        batch (`FaceBatch`): The geometry of the faces.
+        ncols (int): The number of columns in the grid. Defaults to a square grid.
+
+    Returns:
+        ax (axes): The axes containing the plotted faces.
+    '''
+    if ncols is None:
+        ncols = max(1, int(np.ceil(np.sqrt(len(batch)))))
+    nrows = max(1, int(np.ceil(len(batch) / ncols)))
+
+    plot_faces(ax, batch, grid_offsets(len(batch), ncols))
+
+    # Set axes limits to fit the grid, one 2x2 square per face
+    ax.set_xlim([-1, 2 * ncols - 1])
+    ax.set_ylim([-2 * nrows + 1, 1])
+    ax.set_aspect('equal')
+
+    # Axes formatting
+    ax.set_xticks([])
+    ax.set_yticks([])
+
+    return ax
+
+def grid_offsets(count, ncols):
+    '''
+    Returns the centers of `count` faces laid out in a grid of `ncols` columns, filled left to right and
+    top to bottom, with one 2x2 square per face and the first face centered on the origin.
+
+    Parameters:
+        count (int): The number of faces.
+        ncols (int): The number of columns in the grid.
+
+    Returns:
+        `numpy.ndarray`: An (count, 2) array of face centers.
+    '''
+    rows, cols = np.divmod(np.arange(count), ncols)
+    return np.column_stack([2.0 * cols, -2.0 * rows])
+
+def mouth_arcs(batch, resolution=ARC_RESOLUTION):
+    '''
+    Approximates the mouth arc of each face in the batch with a polyline, in face coordinates.
+
+    Parameters:
+        batch (`FaceBatch`): The geometry of the faces.
+        resolution (int): The number of points in each polyline.
+
+    Returns:
+        `numpy.ndarray`: An (N, resolution, 2) array of polylines.
+    '''
+    steps = np.linspace(0, 1, resolution)
+    theta = np.radians(batch.mouth_theta1[:, np.newaxis] +
+                       (batch.mouth_theta2 - batch.mouth_theta1)[:, np.newaxis] * steps)
+    x = batch.mouth_width[:, np.newaxis] / 2 * np.cos(theta)
+    y = batch.mouth_height[:, np.newaxis] / 2 * np.sin(theta)
+
+    angle = np.radians(batch.mouth_angle)[:, np.newaxis]
+    return np.stack([batch.mouth_center[:, 0:1] + x * np.cos(angle) - y * np.sin(angle),
+                     batch.mouth_center[:, 1:2] + x * np.sin(angle) + y * np.cos(angle)], axis=-1)
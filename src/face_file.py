@@ -0,0 +1,155 @@
+"""
+A compact binary file format for normalised Chernoff Faces, so that rendering jobs can skip reading and
+normalising the source data. A file holds the (N, 15) feature matrix of the faces, the feature map and
+normaliser state used to create them, and a label for each face:
+
+```
+magic       b'CFACES' followed by a format version byte and a NUL byte
+length      the length of the header, as a little endian uint32
+header      UTF-8 JSON: the dtype, shape and offset of each array, the feature names, feature map and
+            normaliser state
+padding     to the next multiple of 64 bytes
+features    the raw feature matrix, in C order
+padding     to the next multiple of 64 bytes
+labels      the raw labels (numbers, or fixed width unicode strings), if any
+```
+
+The arrays are stored raw and aligned, so loading a file memory maps them rather than reading them: it
+takes the same time whatever the size of the file, and only the pages of faces that are rendered are read.
+"""
+import json
+import struct
+
+import numpy as np
+
+from cface_array import CFaceArray
+from face_normaliser import FaceNormaliser
+
+MAGIC = b'CFACES'
+VERSION = 1
+ALIGNMENT = 64
+PREAMBLE_LENGTH = len(MAGIC) + 2 + 4
+# Arrays are written this many bytes at a time, so saving memory mapped faces does not read them in whole
+WRITE_CHUNKSIZE = 1 << 24
+
+class FaceFile():
+    '''
+    Chernoff Faces ready to be rendered, along with how they were created:
+    faces : The faces, as a `CFaceArray`.
+    labels : A label for each face (eg. to pass as `names` to `face_render.render_pages`), or None.
+    feature_map : The mapping between features and source columns used to create the faces, or None.
+    normaliser : The `FaceNormaliser` used to normalise the source data, or None. Keeping it means new
+        rows can be normalised consistently with the saved faces.
+    '''
+
+    def __init__(self, faces, labels=None, feature_map=None, normaliser=None):
+        '''
+        Parameters:
+            faces (`CFaceArray` or array_like): The faces, or an (N, 15) matrix of their features.
+            labels (array_like): A label for each face: numbers or strings.
+            feature_map (dict): The mapping between features and source columns.
+            normaliser (`FaceNormaliser`): The normaliser used to normalise the source data.
+        '''
+        if not isinstance(faces, CFaceArray):
+            faces = CFaceArray(faces)
+        if labels is not None:
+            labels = np.asarray(labels)
+            if labels.shape != (len(faces),):
+                raise ValueError(f'labels must have one label per face ({len(faces)}), not shape {labels.shape}')
+        self.faces = faces
+        self.labels = labels
+        self.feature_map = feature_map
+        self.normaliser = normaliser
+
+    def save(self, path):
+        '''
+        Writes the faces to a file.
+
+        Parameters:
+            path (str): The path of the file.
+        '''
+        features = self.faces.features
+        arrays = [('features', features)]
+        if self.labels is not None:
+            labels = self.labels
+            if labels.dtype.kind not in 'biufU':
+                labels = labels.astype(str)
+            arrays.append(('labels', labels))
+
+        header = {
+            'version': VERSION,
+            'feature_names': CFaceArray.feature_names,
+            'feature_map': self.feature_map,
+            'normaliser': None if self.normaliser is None else self.normaliser.get_state()
+        }
+        # The offsets of the arrays depend on the length of the header, which depends on the offsets
+        data_start = 0
+        while True:
+            offset = data_start
+            for name, array in arrays:
+                header[name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+                offset = _align(offset + array.nbytes)
+            encoded = json.dumps(header).encode('utf-8')
+            if _align(PREAMBLE_LENGTH + len(encoded)) <= data_start:
+                break
+            data_start = _align(PREAMBLE_LENGTH + len(encoded))
+
+        with open(path, 'wb') as file:
+            file.write(MAGIC + bytes([VERSION, 0]) + struct.pack('<I', len(encoded)) + encoded)
+            for name, array in arrays:
+                file.write(b'\0' * (header[name]['offset'] - file.tell()))
+                _write_array(file, array)
+
+    @staticmethod
+    def load(path, mmap=True):
+        '''
+        Loads faces saved with `save`.
+
+        Parameters:
+            path (str): The path of the file.
+            mmap (bool): default: True
+                Whether to memory map the arrays (read only) rather than read them into memory.
+
+        Returns:
+            `FaceFile`: The faces.
+        '''
+        with open(path, 'rb') as file:
+            preamble = file.read(PREAMBLE_LENGTH)
+            if preamble[:len(MAGIC)] != MAGIC:
+                raise ValueError(f'{path} is not a Chernoff Faces file')
+            if preamble[len(MAGIC)] > VERSION:
+                raise ValueError(f'{path} has format version {preamble[len(MAGIC)]}, newer than {VERSION}')
+            length, = struct.unpack('<I', preamble[len(MAGIC) + 2:])
+            header = json.loads(file.read(length).decode('utf-8'))
+
+        if header['feature_names'] != CFaceArray.feature_names:
+            raise ValueError(f'{path} has features {header["feature_names"]}, not {CFaceArray.feature_names}')
+
+        def read(name):
+            spec = header.get(name)
+            if spec is None:
+                return None
+            dtype = np.dtype(spec['dtype'])
+            if mmap and np.prod(spec['shape']):
+                return np.memmap(path, dtype=dtype, mode='r', offset=spec['offset'], shape=tuple(spec['shape']))
+            with open(path, 'rb') as file:
+                file.seek(spec['offset'])
+                return np.fromfile(file, dtype=dtype, count=int(np.prod(spec['shape']))).reshape(spec['shape'])
+
+        features = read('features')
+        return FaceFile(CFaceArray(features, dtype=features.dtype, validate=False),
+                        labels=read('labels'),
+                        feature_map=header['feature_map'],
+                        normaliser=None if header['normaliser'] is None
+                        else FaceNormaliser.from_state(header['normaliser']))
+
+def _write_array(file, array):
+    '''
+    Writes the raw bytes of an array in C order, WRITE_CHUNKSIZE bytes (of whole rows) at a time.
+    '''
+    rows = max(1, WRITE_CHUNKSIZE // max(1, array[:1].nbytes))
+    for start in range(0, len(array), rows):
+        file.write(np.ascontiguousarray(array[start:start + rows]).data)
+
+def _align(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
@@ -0,0 +1,132 @@
+"""
+Level of detail rendering for many Chernoff Faces on one interactive `Axes`. `FaceLOD` draws faces through
+shared collections (as `face_collections.plot_faces` does), but only the faces inside the current view,
+and only in as much detail as their size on screen can show: a dot when a face is a few pixels across,
+the outline of the head when it is small, and the full face when zoomed in. The geometry of every level
+is computed once, up front, and the collections are only rebuilt when a pan, zoom or resize changes the
+level or the set of visible faces.
+"""
+import matplotlib.collections
+import numpy as np
+
+from face_collections import face_parts, part_collections, select_parts
+
+DOT_SIZE = 4
+DETAIL_SIZE = 32
+
+class FaceLOD():
+    '''
+    A batch of Chernoff Faces drawn on an `Axes` with level of detail. The level depends on the size of a
+    face on screen, in pixels:
+    'dots' : Smaller than `dot_size`, each face is drawn as a single dot.
+    'outlines' : Smaller than `detail_size`, each face is drawn as the outline of its head.
+    'faces' : Otherwise, every part of each face is drawn.
+
+    The faces follow the axes as they are panned, zoomed and resized, until `remove` is called.
+    '''
+
+    def __init__(self, ax, batch, offsets, dot_size=DOT_SIZE, detail_size=DETAIL_SIZE):
+        '''
+        Draws a batch of Chernoff Faces on the supplied axes, with the center of each face placed at the
+        matching offset (in data coordinates), at a scale of one data unit per face unit.
+
+        Parameters:
+            ax (axes): The axes on which to plot the faces.
+            batch (`FaceBatch`): The geometry of the faces.
+            offsets (array_like): An (N, 2) array of face centers, one per face in the batch.
+            dot_size (float): The size of a face on screen, in pixels, below which faces are drawn as dots.
+            detail_size (float): The size of a face on screen, in pixels, below which faces are drawn as
+                outlines.
+        '''
+        self.ax = ax
+        self.dot_size = dot_size
+        self.detail_size = detail_size
+        self.parts = face_parts(batch, offsets)
+        self.offsets = self.parts['heads']['centers']
+        self.level = None
+        self.visible = None
+        self.collections = {}
+
+        self._callback_ids = [ax.callbacks.connect('xlim_changed', self._on_view_changed),
+                              ax.callbacks.connect('ylim_changed', self._on_view_changed)]
+        self._resize_id = ax.figure.canvas.mpl_connect('resize_event', self._on_view_changed)
+        self.update()
+
+    def face_size(self):
+        '''
+        Returns:
+            float: The size of a face on screen, in pixels.
+        '''
+        corners = self.ax.transData.transform([[0, 0], [2, 2]])
+        return np.abs(corners[1] - corners[0]).min()
+
+    def visible_faces(self):
+        '''
+        Returns:
+            `numpy.ndarray`: A boolean mask of the faces that overlap the current view.
+        '''
+        x_min, x_max = sorted(self.ax.get_xlim())
+        y_min, y_max = sorted(self.ax.get_ylim())
+        x = self.offsets[:, 0]
+        y = self.offsets[:, 1]
+        return (x + 1 > x_min) & (x - 1 < x_max) & (y + 1 > y_min) & (y - 1 < y_max)
+
+    def update(self):
+        '''
+        Redraws the faces for the current view, if the level of detail or the set of visible faces has
+        changed. This is called automatically when the axes are panned, zoomed or resized.
+
+        Returns:
+            collections (dict): The collections on the axes, keyed by face part ('dots' at the lowest
+                level of detail).
+        '''
+        size = self.face_size()
+        if size < self.dot_size:
+            level = 'dots'
+        elif size < self.detail_size:
+            level = 'outlines'
+        else:
+            level = 'faces'
+        visible = self.visible_faces()
+        if level == self.level and np.array_equal(visible, self.visible):
+            return self.collections
+
+        self._remove_collections()
+        if level == 'dots':
+            diameter = self.dot_size * 72 / self.ax.figure.dpi
+            self.collections = {
+                'dots': matplotlib.collections.CircleCollection([np.pi / 4 * diameter ** 2],
+                                                                offsets=self.offsets[visible],
+                                                                offset_transform=self.ax.transData,
+                                                                facecolors='Black',
+                                                                edgecolors='none')
+            }
+        elif level == 'outlines':
+            self.collections = part_collections(self.ax, select_parts({'heads': self.parts['heads']}, visible))
+        else:
+            self.collections = part_collections(self.ax, select_parts(self.parts, visible))
+        for collection in self.collections.values():
+            self.ax.add_collection(collection, autolim=False)
+
+        self.level = level
+        self.visible = visible
+        return self.collections
+
+    def remove(self):
+        '''
+        Removes the faces from the axes, and stops following changes to the view.
+        '''
+        for callback_id in self._callback_ids:
+            self.ax.callbacks.disconnect(callback_id)
+        self.ax.figure.canvas.mpl_disconnect(self._resize_id)
+        self._remove_collections()
+        self.level = None
+        self.visible = None
+
+    def _on_view_changed(self, _):
+        self.update()
+
+    def _remove_collections(self):
+        for collection in self.collections.values():
+            collection.remove()
+        self.collections = {}
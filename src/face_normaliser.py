@@ -0,0 +1,417 @@
+"""
+`FaceNormaliser` normalises DataFrames for Chernoff Face creation, as `CFace.normalise_df` does, but keeps
+the range of each column so that it can be reused. New batches of rows can be normalised with the same
+ranges (so faces stay comparable between batches), the ranges can be updated incrementally with
+`partial_fit`, and the normaliser can be saved to and loaded from disk.
+
+Besides min-max scaling, the normaliser has two modes that are robust to outliers, both backed by a
+`QuantileSketch` of each column (so they also work chunk by chunk, and normalisers fitted in parallel can be
+merged): 'quantile' scales each column between two quantiles and clips values outside them, and 'rank'
+replaces each value with its estimated rank within the column.
+"""
+import copy
+import json
+
+import numpy as np
+
+from cface import CFace
+from quantile_sketch import DEFAULT_K, QuantileSketch
+
+MODES = ('minmax', 'quantile', 'rank')
+DEFAULT_QUANTILES = (0.01, 0.99)
+# The number of columns converted to a float64 matrix at a time while fitting, which bounds peak memory on wide
+# DataFrames
+COLUMN_CHUNKSIZE = 16
+
+class FaceNormaliser():
+    '''
+    Normalises the numeric columns of DataFrames to the range 0 to 1, using the minimum and maximum of
+    each column seen while fitting (or, depending on the mode, its quantiles or ranks). Non numeric columns
+    are ignored, and a column only counts as numeric if it was numeric in every batch it was fitted on.
+
+    After fitting, the normaliser has the following attributes:
+    columns : The names of the numeric columns, in DataFrame order.
+    data_min : The minimum of each numeric column.
+    data_max : The maximum of each numeric column.
+    feature_map : A mapping between Chernoff Face features and columns, as returned by `CFace.normalise_df`.
+        This can be edited to adjust the mappings manually.
+    rows_seen : The number of rows fitted.
+    sketches : A `QuantileSketch` of each numeric column ('quantile' and 'rank' modes only).
+    '''
+
+    def __init__(self, clip=True, mode='minmax', quantiles=DEFAULT_QUANTILES, sketch_size=DEFAULT_K):
+        '''
+        Parameters:
+            clip (bool): default: True
+                Whether to clip normalised values to the range 0 to 1. Values outside the fitted range
+                of a column (eg. in a new batch of rows) would otherwise fall outside that range. Values
+                are always clipped in the 'quantile' and 'rank' modes.
+            mode (str): default: 'minmax'
+                How to normalise each column: 'minmax' scales between the minimum and maximum, 'quantile'
+                scales between the `quantiles` of the column (so a few outliers don't squash the rest of
+                the column into a narrow band), and 'rank' maps each value to its rank within the column.
+            quantiles (tuple): default: (0.01, 0.99)
+                The lower and upper quantiles used in 'quantile' mode.
+            sketch_size (int): default: 200
+                The size of the quantile sketches used in the 'quantile' and 'rank' modes. Quantiles and ranks
+                are accurate to about `1.7 / sketch_size`, and each sketch keeps about `3 * sketch_size`
+                values.
+        '''
+        if mode not in MODES:
+            raise ValueError(f'mode must be one of {", ".join(MODES)}, not {mode}')
+        if not 0 <= quantiles[0] < quantiles[1] <= 1:
+            raise ValueError(f'quantiles must be increasing and within the range 0 to 1, not {quantiles}')
+        self.clip = clip
+        self.mode = mode
+        self.quantiles = tuple(quantiles)
+        self.sketch_size = sketch_size
+        self.columns = None
+        self.data_min = None
+        self.data_max = None
+        self.feature_map = {}
+        self.rows_seen = 0
+        self.sketches = None
+
+    def fit(self, df):
+        '''
+        Computes the range of each numeric column of the DataFrame, discarding any previous fit.
+
+        Parameters:
+            df (`pandas.DataFrame`): A DataFrame of data to be normalised.
+
+        Returns:
+            `FaceNormaliser`: The fitted normaliser.
+        '''
+        self.columns = None
+        self.data_min = None
+        self.data_max = None
+        self.feature_map = {}
+        self.rows_seen = 0
+        self.sketches = None
+        return self.partial_fit(df)
+
+    def partial_fit(self, df):
+        '''
+        Updates the range of each numeric column with a new batch of rows. The cost depends only on the
+        size of the batch.
+
+        Parameters:
+            df (`pandas.DataFrame`): A batch of data to be normalised.
+
+        Returns:
+            `FaceNormaliser`: The fitted normaliser.
+        '''
+        from pandas.api.types import is_numeric_dtype
+
+        if self.columns is None:
+            self._start([column_name for column_name in df if is_numeric_dtype(df[column_name])])
+
+        # A column that is not numeric in any one batch is not numeric
+        self._keep_columns([is_numeric_dtype(df[column_name]) for column_name in self.columns])
+
+        for start in range(0, len(self.columns) if len(df) else 0, COLUMN_CHUNKSIZE):
+            columns = self.columns[start:start+COLUMN_CHUNKSIZE]
+            self._update(df[columns].to_numpy(dtype=np.float64), slice(start, start + len(columns)))
+        self.rows_seen += len(df)
+        return self
+
+    def partial_fit_values(self, values, columns):
+        '''
+        Updates the range of each column with a new batch of rows supplied as a matrix rather than a
+        DataFrame, eg. a chunk of a memory mapped array (see `face_arrays`). Every column of the matrix is
+        numeric, so only fitted columns missing from `columns` are dropped.
+
+        Parameters:
+            values (`numpy.ndarray`): An (N, len(columns)) matrix of data to be normalised.
+            columns (list): The names of the columns of the matrix.
+
+        Returns:
+            `FaceNormaliser`: The fitted normaliser.
+        '''
+        columns = list(columns)
+        if self.columns is None:
+            self._start(columns)
+        self._keep_columns([column in columns for column in self.columns])
+
+        if len(values) and self.columns:
+            self._update(np.asarray(values, dtype=np.float64)[:, [columns.index(column) for column in self.columns]])
+        self.rows_seen += len(values)
+        return self
+
+    def merge(self, other):
+        '''
+        Updates the normaliser with the fit of another normaliser of the same mode, eg. one fitted on
+        another part of the data in a parallel worker. Only columns that are numeric in both are kept.
+
+        Parameters:
+            other (`FaceNormaliser`): The fitted normaliser to merge.
+
+        Returns:
+            `FaceNormaliser`: The merged normaliser.
+        '''
+        if other.mode != self.mode:
+            raise ValueError(f'cannot merge a {other.mode} normaliser into a {self.mode} normaliser')
+        if other.columns is None:
+            return self
+        if self.columns is None:
+            self.columns = list(other.columns)
+            self.data_min = other.data_min.copy()
+            self.data_max = other.data_max.copy()
+            self.feature_map = dict(other.feature_map)
+            self.sketches = copy.deepcopy(other.sketches)
+            self.rows_seen += other.rows_seen
+            return self
+
+        # A column missing from either normaliser was not numeric in every batch
+        other_index = {column: i for i, column in enumerate(other.columns)}
+        self._keep_columns([column in other_index for column in self.columns])
+
+        other_columns = [other_index[column] for column in self.columns]
+        self.data_min = np.fmin(self.data_min, other.data_min[other_columns])
+        self.data_max = np.fmax(self.data_max, other.data_max[other_columns])
+        if self.sketches is not None:
+            for sketch, i in zip(self.sketches, other_columns):
+                sketch.merge(other.sketches[i])
+        self.rows_seen += other.rows_seen
+        return self
+
+    def transform(self, df, inplace=False, mapped_only=False, dtype=np.float64):
+        '''
+        Returns a copy of the DataFrame with the fitted columns normalised to the range 0 to 1. Columns are
+        normalised one at a time, so besides the output only one column of temporary values is held.
+
+        Parameters:
+            df (`pandas.DataFrame`): A DataFrame with (at least) the fitted columns.
+            inplace (bool): default: False
+                Whether to replace the fitted columns of `df` itself rather than copying the whole DataFrame
+                (including the columns that are not normalised).
+            mapped_only (bool): default: False
+                Whether to return only the columns in `feature_map` (in DataFrame order), rather than a copy of
+                every column. Takes precedence over `inplace`.
+            dtype (`numpy.dtype`): default: float64
+                The dtype of the normalised columns, eg. float32 to halve their memory. Constant integer
+                columns keep their dtype.
+
+        Returns:
+            `pandas.DataFrame`: A normalised DataFrame (`df` itself, if normalised in place).
+        '''
+        if self.columns is None:
+            raise ValueError('FaceNormaliser must be fitted before transforming')
+
+        if mapped_only:
+            mapped = set(self.feature_map.values())
+            columns = [column for column in self.columns if column in mapped]
+            normalised_df = df.iloc[:, :0].copy()
+        else:
+            columns = self.columns
+            normalised_df = df if inplace else df.copy()
+        # Computed once rather than per column: the quantiles in 'quantile' mode are computed for every column
+        positions = {column: i for i, column in enumerate(self.columns)}
+        limits = None if self.mode == 'rank' else self.data_range()
+        for column in columns:
+            normalised = None
+            if self.mode == 'minmax' and isinstance(df[column].dtype, np.dtype) and df[column].dtype.kind in 'iu':
+                normalised = self._normalise_integers(df[column].to_numpy(), positions[column], limits, dtype)
+            if normalised is None:
+                values = df[column].to_numpy(dtype=np.float64)[:, np.newaxis]
+                normalised = self._normalise(values, [positions[column]], limits)[:, 0].astype(dtype, copy=False)
+            if not mapped_only and normalised_df[column].dtype == normalised.dtype:
+                # Write into the existing column: replacing it would allocate a new column while the block
+                # holding the old one stays alive, so a whole DataFrame's worth of columns would build up
+                normalised_df.loc[:, column] = normalised
+            else:
+                normalised_df[column] = normalised
+        return normalised_df
+
+    def transform_values(self, values, out=None, columns=None):
+        '''
+        Normalises a matrix of fitted columns to the range 0 to 1.
+
+        Parameters:
+            values (`numpy.ndarray`): An (N, len(columns)) matrix of data to be normalised.
+            out (`numpy.ndarray`): An optional (N, len(columns)) array to write the normalised values to,
+                eg. a slice of a memory mapped file. This may be `values` itself.
+            columns (list): The names of the columns of the matrix, any of the fitted columns in any order.
+                Defaults to `columns`.
+
+        Returns:
+            `numpy.ndarray`: The normalised values (`out`, if supplied).
+        '''
+        if self.columns is None:
+            raise ValueError('FaceNormaliser must be fitted before transforming')
+        if columns is None:
+            index = slice(None)
+        else:
+            positions = {column: i for i, column in enumerate(self.columns)}
+            missing = [column for column in columns if column not in positions]
+            if missing:
+                raise ValueError(f'columns not fitted: {", ".join(map(str, missing))}')
+            index = [positions[column] for column in columns]
+
+        normalised = self._normalise(np.asarray(values, dtype=np.float64), index,
+                                     None if self.mode == 'rank' else self.data_range())
+        if out is None:
+            return normalised
+        out[...] = normalised
+        return out
+
+    def _normalise(self, values, index, limits):
+        '''
+        Normalises a float64 matrix of the fitted columns selected by `index`, given the `data_range` of every
+        fitted column (None in 'rank' mode).
+        '''
+        if self.mode == 'rank':
+            sketches = self.sketches[index] if isinstance(index, slice) else [self.sketches[i] for i in index]
+            if not sketches:
+                return np.empty((len(values), 0))
+            return np.column_stack([sketch.rank(column_values) for sketch, column_values in zip(sketches, values.T)])
+        data_min, data_max = limits
+        normalised = CFace._normalise_values(values, data_min[index], data_max[index] - data_min[index])
+        if self.clip or self.mode == 'quantile':
+            np.clip(normalised, 0, 1, out=normalised)
+        return normalised
+
+    def _normalise_integers(self, values, i, limits, dtype):
+        '''
+        Normalises an integer column exactly, if its minimum and maximum are those fitted for the column (as
+        when fitting and transforming the same DataFrame): converting large integers to float64 before
+        subtracting the minimum would lose their precision. A constant column normalises to integer 1s, as
+        in `CFace.normalise_df` from the start. Returns None if the column doesn't span its fitted range.
+        '''
+        data_min, data_max = limits
+        if not len(values) or values.min() != data_min[i] or values.max() != data_max[i]:
+            return None
+        low = values.min()
+        # Viewed as unsigned, the wrapped difference is exact even for ranges too large for a signed integer
+        offsets = (values - low).view(f'u{values.itemsize}')
+        old_range = offsets.max()
+        if old_range == 0:
+            return np.ones(len(values), dtype=values.dtype)
+        return (offsets / old_range).astype(dtype, copy=False)
+
+    def data_range(self):
+        '''
+        Returns:
+            data_min (`numpy.ndarray`): The value of each numeric column that normalises to 0: its minimum,
+                or its lower quantile in 'quantile' mode.
+            data_max (`numpy.ndarray`): The value of each numeric column that normalises to 1: its maximum,
+                or its upper quantile in 'quantile' mode.
+        '''
+        if self.mode != 'quantile':
+            return self.data_min, self.data_max
+        limits = np.array([sketch.quantile(self.quantiles) for sketch in self.sketches]).reshape(-1, 2)
+        return limits[:, 0], limits[:, 1]
+
+    def fit_transform(self, df, **kwargs):
+        '''
+        Fits the normaliser to the DataFrame and returns it normalised.
+
+        Parameters:
+            df (`pandas.DataFrame`): A DataFrame of data to be normalised.
+            **kwargs: Passed on to `transform` (eg. `inplace`, `mapped_only`, `dtype`).
+
+        Returns:
+            `pandas.DataFrame`: A normalised DataFrame.
+        '''
+        return self.fit(df).transform(df, **kwargs)
+
+    def _start(self, columns):
+        '''
+        Starts fitting the supplied numeric columns.
+        '''
+        self.columns = columns
+        self.data_min = np.full(len(self.columns), np.nan)
+        self.data_max = np.full(len(self.columns), np.nan)
+        self.feature_map = dict(zip(CFace.feature_ranges, self.columns))
+        if self.mode != 'minmax':
+            self.sketches = [QuantileSketch(self.sketch_size) for _ in self.columns]
+
+    def _keep_columns(self, keep):
+        '''
+        Drops the fitted columns that are not flagged in `keep`, recomputing the feature map if any are dropped.
+        '''
+        if all(keep):
+            return
+        self.columns = [column for column, kept in zip(self.columns, keep) if kept]
+        self.data_min = self.data_min[keep]
+        self.data_max = self.data_max[keep]
+        self.feature_map = dict(zip(CFace.feature_ranges, self.columns))
+        if self.sketches is not None:
+            self.sketches = [sketch for sketch, kept in zip(self.sketches, keep) if kept]
+
+    def _update(self, values, index=slice(None)):
+        '''
+        Updates the range (and sketch) of each fitted column, or the fitted columns selected by `index`, with a
+        matrix of values.
+        '''
+        self.data_min[index] = np.fmin(self.data_min[index], np.fmin.reduce(values, axis=0))
+        self.data_max[index] = np.fmax(self.data_max[index], np.fmax.reduce(values, axis=0))
+        if self.sketches is not None:
+            for sketch, column_values in zip(self.sketches[index], values.T):
+                sketch.update(column_values)
+
+    def save(self, path):
+        '''
+        Saves the state of the normaliser to a JSON file.
+
+        Parameters:
+            path (str): The path of the file.
+        '''
+        with open(path, 'w') as file:
+            json.dump(self.get_state(), file, indent=2)
+
+    @staticmethod
+    def load(path):
+        '''
+        Loads a normaliser saved with `save`.
+
+        Parameters:
+            path (str): The path of the file.
+
+        Returns:
+            `FaceNormaliser`: The normaliser.
+        '''
+        with open(path) as file:
+            return FaceNormaliser.from_state(json.load(file))
+
+    def get_state(self):
+        '''
+        Returns:
+            dict: The state of the normaliser, containing only JSON serialisable values.
+        '''
+        return {
+            'clip': self.clip,
+            'mode': self.mode,
+            'quantiles': list(self.quantiles),
+            'sketch_size': self.sketch_size,
+            'columns': self.columns,
+            'data_min': None if self.data_min is None else self.data_min.tolist(),
+            'data_max': None if self.data_max is None else self.data_max.tolist(),
+            'feature_map': self.feature_map,
+            'rows_seen': self.rows_seen,
+            'sketches': None if self.sketches is None else [sketch.get_state() for sketch in self.sketches]
+        }
+
+    @staticmethod
+    def from_state(state):
+        '''
+        Creates a normaliser from a state returned by `get_state`.
+
+        Parameters:
+            state (dict): The state of the normaliser.
+
+        Returns:
+            `FaceNormaliser`: The normaliser.
+        '''
+        normaliser = FaceNormaliser(clip=state['clip'],
+                                    mode=state.get('mode', 'minmax'),
+                                    quantiles=state.get('quantiles', DEFAULT_QUANTILES),
+                                    sketch_size=state.get('sketch_size', DEFAULT_K))
+        normaliser.columns = state['columns']
+        normaliser.data_min = None if state['data_min'] is None else np.array(state['data_min'], dtype=np.float64)
+        normaliser.data_max = None if state['data_max'] is None else np.array(state['data_max'], dtype=np.float64)
+        normaliser.feature_map = state['feature_map']
+        normaliser.rows_seen = state['rows_seen']
+        if state.get('sketches') is not None:
+            normaliser.sketches = [QuantileSketch.from_state(sketch) for sketch in state['sketches']]
+        return normaliser
@@ -0,0 +1,163 @@
+"""
+Opt-in instrumentation of the stages of the Chernoff Face pipeline: normalisation (`normalise_df`), face
+construction (`create_cface_from_row`), geometry scaling (inside `CFace.plot`) and drawing (the
+`add_artist` calls inside `CFace.plot`). While a `Profiler` is active, each stage records its call count,
+cumulative time and the change in memory allocated (via tracemalloc). When no profiler is active, stages
+cost a single function call.
+
+```
+with profile() as profiler:
+    df_faces, feature_map = CFace.normalise_df(df)
+    ...
+print(profiler.report())
+```
+"""
+import functools
+import threading
+import time
+import tracemalloc
+from contextlib import nullcontext
+
+_profilers = []
+_NOT_PROFILING = nullcontext()
+# Profilers tracing memory share tracemalloc: it is only stopped when the last of them exits (and only if a
+# profiler started it), however their `with` blocks interleave
+_tracing_lock = threading.Lock()
+_tracing_profilers = 0
+_started_tracemalloc = False
+
+class Profiler():
+    '''
+    Records per-stage statistics while active (ie. inside a `with` block), including stages run in other
+    threads. `stats` is a dict keyed by stage name, with each value a dict of:
+    calls : The number of times the stage ran.
+    time : The cumulative time spent in the stage, in seconds.
+    memory : The cumulative change in memory allocated by the stage, in bytes (0 unless `trace_memory`).
+    '''
+
+    def __init__(self, callback=None, trace_memory=True):
+        '''
+        Parameters:
+            callback (callable): Called as `callback(stage, elapsed, memory)` every time a stage finishes.
+            trace_memory (bool): default: True
+                Whether to record memory allocation deltas, starting tracemalloc if it is not already
+                running. Tracing memory slows down the profiled code.
+        '''
+        self.callback = callback
+        self.trace_memory = trace_memory
+        self.stats = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        global _tracing_profilers, _started_tracemalloc
+        if self.trace_memory:
+            with _tracing_lock:
+                if not _tracing_profilers and not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                    _started_tracemalloc = True
+                _tracing_profilers += 1
+        _profilers.append(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        global _tracing_profilers, _started_tracemalloc
+        _profilers.remove(self)
+        if self.trace_memory:
+            with _tracing_lock:
+                _tracing_profilers -= 1
+                if not _tracing_profilers and _started_tracemalloc:
+                    tracemalloc.stop()
+                    _started_tracemalloc = False
+
+    def record(self, stage_name, elapsed, memory):
+        '''
+        Adds a single run of a stage to the statistics.
+
+        Parameters:
+            stage_name (str): The name of the stage.
+            elapsed (float): The time the stage took, in seconds.
+            memory (int): The change in memory allocated during the stage, in bytes.
+        '''
+        with self._lock:
+            stats = self.stats.setdefault(stage_name, {'calls': 0, 'time': 0.0, 'memory': 0})
+            stats['calls'] += 1
+            stats['time'] += elapsed
+            stats['memory'] += memory
+        if self.callback is not None:
+            self.callback(stage_name, elapsed, memory)
+
+    def report(self):
+        '''
+        Returns:
+            str: A table of the statistics of each stage, slowest first.
+        '''
+        lines = [f'{"stage":<24} {"calls":>8} {"time (s)":>10} {"memory (KiB)":>13}']
+        for stage_name, stats in sorted(self.stats.items(), key=lambda item: -item[1]['time']):
+            lines.append(f'{stage_name:<24} {stats["calls"]:>8} {stats["time"]:>10.4f} '
+                         f'{stats["memory"] / 1024:>13.1f}')
+        return '\n'.join(lines)
+
+class _Stage():
+    '''
+    Times a single run of a stage, and records it with every active profiler.
+    '''
+
+    __slots__ = ('name', 'start', 'memory')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.memory = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.start
+        memory = tracemalloc.get_traced_memory()[0] - self.memory if tracemalloc.is_tracing() else 0
+        # A copy, as another thread may enter or leave a profiler meanwhile
+        for profiler in tuple(_profilers):
+            profiler.record(self.name, elapsed, memory if profiler.trace_memory else 0)
+
+def profile(callback=None, trace_memory=True):
+    '''
+    Returns a new `Profiler`, to be used as a context manager.
+
+    Parameters:
+        callback (callable): Called as `callback(stage, elapsed, memory)` every time a stage finishes.
+        trace_memory (bool): Whether to record memory allocation deltas.
+
+    Returns:
+        `Profiler`
+    '''
+    return Profiler(callback, trace_memory)
+
+def stage(name):
+    '''
+    Returns a context manager that instruments a stage of the pipeline. When no profiler is active,
+    this is a shared no-op context manager.
+
+    Parameters:
+        name (str): The name of the stage.
+    '''
+    if not _profilers:
+        return _NOT_PROFILING
+    return _Stage(name)
+
+def instrumented(name):
+    '''
+    Decorates a function so that each call is instrumented as a stage of the pipeline. When no profiler
+    is active, the function is called directly.
+
+    Parameters:
+        name (str): The name of the stage.
+    '''
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _profilers:
+                return function(*args, **kwargs)
+            with _Stage(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
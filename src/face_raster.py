@@ -0,0 +1,130 @@
+"""
+A rasterizer for Chernoff Face thumbnails built only on NumPy. Each face part is drawn by evaluating its
+(approximate) signed distance over the pixel grid, for a whole batch of faces at once, and converting the
+distance to anti-aliased coverage. The output approximates what `CFace.plot` draws with matplotlib's Agg
+backend, without needing to import matplotlib.
+"""
+import numpy as np
+
+from cface import CFace
+from face_batch import FaceBatch
+
+DEFAULT_CHUNKSIZE = 256
+
+def rasterize(faces, size=64, dpi=100, chunksize=DEFAULT_CHUNKSIZE):
+    '''
+    Rasterizes Chernoff Faces to greyscale thumbnails of `size` by `size` pixels, each covering the
+    square -1 to 1 in face coordinates (the same area as the axes that `CFace.plot` draws on). Faces are
+    drawn in black on white.
+
+    Line widths follow matplotlib's defaults (1 point for the outlines, 1.5 points for the eyebrows) at
+    the given `dpi`, so a thumbnail is comparable to `CFace.plot` drawn on a `size / dpi` inch figure.
+
+    Parameters:
+        faces (`CFaceArray` or array_like): The faces to draw, or an (N, 15) matrix of their features.
+        size (int): The width and height of each thumbnail, in pixels.
+        dpi (float): The resolution used to convert line widths from points to pixels.
+        chunksize (int): The number of faces rasterized at a time, which bounds the memory used.
+
+    Returns:
+        `numpy.ndarray`: An (N, size, size) uint8 array, where 0 is black and 255 is white.
+    '''
+    features = np.asarray(getattr(faces, 'features', faces))
+    images = np.empty((len(features), size, size), dtype=np.uint8)
+    for start in range(0, len(features), chunksize):
+        batch = FaceBatch(features[start:start + chunksize], CFace.feature_ranges)
+        images[start:start + len(batch)] = _rasterize_batch(batch, size, dpi)
+    return images
+
+def _rasterize_batch(batch, size, dpi):
+    '''
+    Rasterizes every face in a batch, returning an (N, size, size) uint8 array.
+    '''
+    # Pixel centers in face coordinates, with y increasing upwards
+    pixel = 2 / size
+    coordinates = (np.arange(size, dtype=np.float32) + 0.5) * pixel - 1
+    x = coordinates[np.newaxis, np.newaxis, :]
+    y = -coordinates[np.newaxis, :, np.newaxis]
+
+    outline_width = 1.0 * dpi / 72 * pixel
+    eyebrow_width = 1.5 * dpi / 72 * pixel
+
+    def column(values):
+        return np.asarray(values, dtype=np.float32)[:, np.newaxis, np.newaxis]
+
+    def stroke(distance, width):
+        return np.clip((width / 2 - np.abs(distance)) / pixel + 0.5, 0, 1)
+
+    def ellipse(center, width, height, angle):
+        return stroke(_ellipse_distance(x - column(center[:, 0]), y - column(center[:, 1]),
+                                        column(width / 2), column(height / 2), column(np.radians(angle))),
+                      outline_width)
+
+    def disc(center, radius):
+        distance = np.hypot(x - column(center[:, 0]), y - column(center[:, 1])) - column(radius)
+        return np.clip((outline_width / 2 - distance) / pixel + 0.5, 0, 1)
+
+    def segment(segments):
+        return stroke(_segment_distance(x, y, column(segments[:, 0, 0]), column(segments[:, 0, 1]),
+                                        column(segments[:, 1, 0]), column(segments[:, 1, 1])),
+                      eyebrow_width)
+
+    coverages = [
+        ellipse(batch.nose_center, batch.nose_width, batch.nose_height, np.zeros(len(batch))),
+        ellipse(batch.head_center, batch.head_width, batch.head_height, np.zeros(len(batch))),
+        ellipse(batch.right_eye_center, batch.eye_width, batch.eye_height, batch.right_eye_angle),
+        ellipse(batch.left_eye_center, batch.eye_width, batch.eye_height, batch.left_eye_angle),
+        disc(batch.right_pupil_center, batch.pupil_radius),
+        disc(batch.left_pupil_center, batch.pupil_radius),
+        segment(batch.right_eyebrow),
+        segment(batch.left_eyebrow),
+        stroke(_arc_distance(x - column(batch.mouth_center[:, 0]), y - column(batch.mouth_center[:, 1]),
+                             column(batch.mouth_width / 2),
+                             column(np.radians(batch.mouth_angle + batch.mouth_theta1)),
+                             column(np.radians(batch.mouth_theta2 - batch.mouth_theta1))),
+               outline_width)
+    ]
+
+    # Composite the parts as black ink with alpha equal to coverage
+    background = np.ones((len(batch), size, size), dtype=np.float32)
+    for coverage in coverages:
+        background *= 1 - coverage
+    return np.rint(background * 255).astype(np.uint8)
+
+def _ellipse_distance(dx, dy, a, b, angle):
+    '''
+    The approximate signed distance to the boundary of an ellipse with semi-axes a and b, rotated by angle
+    (radians), from points offset (dx, dy) from its center.
+    '''
+    cos = np.cos(angle)
+    sin = np.sin(angle)
+    u = dx * cos + dy * sin
+    v = -dx * sin + dy * cos
+
+    # First order approximation: the implicit function divided by the length of its gradient
+    k0 = np.hypot(u / a, v / b)
+    k1 = np.hypot(u / (a * a), v / (b * b))
+    return k0 * (k0 - 1) / np.maximum(k1, np.finfo(np.float32).tiny)
+
+def _segment_distance(x, y, x0, y0, x1, y1):
+    '''
+    The distance from points (x, y) to the line segments from (x0, y0) to (x1, y1).
+    '''
+    dx = x1 - x0
+    dy = y1 - y0
+    t = np.clip(((x - x0) * dx + (y - y0) * dy) / np.maximum(dx * dx + dy * dy, np.finfo(np.float32).tiny), 0, 1)
+    return np.hypot(x - x0 - t * dx, y - y0 - t * dy)
+
+def _arc_distance(dx, dy, radius, start, sweep):
+    '''
+    The distance from points offset (dx, dy) from the center of a circle to the arc of that circle starting
+    at angle start and sweeping counterclockwise by sweep (radians).
+    '''
+    # Angle of each point relative to the start of the arc, in the range 0 to 2 pi
+    relative = np.mod(np.arctan2(dy, dx) - start, 2 * np.pi)
+    on_arc = np.abs(np.hypot(dx, dy) - radius)
+
+    end = start + sweep
+    to_start = np.hypot(dx - radius * np.cos(start), dy - radius * np.sin(start))
+    to_end = np.hypot(dx - radius * np.cos(end), dy - radius * np.sin(end))
+    return np.where(relative <= sweep, on_arc, np.minimum(to_start, to_end))
@@ -0,0 +1,241 @@
+"""
+Renders pages of Chernoff Faces to image files without pyplot, using matplotlib's Agg backend directly.
+Large numbers of faces are split into page sized chunks, which can be rendered in parallel by a pool of
+worker processes, or written one page at a time to a single multi-page PDF.
+
+Single faces can be rendered to PNG bytes or RGBA arrays with `render_png` and `render_rgba`, which are
+safe to call from many threads at once: each call draws on its own `Figure` and canvas, pyplot's global
+figure registry is never touched, and matplotlib keeps a separate font cache per thread. (The same holds
+for `CFace.plot`, as long as threads never share an `Axes` or `Figure`.)
+"""
+import io
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.figure import Figure
+
+from cface import CFace
+
+FACE_SIZE = 200
+FACE_DPI = 100
+
+def render_page(features, path, nrows=4, ncols=5, names=None, figsize=(20, 16), dpi=100):
+    '''
+    Renders a single page of Chernoff Faces to a PNG file, in a grid of `nrows` by `ncols` faces,
+    with one `Axes` per face (as in `examples/csv_example.py`).
+
+    Parameters:
+        features (array_like): An (N, 15) matrix of features, in the range 0-1, with N <= nrows * ncols.
+        path (str): The path of the PNG file to write.
+        nrows (int): The number of rows of faces on the page.
+        ncols (int): The number of columns of faces on the page.
+        names (list): The labels to add to each face. Defaults to no labels.
+        figsize (tuple): The size of the page in inches.
+        dpi (int): The resolution of the page in dots per inch.
+
+    Returns:
+        path (str): The path of the PNG file.
+    '''
+    features = np.asarray(features)
+    if names is None:
+        names = [None] * len(features)
+    _check_names(names, features)
+
+    fig = Figure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(fig)
+    for i, (row, name) in enumerate(zip(features, names)):
+        ax = fig.add_subplot(nrows, ncols, i+1, aspect='equal')
+        CFace(**dict(zip(CFace.feature_ranges, row.tolist()))).plot(ax, name)
+
+    fig.subplots_adjust(hspace=0, wspace=0)
+    fig.savefig(path)
+    return path
+
+def render_pages(faces, directory, nrows=4, ncols=5, names=None, processes=None, prefix='faces', **kwargs):
+    '''
+    Splits Chernoff Faces into pages of `nrows` by `ncols` faces and renders each page to its own PNG
+    file in `directory`, named `{prefix}_{page}.png`. Pages are rendered in a pool of `processes` worker
+    processes; the output is identical to rendering the pages one after another.
+
+    Parameters:
+        faces (`CFaceArray` or array_like): The faces to render, or an (N, 15) matrix of their features.
+        directory (str): The directory in which to write the pages, created if it does not exist.
+        nrows (int): The number of rows of faces on each page.
+        ncols (int): The number of columns of faces on each page.
+        names (list): The labels to add to each face. Defaults to the row number of each face.
+        processes (int): The number of worker processes. Defaults to the number of CPUs. If 1, pages
+            are rendered in the calling process.
+        prefix (str): The prefix of each page's file name.
+        **kwargs: Passed on to `render_page` (eg. `figsize`, `dpi`).
+
+    Returns:
+        paths (list): The paths of the PNG files, in page order.
+    '''
+    features = np.asarray(getattr(faces, 'features', faces))
+    if names is None:
+        names = range(len(features))
+    _check_names(names, features)
+
+    per_page = nrows * ncols
+    pages = ((features[start:start+per_page], list(names[start:start+per_page]))
+             for start in range(0, len(features), per_page))
+    return render_page_stream(pages, len(features), directory, nrows, ncols, processes, prefix, **kwargs)
+
+def render_page_stream(pages, count, directory, nrows=4, ncols=5, processes=None, prefix='faces', **kwargs):
+    '''
+    Renders an iterable of pages of Chernoff Faces to PNG files in `directory`, as `render_pages`, but
+    consumes the pages lazily so that only a few pages are held in memory at a time.
+
+    Parameters:
+        pages (iterable): The pages to render, as tuples of (features, names), where features is an
+            (N, 15) matrix with N <= nrows * ncols.
+        count (int): The total number of faces across all pages, used to name the files.
+        directory (str): The directory in which to write the pages, created if it does not exist.
+        nrows (int): The number of rows of faces on each page.
+        ncols (int): The number of columns of faces on each page.
+        processes (int): The number of worker processes. Defaults to the number of CPUs. If 1, pages
+            are rendered in the calling process.
+        prefix (str): The prefix of each page's file name.
+        **kwargs: Passed on to `render_page` (eg. `figsize`, `dpi`).
+
+    Returns:
+        paths (list): The paths of the PNG files, in page order.
+    '''
+    os.makedirs(directory, exist_ok=True)
+
+    page_count = -(-count // (nrows * ncols))
+    digits = len(str(max(page_count - 1, 0)))
+    tasks = ((features, os.path.join(directory, f'{prefix}_{page:0{digits}d}.png'), nrows, ncols, names)
+             for page, (features, names) in enumerate(pages))
+
+    if processes == 1:
+        return [render_page(*task, **kwargs) for task in tasks]
+
+    # Keep a bounded number of pages in flight, so memory does not grow with the number of pages
+    max_pending = 2 * (processes or os.cpu_count() or 1)
+    paths = []
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        for task in tasks:
+            pending.append(executor.submit(render_page, *task, **kwargs))
+            if len(pending) >= max_pending:
+                paths.append(pending.popleft().result())
+        paths.extend(future.result() for future in pending)
+    return paths
+
+def render_pdf(faces, path, nrows=4, ncols=5, names=None, figsize=(20, 16), metadata=None):
+    '''
+    Renders Chernoff Faces to a single multi-page PDF, in pages of `nrows` by `ncols` faces laid out as
+    `render_page` lays them out. One figure and grid of axes is reused for every page: the faces already
+    on the axes are updated in place (see `FaceArtists.update`) and each page is written to the file as
+    soon as it is drawn, so memory use does not grow with the number of faces.
+
+    Parameters:
+        faces (`CFaceArray` or array_like): The faces to render, or an (N, 15) matrix of their features
+            (eg. a memory mapped `FaceFile`).
+        path (str): The path of the PDF file to write.
+        nrows (int): The number of rows of faces on each page.
+        ncols (int): The number of columns of faces on each page.
+        names (list): The labels to add to each face. Defaults to the row number of each face.
+        figsize (tuple): The size of each page in inches.
+        metadata (dict): Document metadata, eg. {'Title': ...}, passed on to `PdfPages`.
+
+    Returns:
+        path (str): The path of the PDF file, or None if there are no faces to render (like `render_pages`,
+            nothing is written).
+    '''
+    features = np.asarray(getattr(faces, 'features', faces))
+    if not len(features):
+        return None
+    if names is None:
+        names = range(len(features))
+    _check_names(names, features)
+
+    per_page = nrows * ncols
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    axes = [fig.add_subplot(nrows, ncols, i+1, aspect='equal') for i in range(per_page)]
+    fig.subplots_adjust(hspace=0, wspace=0)
+    artists = [None] * per_page
+
+    with PdfPages(path, metadata=metadata) as pdf:
+        for start in range(0, len(features), per_page):
+            page = features[start:start+per_page]
+            for i, ax in enumerate(axes):
+                if i >= len(page):
+                    # Only the last page can be short
+                    ax.set_visible(False)
+                    continue
+                face = CFace(**dict(zip(CFace.feature_ranges, page[i].tolist())))
+                if artists[i] is None:
+                    artists[i] = face.draw(ax, names[start+i])
+                else:
+                    artists[i].update(face)
+                    ax.set_title(names[start+i], loc='left', x=0.02, y=0.02)
+            pdf.savefig(fig)
+    return path
+
+def render_rgba(face, name=None, size=FACE_SIZE, dpi=FACE_DPI):
+    '''
+    Renders a single Chernoff Face, filling a square image, as `CFace.plot` draws it. Safe to call from
+    multiple threads at once.
+
+    Parameters:
+        face (`CFace`, dict or array_like): The face, a dict of its features, or a vector of its 15 features.
+        name (str): The label to add to the face.
+        size (int): The width and height of the image, in pixels.
+        dpi (float): The resolution of the image, which sets the width of lines and the size of the label.
+
+    Returns:
+        `numpy.ndarray`: A (size, size, 4) uint8 RGBA image.
+    '''
+    canvas = _face_canvas(face, name, size, dpi)
+    canvas.draw()
+    return np.array(canvas.buffer_rgba())
+
+def render_png(face, name=None, size=FACE_SIZE, dpi=FACE_DPI):
+    '''
+    Renders a single Chernoff Face to a PNG, as `render_rgba`. Safe to call from multiple threads at once,
+    and the same face always gives the same bytes.
+
+    Parameters:
+        face (`CFace`, dict or array_like): The face, a dict of its features, or a vector of its 15 features.
+        name (str): The label to add to the face.
+        size (int): The width and height of the image, in pixels.
+        dpi (float): The resolution of the image, which sets the width of lines and the size of the label.
+
+    Returns:
+        bytes: The PNG image.
+    '''
+    output = io.BytesIO()
+    # print_png draws and encodes the canvas directly, without the temporary figure changes of savefig
+    _face_canvas(face, name, size, dpi).print_png(output)
+    return output.getvalue()
+
+def _check_names(names, features):
+    '''
+    Checks that there is one name per face, as zipping them would silently drop faces.
+    '''
+    if len(names) != len(features):
+        raise ValueError(f'names must have one name per face ({len(features)}), not {len(names)}')
+
+def _face_canvas(face, name, size, dpi):
+    '''
+    Plots a face on a new figure with a single full size axes, and returns the figure's Agg canvas.
+    '''
+    if isinstance(face, dict):
+        face = CFace(**face)
+    elif not isinstance(face, CFace):
+        features = np.asarray(face, dtype=np.float64)
+        if features.shape != (len(CFace.feature_ranges),):
+            raise ValueError(f'a face needs {len(CFace.feature_ranges)} features, not shape {features.shape}')
+        face = CFace(**dict(zip(CFace.feature_ranges, features.tolist())))
+
+    fig = Figure(figsize=(size / dpi, size / dpi), dpi=dpi)
+    canvas = FigureCanvasAgg(fig)
+    face.plot(fig.add_axes([0, 0, 1, 1]), name)
+    return canvas
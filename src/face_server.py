@@ -0,0 +1,422 @@
+"""
+A small local HTTP service that renders Chernoff Faces on demand, so that tools which need face images
+don't each pay for importing matplotlib and rendering. It is built on asyncio and the standard library
+only. Faces are rendered with `CFace.plot` in a pool of worker processes that are started (and have
+imported matplotlib and drawn a face) before the first request, and responses are kept in an LRU cache
+keyed by a hash of the request content, so repeated requests are answered without rendering.
+
+Endpoints:
+
+```
+POST /render    A JSON object with either:
+                    "features": a list of 15 features, or an object of feature names to values, or
+                    "row": an object of column names to values, with a "feature_map" from features to columns
+                and optionally "name" (a label), "format" ("png" or "svg"), "size" (in pixels) and "dpi".
+                All values are in the range 0 to 1, and features that are not supplied default to 0.5.
+GET  /render    The same, as query parameters, with the features comma separated, eg.
+                /render?features=0.1,0.5,...&format=svg
+GET  /stats     The cache statistics, as JSON.
+```
+
+Usage:
+    python face_server.py [--host 127.0.0.1] [--port 8765] [--processes N] [--cache-size 1024]
+"""
+import argparse
+import asyncio
+import contextlib
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import signal
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from urllib.parse import parse_qs, urlsplit
+
+from cface import CFace
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_CACHE_SIZE = 1024
+DEFAULT_SIZE = 200
+DEFAULT_DPI = 100
+MAX_SIZE = 4000
+MAX_BODY = 1_000_000
+# How long the workers have to start and render their first face, in seconds
+WARM_UP_TIMEOUT = 120
+CONTENT_TYPES = {'png': 'image/png', 'svg': 'image/svg+xml'}
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+class FaceServer():
+    '''
+    An HTTP server rendering Chernoff Faces. Use `start` and `close` from a running event loop, or `run`
+    to serve until interrupted. `hits`, `misses` and `evictions` count cache use, and `restarts` counts the
+    times the worker processes were restarted after one of them died.
+    '''
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, processes=None, cache_size=DEFAULT_CACHE_SIZE):
+        '''
+        Parameters:
+            host (str): The address to listen on. Defaults to localhost only.
+            port (int): The port to listen on, or 0 for any free port (see `port` after `start`).
+            processes (int): The number of worker processes. Defaults to the number of CPUs.
+            cache_size (int): The maximum number of responses to cache.
+        '''
+        self.host = host
+        self.port = port
+        self.processes = processes or os.cpu_count()
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.restarts = 0
+        self._pending = {}
+        self._connections = set()
+        self._executor = None
+        self._server = None
+
+    async def start(self):
+        '''
+        Starts the worker processes, waits until each has rendered a face, and starts listening.
+        '''
+        await self._start_workers()
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        '''
+        Stops listening, closes open connections and shuts down the worker processes.
+        '''
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for connection in self._connections:
+            connection.cancel()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown()
+
+    def run(self):
+        '''
+        Starts the server and serves requests until interrupted or terminated.
+        '''
+        async def serve():
+            await self.start()
+            # Shut the worker processes down with the server when terminated, rather than orphaning them
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, self._server.close)
+            print(f'Serving Chernoff Faces on http://{self.host}:{self.port} with {self.processes} processes')
+            try:
+                await self._server.serve_forever()
+            except asyncio.CancelledError:
+                pass
+            finally:
+                await self.close()
+
+        try:
+            asyncio.run(serve())
+        except KeyboardInterrupt:
+            pass
+
+    def stats(self):
+        '''
+        Returns:
+            dict: The number of cache hits, misses and evictions, the number of cached responses, and the number
+                of times the worker processes were restarted.
+        '''
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions, 'size': len(self.cache),
+                'restarts': self.restarts}
+
+    async def render(self, features, name=None, image_format='png', size=DEFAULT_SIZE, dpi=DEFAULT_DPI):
+        '''
+        Renders a face in a worker process, answering from the cache where possible. Concurrent identical
+        requests share a single render, and only the request that starts it counts as a cache miss.
+
+        Parameters:
+            features (list): The 15 features of the face, in the order of `CFace.feature_ranges`.
+            name (str): The label of the face.
+            image_format (str): 'png' or 'svg'.
+            size (int): The width and height of the image, in pixels.
+            dpi (int): The resolution of the image.
+
+        Returns:
+            key (str): The content hash of the request.
+            body (bytes): The rendered image.
+            hit (bool): Whether the image came from the cache.
+        '''
+        key = hashlib.sha256(json.dumps([features, name, image_format, size, dpi]).encode('utf-8')).hexdigest()
+
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            self.hits += 1
+            return key, self.cache[key], True
+
+        render = self._pending.get(key)
+        hit = render is not None
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+            render = self._pending[key] = asyncio.ensure_future(
+                self._render(key, features, name, image_format, size, dpi))
+        # Shielded, so a client that disconnects doesn't cancel a render other requests are waiting for
+        return key, await asyncio.shield(render), hit
+
+    async def _render(self, key, features, name, image_format, size, dpi):
+        '''
+        Renders a face in a worker process and caches it, restarting the workers if one of them has died.
+        '''
+        executor = self._executor
+        try:
+            body = await asyncio.get_running_loop().run_in_executor(executor, render_face, features, name,
+                                                                    image_format, size, dpi)
+        except BrokenProcessPool:
+            # Every later render would fail too, so replace the pool (unless a concurrent render already has)
+            if executor is self._executor:
+                self.restarts += 1
+                executor.shutdown(wait=False)
+                await self._start_workers()
+            raise
+        finally:
+            self._pending.pop(key, None)
+
+        self.cache[key] = body
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+            self.evictions += 1
+        return body
+
+    async def _start_workers(self):
+        '''
+        Starts the worker processes and waits until every one of them has rendered a face.
+        '''
+        loop = asyncio.get_running_loop()
+        barrier = multiprocessing.Barrier(self.processes)
+        self._executor = ProcessPoolExecutor(self.processes, initializer=_warm_up, initargs=(barrier,))
+        # A worker runs one task at a time, so the tasks can only all pass the barrier once every worker has
+        # started and finished warming up
+        await asyncio.gather(*[loop.run_in_executor(self._executor, _wait_for_workers)
+                               for _ in range(self.processes)])
+
+    async def _handle_connection(self, reader, writer):
+        '''
+        Serves HTTP/1.1 requests on a connection until the client closes it (or asks to).
+        '''
+        self._connections.add(asyncio.current_task())
+        try:
+            while True:
+                try:
+                    request_line, headers = await _read_head(reader)
+                    length = _content_length(headers)
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                except ValueError as error:
+                    # The rest of the stream can't be trusted, so close the connection after responding
+                    await _respond(writer, 400, {'error': str(error)}, keep_alive=False)
+                    break
+                method, target, version = request_line
+                # HTTP/1.1 connections are kept alive unless the client asks otherwise, HTTP/1.0 the reverse
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+
+                if length > MAX_BODY:
+                    await _respond(writer, 413, {'error': f'request body over {MAX_BODY} bytes'}, keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                status, content_type, response, extra_headers = await self._dispatch(method, target, body)
+                await _respond(writer, status, response, content_type, extra_headers, keep_alive)
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+            self._connections.discard(asyncio.current_task())
+
+    async def _dispatch(self, method, target, body):
+        '''
+        Routes a request, returning the status, content type, body and extra headers of the response.
+        '''
+        url = urlsplit(target)
+        if url.path == '/stats':
+            if method != 'GET':
+                return 405, None, {'error': 'use GET'}, {}
+            return 200, None, self.stats(), {}
+        if url.path != '/render':
+            return 404, None, {'error': f'no such path {url.path}'}, {}
+
+        try:
+            if method == 'POST':
+                request = json.loads(body)
+                if not isinstance(request, dict):
+                    raise ValueError('the request body must be a JSON object')
+            elif method == 'GET':
+                request = {key: values[-1] for key, values in parse_qs(url.query).items()}
+                if 'features' in request:
+                    request['features'] = [float(value) for value in request['features'].split(',')]
+            else:
+                return 405, None, {'error': 'use GET or POST'}, {}
+            features, name, image_format, size, dpi = parse_request(request)
+        except (ValueError, TypeError, KeyError) as error:
+            return 400, None, {'error': str(error)}, {}
+
+        try:
+            key, image, hit = await self.render(features, name, image_format, size, dpi)
+        except Exception as error:
+            return 500, None, {'error': f'rendering failed: {error}'}, {}
+        return 200, CONTENT_TYPES[image_format], image, {'ETag': f'"{key}"', 'X-Cache': 'hit' if hit else 'miss'}
+
+def parse_request(request):
+    '''
+    Validates a render request.
+
+    Parameters:
+        request (dict): A render request: "features" (a list of 15 values, or a dict of feature names to
+            values) or "row" (a dict of column names to values) and "feature_map", and optionally "name",
+            "format", "size" and "dpi".
+
+    Returns:
+        features (list): The 15 features of the face, in the order of `CFace.feature_ranges`.
+        name (str): The label of the face, or None.
+        format (str): 'png' or 'svg'.
+        size (int): The width and height of the image, in pixels.
+        dpi (int): The resolution of the image.
+
+    Raises:
+        ValueError: If the request is not valid.
+    '''
+    if 'features' in request:
+        features = request['features']
+        if isinstance(features, list):
+            if len(features) != len(CFace.feature_ranges):
+                raise ValueError(f'features must have {len(CFace.feature_ranges)} values, not {len(features)}')
+            features = dict(zip(CFace.feature_ranges, features))
+        elif not isinstance(features, dict):
+            raise ValueError('features must be a list or an object')
+        unknown = set(features) - set(CFace.feature_ranges)
+        if unknown:
+            raise ValueError(f'unknown features: {", ".join(sorted(unknown))}')
+        cface = CFace(**{feature: float(value) for feature, value in features.items()})
+    elif 'row' in request:
+        row = request['row']
+        feature_map = request.get('feature_map', {})
+        if not isinstance(row, dict) or not isinstance(feature_map, dict):
+            raise ValueError('row and feature_map must be objects')
+        unknown = set(feature_map) - set(CFace.feature_ranges)
+        if unknown:
+            raise ValueError(f'unknown features: {", ".join(sorted(unknown))}')
+        cface = CFace.create_cface_from_row({column: float(value) for column, value in row.items()}, feature_map)
+    else:
+        raise ValueError('the request needs either features or a row and feature_map')
+
+    image_format = request.get('format', 'png')
+    if image_format not in CONTENT_TYPES:
+        raise ValueError(f'format must be one of {", ".join(CONTENT_TYPES)}, not {image_format}')
+    size = int(request.get('size', DEFAULT_SIZE))
+    dpi = int(request.get('dpi', DEFAULT_DPI))
+    if not 0 < size <= MAX_SIZE or not 0 < dpi <= MAX_SIZE:
+        raise ValueError(f'size and dpi must be between 1 and {MAX_SIZE}')
+    name = request.get('name')
+
+    return ([cface.features[feature] for feature in CFace.feature_ranges],
+            None if name is None else str(name), image_format, size, dpi)
+
+def render_face(features, name=None, image_format='png', size=DEFAULT_SIZE, dpi=DEFAULT_DPI):
+    '''
+    Renders a single Chernoff Face with `CFace.plot`, filling a square image.
+
+    Parameters:
+        features (list): The 15 features of the face, in the order of `CFace.feature_ranges`.
+        name (str): The label of the face.
+        image_format (str): 'png' or 'svg'.
+        size (int): The width and height of the image, in pixels.
+        dpi (int): The resolution of the image.
+
+    Returns:
+        bytes: The image.
+    '''
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(size / dpi, size / dpi), dpi=dpi)
+    FigureCanvasAgg(fig)
+    ax = fig.add_axes([0, 0, 1, 1], aspect='equal')
+    CFace(**dict(zip(CFace.feature_ranges, features))).plot(ax, name)
+
+    output = io.BytesIO()
+    fig.savefig(output, format=image_format)
+    return output.getvalue()
+
+def _warm_up(barrier):
+    '''
+    Runs in each worker process as it starts: imports matplotlib and renders a face, so that the first
+    request to the worker doesn't pay for either.
+    '''
+    global _barrier
+    _barrier = barrier
+    render_face([0.5] * len(CFace.feature_ranges))
+
+def _wait_for_workers():
+    '''
+    Runs in a worker process, blocking until one such task is running in every worker.
+    '''
+    _barrier.wait(WARM_UP_TIMEOUT)
+
+async def _read_head(reader):
+    '''
+    Reads the request line and headers of an HTTP request, raising ValueError if the request line is malformed.
+    '''
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    request_line = lines[0].split(' ')
+    if len(request_line) != 3 or not request_line[2].startswith('HTTP/'):
+        raise ValueError(f'malformed request line {lines[0]!r}')
+    headers = {}
+    for line in lines[1:]:
+        if ':' in line:
+            key, value = line.split(':', 1)
+            headers[key.strip().lower()] = value.strip()
+    return request_line, headers
+
+def _content_length(headers):
+    '''
+    Returns the length of the request body, raising ValueError if the Content-Length header is not a
+    non-negative integer.
+    '''
+    value = headers.get('content-length', '0')
+    if not value.isdigit():
+        raise ValueError(f'invalid Content-Length {value!r}')
+    return int(value)
+
+async def _respond(writer, status, body, content_type=None, extra_headers=None, keep_alive=True):
+    '''
+    Writes an HTTP response. Bodies that are not bytes are sent as JSON.
+    '''
+    if not isinstance(body, bytes):
+        body = json.dumps(body).encode('utf-8')
+        content_type = 'application/json'
+    headers = {
+        'Content-Type': content_type,
+        'Content-Length': len(body),
+        'Connection': 'keep-alive' if keep_alive else 'close',
+        **(extra_headers or {})
+    }
+    head = f'HTTP/1.1 {status} {REASONS[status]}\r\n' + ''.join(f'{key}: {value}\r\n' for key, value in headers.items())
+    writer.write(head.encode('latin-1') + b'\r\n' + body)
+    await writer.drain()
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--processes', type=int, help='worker processes (default: number of CPUs)')
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_CACHE_SIZE, help='maximum responses cached')
+    return parser.parse_args(argv)
+
+if __name__ == '__main__':
+    args = parse_args(None)
+    FaceServer(args.host, args.port, args.processes, args.cache_size).run()
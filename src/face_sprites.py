@@ -0,0 +1,146 @@
+"""
+A raster mode for overview plots of very large numbers of Chernoff Faces, where each face is only a few
+pixels wide. Features are quantized to a small number of levels, each distinct face is rendered once into
+an offscreen sprite atlas, and the grid of faces is composited from the atlas with NumPy array indexing
+and drawn with a single `imshow`.
+"""
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from cface import CFace
+from face_batch import FaceBatch
+from face_collections import plot_faces
+
+SPRITE_PADDING = 2
+ATLAS_COLUMNS = 64
+
+def quantize_features(features, levels):
+    '''
+    Quantizes features in the range 0-1 to `levels` evenly spaced levels, including 0 and 1.
+
+    Parameters:
+        features (array_like): An (N, 15) matrix of features, in the range 0-1.
+        levels (int): The number of levels, at least 2.
+
+    Returns:
+        `numpy.ndarray`: An (N, 15) matrix of integer levels, from 0 to levels - 1.
+    '''
+    if levels < 2:
+        raise ValueError(f'levels {levels} must be at least 2')
+    return np.rint(np.asarray(features, dtype=np.float64) * (levels - 1)).astype(np.int64)
+
+def build_sprite_atlas(features, levels=4, sprite_size=16, dpi=100):
+    '''
+    Quantizes the features of each face and renders each distinct quantized face once, as a square
+    RGBA sprite of `sprite_size` pixels.
+
+    The sprites are drawn with the same geometry as `CFace.plot` (see `FaceBatch`), many sprites at a
+    time on a single offscreen Agg canvas, with a few pixels of padding around each sprite so that
+    neighbouring faces do not bleed into each other.
+
+    Parameters:
+        features (array_like): An (N, 15) matrix of features, in the range 0-1.
+        levels (int): The number of levels each feature is quantized to.
+        sprite_size (int): The width and height of each sprite, in pixels.
+        dpi (int): The resolution at which sprites are drawn, which sets the line width in pixels.
+
+    Returns:
+        atlas (`numpy.ndarray`): A (U, sprite_size, sprite_size, 4) uint8 array of U distinct sprites.
+        inverse (`numpy.ndarray`): For each of the N faces, the index of its sprite in the atlas.
+    '''
+    codes = quantize_features(features, levels).reshape(-1, len(CFace.feature_ranges))
+
+    # Encode each quantized face as a single integer where possible, which is much faster to deduplicate
+    if levels ** codes.shape[1] < 2 ** 63:
+        keys = codes @ (levels ** np.arange(codes.shape[1], dtype=np.int64))
+        _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        unique_codes = codes[first]
+    else:
+        unique_codes, inverse = np.unique(codes, axis=0, return_inverse=True)
+
+    return _render_sprites(unique_codes / (levels - 1), sprite_size, dpi), inverse.reshape(-1)
+
+def compose_sprite_grid(atlas, inverse, ncols):
+    '''
+    Composites the sprites of each face into a single image, laid out in a grid of `ncols` columns,
+    filled left to right and top to bottom. Empty cells at the end of the grid are white.
+
+    Parameters:
+        atlas (`numpy.ndarray`): A (U, size, size, 4) array of sprites.
+        inverse (`numpy.ndarray`): For each face, the index of its sprite in the atlas.
+        ncols (int): The number of columns in the grid.
+
+    Returns:
+        `numpy.ndarray`: An (nrows * size, ncols * size, 4) uint8 image.
+    '''
+    size = atlas.shape[1]
+    nrows = max(1, -(-len(inverse) // ncols))
+    cells = np.full((nrows * ncols, size, size, 4), 255, dtype=np.uint8)
+    cells[:len(inverse)] = atlas[inverse]
+    return cells.reshape(nrows, ncols, size, size, 4).transpose(0, 2, 1, 3, 4).reshape(nrows * size, ncols * size, 4)
+
+def plot_face_sprites(ax, faces, ncols=None, levels=4, sprite_size=16, dpi=100):
+    '''
+    Draws Chernoff Faces on the supplied axes as a single raster image, laid out in a grid of `ncols`
+    columns. The grid uses the same coordinates as `face_collections.plot_face_grid` (one 2x2 square per
+    face, with the first face centered on the origin).
+
+    Parameters:
+        ax (axes): The axes on which to plot the faces.
+        faces (`CFaceArray` or array_like): The faces to draw, or an (N, 15) matrix of their features.
+        ncols (int): The number of columns in the grid. Defaults to a square grid.
+        levels (int): The number of levels each feature is quantized to.
+        sprite_size (int): The width and height of each face, in pixels.
+        dpi (int): The resolution at which sprites are drawn.
+
+    Returns:
+        `matplotlib.image.AxesImage`: The image of the faces.
+    '''
+    features = np.asarray(getattr(faces, 'features', faces))
+    if ncols is None:
+        ncols = max(1, int(np.ceil(np.sqrt(len(features)))))
+    nrows = max(1, -(-len(features) // ncols))
+
+    atlas, inverse = build_sprite_atlas(features, levels, sprite_size, dpi)
+    image = ax.imshow(compose_sprite_grid(atlas, inverse, ncols), extent=[-1, 2 * ncols - 1, -2 * nrows + 1, 1])
+
+    # Axes formatting
+    ax.set_xticks([])
+    ax.set_yticks([])
+
+    return image
+
+def _render_sprites(features, sprite_size, dpi):
+    '''
+    Renders each face to a sprite, drawing up to ATLAS_COLUMNS x ATLAS_COLUMNS faces per
+    canvas.
+    '''
+    cell = sprite_size + 2 * SPRITE_PADDING
+    spacing = 2 * cell / sprite_size
+    atlas = np.empty((len(features), sprite_size, sprite_size, 4), dtype=np.uint8)
+
+    per_canvas = ATLAS_COLUMNS * ATLAS_COLUMNS
+    for start in range(0, len(features), per_canvas):
+        count = min(per_canvas, len(features) - start)
+        ncols = min(ATLAS_COLUMNS, count)
+        nrows = -(-count // ncols)
+
+        fig = Figure(figsize=(ncols * cell / dpi, nrows * cell / dpi), dpi=dpi)
+        canvas = FigureCanvasAgg(fig)
+        ax = fig.add_axes([0, 0, 1, 1])
+        ax.set_axis_off()
+        ax.set_xlim([-spacing / 2, ncols * spacing - spacing / 2])
+        ax.set_ylim([-nrows * spacing + spacing / 2, spacing / 2])
+
+        rows, cols = np.divmod(np.arange(count), ncols)
+        plot_faces(ax,
+                   FaceBatch(features[start:start + count], CFace.feature_ranges),
+                   np.column_stack([cols * spacing, -rows * spacing]))
+        canvas.draw()
+
+        image = np.asarray(canvas.buffer_rgba()).reshape(nrows, cell, ncols, cell, 4)
+        cells = image.transpose(0, 2, 1, 3, 4).reshape(nrows * ncols, cell, cell, 4)[:count]
+        atlas[start:start + count] = cells[:, SPRITE_PADDING:SPRITE_PADDING + sprite_size,
+                                           SPRITE_PADDING:SPRITE_PADDING + sprite_size]
+    return atlas
@@ -0,0 +1,156 @@
+"""
+Streams a CSV file into Chernoff Faces in bounded memory. A first pass over the file computes the
+minimum and maximum of every numeric column; a second pass normalises the file chunk by chunk with those
+ranges, builds faces and renders them page by page. The result matches `CFace.normalise_df` on the whole
+file, but peak memory depends on the chunk size rather than the size of the file.
+"""
+import numpy as np
+import pandas as pd
+
+from cface import CFace
+from cface_array import CFaceArray
+from face_normaliser import FaceNormaliser
+from face_render import render_page_stream
+
+DEFAULT_CHUNKSIZE = 100_000
+
+def scan_csv(path, chunksize=DEFAULT_CHUNKSIZE, normaliser=None, **read_csv_kwargs):
+    '''
+    Reads a CSV file in chunks and fits a `FaceNormaliser` to it, computing the range of each numeric
+    column. A column is numeric if it is numeric in every chunk.
+
+    Parameters:
+        path (str or file): The CSV file.
+        chunksize (int): The number of rows to read at a time.
+        normaliser (`FaceNormaliser`): A normaliser to update with `partial_fit`, eg. one fitted on earlier
+            files. Defaults to a new normaliser.
+        **read_csv_kwargs: Passed on to `pandas.read_csv`.
+
+    Returns:
+        `FaceNormaliser`: The fitted normaliser.
+    '''
+    if normaliser is None:
+        normaliser = FaceNormaliser(clip=False)
+    for chunk in pd.read_csv(path, chunksize=chunksize, **read_csv_kwargs):
+        normaliser.partial_fit(chunk)
+    return normaliser
+
+def normalise_chunks(path, normaliser, chunksize=DEFAULT_CHUNKSIZE, **read_csv_kwargs):
+    '''
+    Reads a CSV file in chunks, normalising each chunk with a fitted `FaceNormaliser` (eg. as returned by
+    `scan_csv`).
+
+    Parameters:
+        path (str or file): The CSV file.
+        normaliser (`FaceNormaliser`): The fitted normaliser.
+        chunksize (int): The number of rows to read at a time.
+        **read_csv_kwargs: Passed on to `pandas.read_csv`.
+
+    Yields:
+        chunk (`pandas.DataFrame`): A normalised chunk of the file.
+    '''
+    for chunk in pd.read_csv(path, chunksize=chunksize, **read_csv_kwargs):
+        yield normaliser.transform(chunk)
+
+def normalise_csv(path, chunksize=DEFAULT_CHUNKSIZE, **read_csv_kwargs):
+    '''
+    The streaming equivalent of `CFace.normalise_df`. Scans the CSV file once to compute the range of
+    each numeric column, and returns a generator of normalised chunks (reading the file a second time)
+    along with the feature map.
+
+    Parameters:
+        path (str or file): The CSV file. A file object must be seekable, as the file is read twice.
+        chunksize (int): The number of rows to read at a time.
+        **read_csv_kwargs: Passed on to `pandas.read_csv`.
+
+    Returns:
+        chunks (generator): The normalised chunks of the file.
+        feature_map (dict): A mapping between Chernoff Face features and columns in the file.
+    '''
+    _rewind(path)
+    normaliser = scan_csv(path, chunksize, **read_csv_kwargs)
+    _rewind(path)
+    return normalise_chunks(path, normaliser, chunksize, **read_csv_kwargs), normaliser.feature_map
+
+def stream_faces(path, chunksize=DEFAULT_CHUNKSIZE, feature_map=None, **read_csv_kwargs):
+    '''
+    Streams a CSV file into Chernoff Faces, one `CFaceArray` per chunk.
+
+    Parameters:
+        path (str or file): The CSV file. A file object must be seekable, as the file is read twice.
+        chunksize (int): The number of rows to read at a time.
+        feature_map (dict): A mapping between features and column names. Defaults to the feature map
+            returned by `normalise_csv`.
+        **read_csv_kwargs: Passed on to `pandas.read_csv`.
+
+    Yields:
+        faces (`CFaceArray`): The faces for a chunk of the file.
+    '''
+    chunks, default_feature_map = normalise_csv(path, chunksize, **read_csv_kwargs)
+    if feature_map is None:
+        feature_map = default_feature_map
+    for chunk in chunks:
+        yield CFaceArray.from_df(chunk, feature_map)
+
+def render_csv(path, directory, nrows=4, ncols=5, chunksize=DEFAULT_CHUNKSIZE, feature_map=None,
+               normaliser=None, processes=None, prefix='faces', read_csv_kwargs=None, **kwargs):
+    '''
+    Renders every row of a CSV file as a Chernoff Face, to pages of `nrows` by `ncols` faces, with
+    each page written to its own PNG file in `directory` (see `face_render.render_pages`). Faces are
+    labelled with their row number. The file is read in chunks, so memory use is bounded by the chunk size
+    rather than the size of the file.
+
+    Parameters:
+        path (str or file): The CSV file. A file object must be seekable, as the file is read twice.
+        directory (str): The directory in which to write the pages, created if it does not exist.
+        nrows (int): The number of rows of faces on each page.
+        ncols (int): The number of columns of faces on each page.
+        chunksize (int): The number of rows to read at a time.
+        feature_map (dict): A mapping between features and column names. Defaults to the feature map
+            of the normaliser.
+        normaliser (`FaceNormaliser`): A fitted normaliser, eg. loaded from an earlier run, so that faces
+            are comparable between files. If supplied, the column ranges of the file are not
+            recomputed. Defaults to fitting a new normaliser to the file.
+        processes (int): The number of worker processes. Defaults to the number of CPUs.
+        prefix (str): The prefix of each page's file name.
+        read_csv_kwargs (dict): Passed on to `pandas.read_csv`.
+        **kwargs: Passed on to `face_render.render_page` (eg. `figsize`, `dpi`).
+
+    Returns:
+        paths (list): The paths of the PNG files, in page order.
+    '''
+    read_csv_kwargs = read_csv_kwargs or {}
+    _rewind(path)
+    if normaliser is None:
+        normaliser = scan_csv(path, chunksize, **read_csv_kwargs)
+        rows = normaliser.rows_seen
+    else:
+        rows = sum(len(chunk) for chunk in pd.read_csv(path, chunksize=chunksize,
+                                                        **{**read_csv_kwargs, 'usecols': [0]}))
+    _rewind(path)
+    if feature_map is None:
+        feature_map = normaliser.feature_map
+
+    def pages():
+        per_page = nrows * ncols
+        pending = np.empty((0, len(CFace.feature_ranges)))
+        first_row = 0
+        for chunk in normalise_chunks(path, normaliser, chunksize, **read_csv_kwargs):
+            pending = np.concatenate([pending, CFaceArray.from_df(chunk, feature_map).features])
+            while len(pending) >= per_page:
+                yield pending[:per_page], list(range(first_row, first_row + per_page))
+                pending = pending[per_page:]
+                first_row += per_page
+        if len(pending):
+            yield pending, list(range(first_row, first_row + len(pending)))
+
+    return render_page_stream(pages(), rows, directory, nrows, ncols, processes, prefix, **kwargs)
+
+def _rewind(path):
+    '''
+    Returns a CSV file object to its start, ready for another pass over the file. Paths are left as they are.
+    '''
+    if hasattr(path, 'read'):
+        if not path.seekable():
+            raise ValueError('a CSV file read in more than one pass must be a path or a seekable file')
+        path.seek(0)
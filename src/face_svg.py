@@ -0,0 +1,114 @@
+"""
+Writes Chernoff Faces directly to SVG, without matplotlib. Each face is written as a group of
+`<ellipse>`, `<circle>`, `<line>` and `<path>` elements, using the same geometry as `CFace.plot`
+(see `FaceBatch`), and the document is streamed to a file object a chunk of faces at a time, so the
+whole document is never held in memory.
+"""
+import numpy as np
+
+from cface import CFace
+from face_batch import FaceBatch
+
+DEFAULT_CHUNKSIZE = 10_000
+
+def write_svg(file, faces, ncols=None, face_size=100, chunksize=DEFAULT_CHUNKSIZE):
+    '''
+    Writes Chernoff Faces to an SVG document, laid out in a grid of `ncols` columns, filled left to right
+    and top to bottom. Each face is drawn in a square of `face_size` pixels.
+
+    Parameters:
+        file (file): A text file object to write the document to.
+        faces (`CFaceArray` or array_like): The faces to write, or an (N, 15) matrix of their features.
+        ncols (int): The number of columns in the grid. Defaults to a square grid.
+        face_size (float): The width and height of each face, in pixels.
+        chunksize (int): The number of faces for which geometry is computed at a time.
+
+    Returns:
+        file (file): The file object.
+    '''
+    features = np.asarray(getattr(faces, 'features', faces))
+    if ncols is None:
+        ncols = max(1, int(np.ceil(np.sqrt(len(features)))))
+    nrows = max(1, -(-len(features) // ncols))
+
+    width = ncols * face_size
+    height = nrows * face_size
+    file.write(f'<svg xmlns="http://www.w3.org/2000/svg" width="{width:g}" height="{height:g}" '
+               f'viewBox="0 0 {width:g} {height:g}">\n'
+               '<g fill="none" stroke="black" stroke-width="1">\n')
+
+    # Faces are drawn in face coordinates (-1 to 1, y up), scaled and translated into their grid cell
+    scale = face_size / 2
+    for start in range(0, len(features), chunksize):
+        batch = FaceBatch(features[start:start + chunksize], CFace.feature_ranges)
+        rows, cols = np.divmod(np.arange(start, start + len(batch)), ncols)
+        for i in range(len(batch)):
+            file.write(f'<g transform="translate({_format((cols[i] + 0.5) * face_size)} '
+                       f'{_format((rows[i] + 0.5) * face_size)}) scale({_format(scale)} {_format(-scale)})">')
+            file.write(face_elements(batch, i))
+            file.write('</g>\n')
+
+    file.write('</g>\n</svg>\n')
+    return file
+
+def face_elements(batch, i):
+    '''
+    Returns the SVG elements for a single face of a batch, in face coordinates. Strokes are
+    non-scaling, so line widths are in pixels regardless of the size of the face.
+
+    Parameters:
+        batch (`FaceBatch`): The geometry of the faces.
+        i (int): The index of the face in the batch.
+
+    Returns:
+        str
+    '''
+    elements = [
+        _ellipse(batch.nose_center[i], batch.nose_width[i], batch.nose_height[i], 0),
+        _ellipse(batch.head_center[i], batch.head_width[i], batch.head_height[i], 0),
+        _ellipse(batch.right_eye_center[i], batch.eye_width[i], batch.eye_height[i], batch.right_eye_angle[i]),
+        _ellipse(batch.left_eye_center[i], batch.eye_width[i], batch.eye_height[i], batch.left_eye_angle[i]),
+        _circle(batch.right_pupil_center[i], batch.pupil_radius[i]),
+        _circle(batch.left_pupil_center[i], batch.pupil_radius[i]),
+        _line(batch.right_eyebrow[i]),
+        _line(batch.left_eyebrow[i]),
+        _arc(batch.mouth_center[i], batch.mouth_width[i], batch.mouth_height[i], batch.mouth_angle[i],
+             batch.mouth_theta1[i], batch.mouth_theta2[i])
+    ]
+    return ''.join(elements)
+
+def _format(value):
+    return f'{value:.6g}'
+
+def _ellipse(center, width, height, angle):
+    return (f'<ellipse cx="{_format(center[0])}" cy="{_format(center[1])}" '
+            f'rx="{_format(width / 2)}" ry="{_format(height / 2)}" '
+            f'transform="rotate({_format(angle)} {_format(center[0])} {_format(center[1])})" '
+            'vector-effect="non-scaling-stroke"/>')
+
+def _circle(center, radius):
+    return (f'<circle cx="{_format(center[0])}" cy="{_format(center[1])}" r="{_format(radius)}" '
+            'fill="black" vector-effect="non-scaling-stroke"/>')
+
+def _line(segment):
+    return (f'<line x1="{_format(segment[0, 0])}" y1="{_format(segment[0, 1])}" '
+            f'x2="{_format(segment[1, 0])}" y2="{_format(segment[1, 1])}" '
+            'stroke-width="1.5" vector-effect="non-scaling-stroke"/>')
+
+def _arc(center, width, height, angle, theta1, theta2):
+    rx = width / 2
+    ry = height / 2
+    rotation = np.radians(angle)
+
+    def point(theta):
+        x = rx * np.cos(np.radians(theta))
+        y = ry * np.sin(np.radians(theta))
+        return (center[0] + x * np.cos(rotation) - y * np.sin(rotation),
+                center[1] + x * np.sin(rotation) + y * np.cos(rotation))
+
+    start = point(theta1)
+    end = point(theta2)
+    large_arc = 1 if (theta2 - theta1) % 360 > 180 else 0
+    return (f'<path d="M {_format(start[0])} {_format(start[1])} '
+            f'A {_format(rx)} {_format(ry)} {_format(angle)} {large_arc} 1 {_format(end[0])} {_format(end[1])}" '
+            'vector-effect="non-scaling-stroke"/>')
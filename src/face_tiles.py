@@ -0,0 +1,299 @@
+"""
+Exports a grid of Chernoff Faces as a deep zoom tile pyramid, for browsing millions of faces in a map
+viewer (eg. Leaflet or OpenLayers, with a `{z}/{x}/{y}.png` URL template and a flat coordinate system).
+Level `max_zoom` shows every face at `face_size` pixels, and each level below halves the size of the faces:
+
+- the top `detail_levels` levels are drawn in full, with the same face parts as `CFace.plot` (through
+  `face_collections.plot_faces`, one collection per part for all the faces in a tile);
+- the levels below, where faces are too small to show their parts, are averaged from the four tiles below
+  them, which is far cheaper than drawing the faces again.
+
+Tiles can be generated lazily (`tile`, which also generates any tiles it is averaged from) or all at once
+in parallel (`build`). Each tile is written to a temporary file and renamed into place, and existing tiles
+are never regenerated, so an interrupted build can be resumed by running it again.
+"""
+import hashlib
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from cface import CFace
+
+TILE_SIZE = 256
+FACE_SIZE = 64
+DETAIL_LEVELS = 2
+METADATA_FILE = 'tiles.json'
+HASH_CHUNKSIZE = 100_000
+# Faster than the default level (6), and no larger for tiles of line drawings
+PNG_COMPRESS_LEVEL = 3
+
+class FaceTiles():
+    '''
+    A tile pyramid of Chernoff Faces laid out in a grid of `ncols` columns, filled left to right and top to
+    bottom (as `face_collections.plot_face_grid` lays them out). At level z there are up to 2^z by 2^z tiles,
+    of `tile_size` pixels, and a face is `face_size / 2^(max_zoom - z)` pixels across. Tiles that would be
+    entirely beyond the grid are not generated.
+    '''
+
+    def __init__(self, faces, directory, ncols=None, tile_size=TILE_SIZE, face_size=FACE_SIZE,
+                 detail_levels=DETAIL_LEVELS, dpi=100):
+        '''
+        Parameters:
+            faces (`CFaceArray` or array_like): The faces, or an (N, 15) matrix of their features (eg. a
+                memory mapped `FaceFile`).
+            directory (str): The directory of the pyramid, created if it does not exist. If it already holds
+                a pyramid, it must have been built from the same faces and settings. Opening it only checks
+                the settings and the number and dtype of the faces; `build` also checks a hash of the faces.
+            ncols (int): The number of columns in the grid. Defaults to a square grid.
+            tile_size (int): default: 256
+                The width and height of each tile, in pixels.
+            face_size (int): default: 64
+                The width and height of each face at the highest zoom level, in pixels. Must divide
+                `tile_size`.
+            detail_levels (int): default: 2
+                The number of levels, from `max_zoom` down, on which faces are drawn in full.
+            dpi (float): The resolution used to convert line widths from points to pixels.
+        '''
+        self.features = np.asarray(getattr(faces, 'features', faces))
+        if tile_size % face_size:
+            raise ValueError(f'face_size ({face_size}) must divide tile_size ({tile_size})')
+        if detail_levels < 1:
+            raise ValueError(f'detail_levels must be at least 1, not {detail_levels}')
+        self.directory = directory
+        self.ncols = ncols or max(1, int(np.ceil(np.sqrt(len(self.features)))))
+        self.nrows = max(1, -(-len(self.features) // self.ncols))
+        self.tile_size = tile_size
+        self.face_size = face_size
+        self.detail_levels = detail_levels
+        self.dpi = dpi
+
+        faces_per_tile = tile_size // face_size
+        tiles = -(-max(self.ncols, self.nrows) // faces_per_tile)
+        self.max_zoom = int(np.ceil(np.log2(tiles))) if tiles > 1 else 0
+
+        self._check_metadata(hash_features=False)
+
+    def tile_path(self, z, x, y):
+        '''
+        Returns:
+            str: The path of a tile, `{directory}/{z}/{x}/{y}.png`.
+        '''
+        return os.path.join(self.directory, str(z), str(x), f'{y}.png')
+
+    def in_pyramid(self, z, x, y):
+        '''
+        Returns:
+            bool: Whether the tile overlaps the grid of faces (so is part of the pyramid).
+        '''
+        if not 0 <= z <= self.max_zoom:
+            return False
+        span = self._faces_per_tile(z)
+        return 0 <= x and 0 <= y and x * span < self.ncols and y * span < self.nrows
+
+    def tile(self, z, x, y):
+        '''
+        Returns the path of a tile, generating it first if needed (along with any tiles it is averaged from).
+
+        Parameters:
+            z (int): The zoom level.
+            x (int): The column of the tile, from the left.
+            y (int): The row of the tile, from the top.
+
+        Returns:
+            str: The path of the tile, or None if the tile is beyond the grid of faces.
+        '''
+        if not self.in_pyramid(z, x, y):
+            return None
+        path = self.tile_path(z, x, y)
+        if os.path.exists(path):
+            return path
+        if self._is_detailed(z):
+            return _render_tile(*self._render_task(z, x, y))
+        children = [self.tile(z + 1, 2 * x + dx, 2 * y + dy) for dy in (0, 1) for dx in (0, 1)]
+        return _average_tile(children, path, self.tile_size)
+
+    def level(self, z):
+        '''
+        Returns:
+            list: The (x, y) coordinates of the tiles of a level that overlap the grid of faces.
+        '''
+        if not 0 <= z <= self.max_zoom:
+            return []
+        span = self._faces_per_tile(z)
+        return [(x, y) for y in range(-(-self.nrows // span)) for x in range(-(-self.ncols // span))]
+
+    def build(self, min_zoom=0, processes=None):
+        '''
+        Generates every tile of the pyramid that does not exist yet, from the highest zoom level down, in a
+        pool of worker processes. Running it again after an interruption resumes the build.
+
+        Parameters:
+            min_zoom (int): The lowest zoom level to generate.
+            processes (int): The number of worker processes. Defaults to the number of CPUs. If 1, tiles
+                are generated in the calling process.
+
+        Returns:
+            int: The number of tiles generated.
+        '''
+        self._check_metadata(hash_features=True)
+        if processes == 1:
+            return self._build(min_zoom, None, 0)
+        # One pool for every level, so workers only import matplotlib once
+        processes = processes or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            return self._build(min_zoom, executor, 2 * processes)
+
+    def _build(self, min_zoom, executor, max_pending):
+        generated = 0
+        for z in range(self.max_zoom, min_zoom - 1, -1):
+            missing = [(x, y) for x, y in self.level(z) if not os.path.exists(self.tile_path(z, x, y))]
+            if self._is_detailed(z):
+                tasks = ((_render_tile, self._render_task(z, x, y)) for x, y in missing)
+            else:
+                tasks = ((_average_tile, (self._children(z, x, y), self.tile_path(z, x, y), self.tile_size))
+                         for x, y in missing)
+            generated += _run(tasks, executor, max_pending)
+        return generated
+
+    def _faces_per_tile(self, z):
+        return self.tile_size // self.face_size * 2 ** (self.max_zoom - z)
+
+    def _is_detailed(self, z):
+        return z > self.max_zoom - self.detail_levels
+
+    def _children(self, z, x, y):
+        '''
+        Returns the paths of the four tiles below a tile (None where a tile is beyond the grid), in the order
+        top left, top right, bottom left, bottom right.
+        '''
+        return [self.tile_path(z + 1, 2 * x + dx, 2 * y + dy) if self.in_pyramid(z + 1, 2 * x + dx, 2 * y + dy)
+                else None for dy in (0, 1) for dx in (0, 1)]
+
+    def _render_task(self, z, x, y):
+        '''
+        Returns the arguments of `_render_tile` for a tile: the features and grid positions of the faces in
+        the tile, and its extent in grid coordinates (one 2x2 square per face, the first centered on the origin).
+        '''
+        span = self._faces_per_tile(z)
+        rows, cols = np.mgrid[y * span:(y + 1) * span, x * span:(x + 1) * span].reshape(2, -1)
+        index = rows * self.ncols + cols
+        keep = (cols < self.ncols) & (index < len(self.features))
+        offsets = np.column_stack([2.0 * cols[keep], -2.0 * rows[keep]])
+        extent = (2 * x * span - 1, 2 * (x + 1) * span - 1, 1 - 2 * (y + 1) * span, 1 - 2 * y * span)
+        return (self.features[index[keep]], offsets, extent, self.tile_path(z, x, y), self.tile_size, self.dpi)
+
+    def _check_metadata(self, hash_features):
+        '''
+        Records the settings of the pyramid and a hash of its faces in its directory, or checks that an existing
+        pyramid was built with the same settings, so that resuming a build can't mix tiles of different pyramids.
+        Hashing reads every face, so an existing pyramid's hash is only checked if `hash_features` is True.
+        '''
+        metadata = {
+            'count': len(self.features),
+            'ncols': self.ncols,
+            'tile_size': self.tile_size,
+            'face_size': self.face_size,
+            'detail_levels': self.detail_levels,
+            'dpi': self.dpi,
+            'max_zoom': self.max_zoom,
+            'dtype': self.features.dtype.str
+        }
+        path = os.path.join(self.directory, METADATA_FILE)
+        if os.path.exists(path):
+            with open(path) as file:
+                existing = json.load(file)
+            if hash_features:
+                metadata['features_sha256'] = _features_sha256(self.features)
+            changed = sorted(key for key in metadata if existing.get(key) != metadata[key])
+            if changed:
+                raise ValueError(f'{self.directory} holds a pyramid with different {", ".join(changed)}')
+            return
+        metadata['features_sha256'] = _features_sha256(self.features)
+        os.makedirs(self.directory, exist_ok=True)
+        with open(path, 'w') as file:
+            json.dump(metadata, file, indent=2)
+
+def _features_sha256(features):
+    '''
+    Hashes the native bytes of a feature matrix a chunk of rows at a time, so that a memory mapped matrix is
+    never read into memory whole.
+    '''
+    hasher = hashlib.sha256()
+    for start in range(0, len(features), HASH_CHUNKSIZE):
+        hasher.update(np.ascontiguousarray(features[start:start + HASH_CHUNKSIZE]).tobytes())
+    return hasher.hexdigest()
+
+def _run(tasks, executor, max_pending):
+    '''
+    Runs an iterable of (function, args) tasks in an executor (or the calling process, if None), keeping at
+    most `max_pending` in flight so that memory does not grow with the number of tiles. A level is complete when
+    this returns, so the next level can be averaged from it. Returns the number of tasks run.
+    '''
+    if executor is None:
+        return sum(1 for function, args in tasks if function(*args) is not None)
+
+    count = 0
+    pending = deque()
+    for function, args in tasks:
+        pending.append(executor.submit(function, *args))
+        if len(pending) >= max_pending:
+            pending.popleft().result()
+            count += 1
+    for future in pending:
+        future.result()
+        count += 1
+    return count
+
+def _render_tile(features, offsets, extent, path, tile_size, dpi):
+    '''
+    Draws the faces of a tile in full, and writes the tile to `path`.
+    '''
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    from face_batch import FaceBatch
+    from face_collections import plot_faces
+
+    fig = Figure(figsize=(tile_size / dpi, tile_size / dpi), dpi=dpi)
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_axes([0, 0, 1, 1])
+    ax.set_axis_off()
+    if len(features):
+        plot_faces(ax, FaceBatch(features, CFace.feature_ranges), offsets)
+    ax.set_xlim(extent[:2])
+    ax.set_ylim(extent[2:])
+    canvas.draw()
+    return _write_tile(np.asarray(canvas.buffer_rgba()), path)
+
+def _average_tile(children, path, tile_size):
+    '''
+    Averages four child tiles (top left, top right, bottom left, bottom right; None for a blank tile) down to
+    one tile, and writes it to `path`.
+    '''
+    from matplotlib.image import imread
+
+    mosaic = np.full((2 * tile_size, 2 * tile_size, 4), 255, dtype=np.uint16)
+    for i, child in enumerate(children):
+        if child is not None:
+            row, col = divmod(i, 2)
+            mosaic[row * tile_size:(row + 1) * tile_size, col * tile_size:(col + 1) * tile_size] = \
+                np.round(imread(child) * 255)
+    # Summing the four strided quarters is much faster than a mean over reshaped axes
+    image = (mosaic[0::2, 0::2] + mosaic[1::2, 0::2] + mosaic[0::2, 1::2] + mosaic[1::2, 1::2] + 2) // 4
+    return _write_tile(image.astype(np.uint8), path)
+
+def _write_tile(image, path):
+    '''
+    Writes an RGBA image as a PNG, through a temporary file so that an interrupted write never leaves a
+    partial tile behind.
+    '''
+    from matplotlib.image import imsave
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary_path = f'{path}.{os.getpid()}.tmp'
+    imsave(temporary_path, image, format='png', pil_kwargs={'compress_level': PNG_COMPRESS_LEVEL})
+    os.replace(temporary_path, path)
+    return path
@@ -1,4 +1,5 @@
 import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
 import pytest
 
@@ -187,6 +188,83 @@ class TestNormaliseDF:
         prepped_df, feature_map = CFace.normalise_df(df_simple)
         assert list(feature_map.values()) == prepped_df.columns.values.tolist()
 
+    def test_matches_per_value_normalisation(self):
+        df = pd.DataFrame({'A': [3, -1, 7, 2], 'B': [0.5, 0.25, 0.125, 1.0], 'C': [4, 4, 4, 4]})
+        prepped_df, feature_map = CFace.normalise_df(df)
+        for column in df:
+            old_min = df[column].min()
+            old_range = df[column].max() - old_min
+            expected = [CFace._normalise_value(x, old_min, old_range) for x in df[column]]
+            assert prepped_df[column].tolist() == expected
+
+    def test_returns_1_when_column_range_0(self):
+        prepped_df, feature_map = CFace.normalise_df(pd.DataFrame({'A': [2, 2, 2]}))
+        assert prepped_df['A'].tolist() == [1, 1, 1]
+
+    def test_keeps_precision_of_large_integers(self):
+        df = pd.DataFrame({'A': [2**62, 2**62 + 1, 2**62 + 3], 'B': [-2**63, 0, 2**63 - 1]})
+        prepped_df, feature_map = CFace.normalise_df(df)
+        assert prepped_df['A'].tolist() == [0, 1 / 3, 1]
+        assert prepped_df['B'].tolist() == [0, 0.5, 1]
+
+    def test_keeps_dtype_of_constant_integer_columns(self):
+        df = pd.DataFrame({'A': [2, 2, 2], 'B': [1, 2, 3]})
+        for prepped_df, _ in [CFace.normalise_df(df), CFace.normalise_df(df.copy(), inplace=True)]:
+            assert prepped_df['A'].dtype == df['A'].dtype
+            assert prepped_df['A'].tolist() == [1, 1, 1]
+
+    def test_skips_non_numeric_columns(self):
+        df = pd.DataFrame({'A': [1, 2], 'name': ['x', 'y'], 'B': [2, 4]})
+        prepped_df, feature_map = CFace.normalise_df(df)
+        assert prepped_df['name'].tolist() == ['x', 'y']
+        assert feature_map == {'nose_width': 'A', 'nose_length': 'B'}
+
+    def test_quantile_mode(self):
+        df = pd.DataFrame({'A': list(range(999)) + [1e9]})
+        normalised_df, feature_map = CFace.normalise_df(df, mode='quantile')
+        assert feature_map == {'nose_width': 'A'}
+        assert normalised_df['A'].iloc[500] == pytest.approx(0.5, abs=0.05)
+        assert normalised_df['A'].max() == 1
+
+    def test_rank_mode(self):
+        df = pd.DataFrame({'A': [1, 1000, 10, 100]})
+        normalised_df, _ = CFace.normalise_df(df, mode='rank')
+        assert normalised_df['A'].tolist() == pytest.approx([0, 1, 1 / 3, 2 / 3])
+
+    def test_does_not_modify_original(self):
+        df = pd.DataFrame({'A': [1, 2]})
+        CFace.normalise_df(df)
+        assert df['A'].tolist() == [1, 2]
+
+    def test_normalises_in_place(self):
+        df = pd.DataFrame({'A': [1, 3], 'name': ['x', 'y']})
+        normalised_df, _ = CFace.normalise_df(df, inplace=True)
+        assert normalised_df is df
+        assert df['A'].tolist() == [0, 1]
+        assert df['name'].tolist() == ['x', 'y']
+
+    def test_returns_only_mapped_columns(self):
+        df = pd.DataFrame({f'col{i}': [i, i + 1] for i in range(20)} | {'name': ['x', 'y']}, index=[5, 6])
+        normalised_df, feature_map = CFace.normalise_df(df, mapped_only=True)
+        assert list(normalised_df) == [f'col{i}' for i in range(15)]
+        assert list(normalised_df.index) == [5, 6]
+        assert set(feature_map.values()) == set(normalised_df)
+
+    def test_writes_float32(self):
+        df = pd.DataFrame({'A': [1, 2, 3], 'B': [1.0, 5.0, 9.0]})
+        normalised_df, _ = CFace.normalise_df(df, dtype=np.float32)
+        assert (normalised_df.dtypes == np.float32).all()
+        assert normalised_df['B'].tolist() == [0, 0.5, 1]
+
+    @pytest.mark.parametrize('mode', ['minmax', 'quantile', 'rank'])
+    def test_options_match_default_output(self, mode):
+        df = pd.DataFrame(np.random.default_rng(0).normal(size=(100, 20)), columns=[f'col{i}' for i in range(20)])
+        expected, feature_map = CFace.normalise_df(df, mode=mode)
+        mapped, _ = CFace.normalise_df(df, mode=mode, mapped_only=True, dtype=np.float32)
+        in_place, _ = CFace.normalise_df(df.copy(), mode=mode, inplace=True)
+        np.testing.assert_allclose(mapped, expected[list(feature_map.values())], atol=1e-6)
+        pd.testing.assert_frame_equal(in_place, expected)
+
 @pytest.mark.usefixtures('feature_map_numeric_col_names')
 class TestCreateCfaceFromRow:
 
@@ -234,6 +312,20 @@ class TestNormaliseValue:
         normalised_value = CFace._normalise_value(value=-0.5, old_min=-1, old_range=1)
         assert normalised_value == 0.5
 
+class TestNormaliseValues:
+
+    def test_normalises_per_column(self):
+        normalised_values = CFace._normalise_values(np.array([[0, 10], [50, 30]]),
+                                                    old_min=np.array([0, 10]),
+                                                    old_range=np.array([100, 20]))
+        assert normalised_values.tolist() == [[0, 0], [0.5, 1]]
+
+    def test_returns_1_when_range_0(self):
+        normalised_values = CFace._normalise_values(np.array([[0.5, 3]]),
+                                                    old_min=np.array([0, 3]),
+                                                    old_range=np.array([1, 0]))
+        assert normalised_values.tolist() == [[0.5, 1]]
+
 @pytest.mark.usefixtures('feature_map_numeric_col_names')
 class TestGetFeatureFromRow:
 
@@ -257,3 +349,11 @@ class TestGetFeatureFromRow:
                                                        0.11, 0.12, 0.13, 0.14, 0.15]),
                                                        'nose_width',
                                                        {'nose_width': 'non_existent_key'})
+
+class TestCFaceSlots:
+
+    def test_has_no_instance_dict(self):
+        cface = CFace()
+        assert not hasattr(cface, '__dict__')
+        with pytest.raises(AttributeError):
+            cface.other = 1
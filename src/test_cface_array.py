@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cface import CFace
+from cface_array import CFaceArray
+from face_batch import FaceBatch
+
+@pytest.fixture
+def face_count():
+    return 6
+
+class TestCFaceArray:
+
+    def test_stores_contiguous_array(self, features):
+        faces = CFaceArray(features[:, ::-1], dtype=np.float32)
+        assert faces.features.dtype == np.float32
+        assert faces.features.flags['C_CONTIGUOUS']
+        assert len(faces) == 6
+
+    def test_rejects_wrong_shape(self):
+        with pytest.raises(ValueError):
+            CFaceArray(np.zeros((2, 3)))
+
+    def test_reports_every_invalid_row(self, features):
+        features[1, 0] = 1.5
+        features[4, 2] = -0.1
+        features[4, 14] = 2
+        with pytest.raises(ValueError) as error:
+            CFaceArray(features)
+        assert 'row 1 (nose_width=1.5)' in str(error.value)
+        assert 'row 4 (head_width=-0.1, eyebrow_height=2.0)' in str(error.value)
+
+    def test_skips_validation(self):
+        faces = CFaceArray(np.full((1, 15), 2.0), validate=False)
+        assert faces.features[0, 0] == 2
+
+class TestCFaceArrayIndexing:
+
+    def test_integer_index_returns_cface(self, features):
+        cface = CFaceArray(features)[2]
+        assert type(cface) is CFace
+        assert cface.features['nose_width'] == features[2, 0]
+        assert cface.features['eyebrow_height'] == features[2, 14]
+
+    def test_slice_returns_view(self, features):
+        faces = CFaceArray(features)
+        sliced = faces[1:3]
+        assert type(sliced) is CFaceArray
+        assert len(sliced) == 2
+        assert np.shares_memory(sliced.features, faces.features)
+
+    def test_mask_returns_cface_array(self, features):
+        faces = CFaceArray(features)
+        selected = faces[features[:, 0] > 0.5]
+        assert np.array_equal(selected.features, features[features[:, 0] > 0.5])
+
+class TestCFaceArrayConversion:
+
+    def test_round_trips_cfaces(self, features):
+        cfaces = CFaceArray(features).to_cfaces()
+        assert len(cfaces) == 6
+        assert np.array_equal(CFaceArray.from_cfaces(cfaces).features, features)
+
+    def test_from_empty_cfaces(self):
+        assert len(CFaceArray.from_cfaces([])) == 0
+
+    def test_from_df_matches_create_cface_from_row(self):
+        df = pd.DataFrame({'A': [0.1, 0.9], 'B': [0.3, 0.0], 'label': ['x', 'y']})
+        feature_map = {'nose_width': 'A', 'eye_angle': 'B', 'mouth_length': 'A'}
+        faces = CFaceArray.from_df(df, feature_map)
+        for i in range(len(df)):
+            assert faces[i].features == CFace.create_cface_from_row(df.iloc[i], feature_map).features
+
+    def test_from_df_rejects_missing_column(self):
+        with pytest.raises(KeyError):
+            CFaceArray.from_df(pd.DataFrame({'A': [0.1]}), {'nose_width': 'non_existent_key'})
+
+    def test_to_batch(self, features):
+        batch = CFaceArray(features).to_batch()
+        assert type(batch) is FaceBatch
+        assert len(batch) == 6
@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cface import CFace
+from cface_array import CFaceArray
+from face_arrays import column_arrays, face_features, fit_arrays, normalise_array
+from face_normaliser import FaceNormaliser
+
+def memory_mapped(array):
+    while array is not None and not isinstance(array, np.memmap):
+        array = array.base
+    return array is not None
+
+@pytest.fixture
+def matrix():
+    return np.random.default_rng(0).normal(size=(1000, 20))
+
+@pytest.fixture
+def df(matrix):
+    return pd.DataFrame(matrix, columns=list(range(20)))
+
+class TestColumnArrays:
+
+    def test_2d_array_columns_are_views(self, matrix):
+        columns = column_arrays(matrix)
+        assert list(columns) == list(range(20))
+        assert np.shares_memory(columns[3], matrix)
+
+    def test_structured_array_skips_non_numeric_fields(self):
+        data = np.zeros(3, dtype=[('a', 'f4'), ('label', 'U5'), ('b', 'i8')])
+        columns = column_arrays(data)
+        assert list(columns) == ['a', 'b']
+        assert np.shares_memory(columns['a'], data)
+
+    def test_memory_maps_npy_files(self, matrix, tmp_path):
+        np.save(tmp_path / 'features.npy', matrix)
+        columns = column_arrays(str(tmp_path / 'features.npy'))
+        assert memory_mapped(columns[0])
+        assert np.array_equal(columns[0], matrix[:, 0])
+
+    def test_rejects_1d_arrays(self):
+        with pytest.raises(ValueError):
+            column_arrays(np.arange(5))
+
+    def test_arrow_table(self, df):
+        pa = pytest.importorskip('pyarrow')
+        table = pa.table({'a': [1.0, 2.0], 'label': ['x', 'y']})
+        assert list(column_arrays(table)) == ['a']
+
+class TestNormaliseArray:
+
+    @pytest.mark.parametrize('chunksize', [7, 100_000])
+    def test_matches_normalise_df(self, matrix, df, chunksize):
+        expected_df, expected_feature_map = CFace.normalise_df(df)
+        out, feature_map = normalise_array(matrix, chunksize=chunksize)
+        assert np.allclose(out, expected_df.to_numpy())
+        assert feature_map == expected_feature_map
+
+    def test_writes_to_supplied_buffer(self, matrix):
+        out = np.empty((1000, 20), dtype=np.float32)
+        assert normalise_array(matrix, out=out)[0] is out
+        assert out.min() == 0
+        assert out.max() == 1
+
+    def test_rejects_buffer_of_wrong_shape(self, matrix):
+        with pytest.raises(ValueError):
+            normalise_array(matrix, out=np.empty((10, 20)))
+
+    def test_writes_memory_mapped_file(self, matrix, tmp_path):
+        out, _ = normalise_array(matrix, out=str(tmp_path / 'normalised.npy'))
+        assert isinstance(out, np.memmap)
+        out.flush()
+        assert np.array_equal(np.load(tmp_path / 'normalised.npy'), out)
+
+    def test_uses_fitted_normaliser(self, matrix):
+        normaliser = fit_arrays(matrix[:500], normaliser=FaceNormaliser(mode='rank'))
+        assert normaliser.rows_seen == 500
+        out, _ = normalise_array(matrix[500:], normaliser=normaliser)
+        assert out.min() >= 0
+        assert out.max() <= 1
+
+class TestFaceFeatures:
+
+    def test_matches_cface_array_from_df(self, matrix, df):
+        expected = CFaceArray.from_df(*CFace.normalise_df(df))
+        faces = face_features(matrix, chunksize=64)
+        assert np.allclose(faces.features, expected.features)
+
+    def test_unmapped_features_default(self, matrix):
+        faces = face_features(matrix, feature_map={'head_width': 3, 'eye_width': 3})
+        assert np.all(faces.features[:, 0] == 0.5)
+        assert np.array_equal(faces.features[:, 2], faces.features[:, 4])
+
+    @pytest.mark.parametrize('mode', ['minmax', 'quantile', 'rank'])
+    def test_empty_feature_map(self, matrix, mode):
+        normaliser = fit_arrays(matrix, normaliser=FaceNormaliser(mode=mode))
+        faces = face_features(matrix, feature_map={}, normaliser=normaliser)
+        assert np.all(faces.features == 0.5)
+
+    def test_rejects_unknown_column(self, matrix):
+        with pytest.raises(KeyError):
+            face_features(matrix, feature_map={'head_width': 'missing'})
+
+    def test_memory_mapped_input_and_output(self, matrix, tmp_path):
+        np.save(tmp_path / 'features.npy', matrix)
+        faces = face_features(str(tmp_path / 'features.npy'), out=str(tmp_path / 'faces.npy'), dtype=np.float32)
+        assert memory_mapped(faces.features)
+        assert faces.features.dtype == np.float32
+        assert np.load(tmp_path / 'faces.npy').shape == (1000, 15)
@@ -0,0 +1,132 @@
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+from matplotlib.animation import FuncAnimation
+
+from cface import CFace
+from face_artists import FaceArtists
+from face_cache import GeometryCache
+
+class TestFaceArtists:
+
+    def test_draw_returns_handle(self):
+        _, ax = plt.subplots()
+        handle = CFace().draw(ax, 'face')
+        assert isinstance(handle, FaceArtists)
+        assert len(handle.artists) == 9
+        assert ax.get_title(loc='left') == 'face'
+        plt.close()
+
+    def test_plot_returns_axes(self):
+        _, ax = plt.subplots()
+        assert CFace().plot(ax) is ax
+        assert len(ax.patches) == 7
+        assert len(ax.lines) == 2
+        plt.close()
+
+    def test_update_keeps_artists(self):
+        _, ax = plt.subplots()
+        handle = CFace().draw(ax)
+        artists = list(handle.artists)
+        assert handle.update({'head_width': 1}) == artists
+        assert all(artist in ax.patches or artist in ax.lines for artist in artists)
+        assert len(ax.patches) == 7
+        assert len(ax.lines) == 2
+        plt.close()
+
+    def test_update_matches_new_face(self):
+        rng = np.random.default_rng(0)
+        features = dict(zip(CFace.feature_ranges, rng.random(15)))
+        _, (updated_ax, new_ax) = plt.subplots(1, 2)
+        handle = CFace().draw(updated_ax)
+        handle.update(features)
+        CFace(**features).plot(new_ax)
+
+        for updated, new in zip(updated_ax.patches, new_ax.patches):
+            assert np.allclose(updated.get_patch_transform().get_matrix(), new.get_patch_transform().get_matrix())
+        for updated, new in zip(updated_ax.lines, new_ax.lines):
+            assert np.allclose(updated.get_xydata(), new.get_xydata())
+        assert updated_ax.patches[-1].theta2 == pytest.approx(new_ax.patches[-1].theta2)
+        plt.close()
+
+    def test_unchanged_update_does_not_mark_stale(self):
+        fig, ax = plt.subplots()
+        handle = CFace().draw(ax)
+        fig.canvas.draw()
+        handle.update({'head_width': 0.5})
+        assert not any(artist.stale for artist in handle.artists)
+        handle.update({'head_width': 0.6})
+        assert handle.head.stale
+        plt.close()
+
+    def test_update_only_changes_dependent_parts(self):
+        fig, ax = plt.subplots()
+        handle = CFace().draw(ax)
+        fig.canvas.draw()
+        handle.update({'mouth_length': 0.9})
+        assert [artist for artist in handle.artists if artist.stale] == [handle.mouth]
+        fig.canvas.draw()
+        handle.update({'eye_width': 0.9})
+        assert {artist for artist in handle.artists if artist.stale} == {
+            handle.right_eye, handle.left_eye, handle.right_pupil, handle.left_pupil,
+            handle.right_eyebrow, handle.left_eyebrow}
+        plt.close()
+
+    def test_partial_update_keeps_other_features(self):
+        _, ax = plt.subplots()
+        handle = CFace(nose_width=0.2).draw(ax)
+        handle.update({'mouth_length': 0.9})
+        assert handle.features['nose_width'] == 0.2
+        assert handle.features['mouth_length'] == 0.9
+        plt.close()
+
+    def test_update_from_cface(self):
+        _, ax = plt.subplots()
+        handle = CFace().draw(ax)
+        handle.update(CFace(eye_width=0.1))
+        assert handle.features == CFace(eye_width=0.1).features
+        plt.close()
+
+    def test_update_with_cache(self):
+        _, ax = plt.subplots()
+        cache = GeometryCache()
+        handle = CFace().draw(ax, cache=cache)
+        handle.update({'head_width': 1})
+        assert cache.misses == 2
+        plt.close()
+
+    def test_rejects_unknown_feature(self):
+        _, ax = plt.subplots()
+        handle = CFace().draw(ax)
+        with pytest.raises(KeyError):
+            handle.update({'ear_size': 0.5})
+        plt.close()
+
+    def test_rejects_features_out_of_range(self):
+        _, ax = plt.subplots()
+        handle = CFace().draw(ax)
+        with pytest.raises(ValueError):
+            handle.update({'head_width': 1.1})
+        assert handle.features['head_width'] == 0.5
+        plt.close()
+
+    def test_remove(self):
+        _, ax = plt.subplots()
+        CFace().draw(ax).remove()
+        assert len(ax.patches) == 0
+        assert len(ax.lines) == 0
+        plt.close()
+
+    def test_blitted_animation(self):
+        fig, ax = plt.subplots()
+        handle = CFace().draw(ax, animated=True)
+        assert all(artist.get_animated() for artist in handle.artists)
+
+        def animate(frame):
+            return handle.update({'mouth_length': frame / 4})
+
+        animation = FuncAnimation(fig, animate, frames=5, blit=True)
+        for frame in range(5):
+            animation._draw_next_frame(frame, blit=True)
+        assert handle.features['mouth_length'] == 1
+        plt.close()
@@ -0,0 +1,96 @@
+import math
+
+import numpy as np
+import pytest
+
+from cface import CFace
+from face_batch import PART_FEATURES, FaceBatch
+
+class TestFaceBatch:
+
+    def test_rejects_wrong_number_of_features(self):
+        with pytest.raises(ValueError):
+            FaceBatch(np.zeros((3, 14)), CFace.feature_ranges)
+
+    def test_rejects_one_dimensional_features(self):
+        with pytest.raises(ValueError):
+            FaceBatch(np.zeros(15), CFace.feature_ranges)
+
+    def test_has_one_entry_per_face(self, features):
+        batch = FaceBatch(features, CFace.feature_ranges)
+        assert len(batch) == 8
+        assert batch.nose_center.shape == (8, 2)
+        assert batch.right_eyebrow.shape == (8, 2, 2)
+        assert batch.mouth_theta2.shape == (8,)
+
+    def test_accepts_empty_batch(self):
+        batch = FaceBatch(np.zeros((0, 15)), CFace.feature_ranges)
+        assert len(batch) == 0
+        assert batch.left_eyebrow.shape == (0, 2, 2)
+
+    def test_computes_only_requested_parts(self, features):
+        full = FaceBatch(features, CFace.feature_ranges)
+        batch = FaceBatch(features, CFace.feature_ranges, parts=['pupils', 'mouth'])
+        assert np.array_equal(batch.right_pupil_center, full.right_pupil_center)
+        assert np.array_equal(batch.mouth_center, full.mouth_center)
+        assert not hasattr(batch, 'nose_center')
+        assert not hasattr(batch, 'right_eye_center')
+
+    @pytest.mark.parametrize('part', PART_FEATURES)
+    def test_parts_depend_only_on_their_features(self, features, part):
+        changed = features.copy()
+        for i, feature in enumerate(CFace.feature_ranges):
+            if feature not in PART_FEATURES[part]:
+                changed[:, i] = 1 - changed[:, i]
+        batch = FaceBatch(features, CFace.feature_ranges, parts=[part])
+        changed_batch = FaceBatch(changed, CFace.feature_ranges, parts=[part])
+        attributes = [name for name in vars(batch) if name not in ('feature_names', 'scaled', '_eye_center_cache')]
+        assert attributes
+        for name in attributes:
+            assert np.array_equal(getattr(batch, name), getattr(changed_batch, name))
+
+    def test_scales_features_like_scale_feature(self, features):
+        batch = FaceBatch(features, CFace.feature_ranges)
+        for i, (feature, feature_range) in enumerate(CFace.feature_ranges.items()):
+            for row in range(len(features)):
+                assert batch.scaled[row, i] == CFace._scale_feature(features[row, i],
+                                                                    new_min=feature_range['min'],
+                                                                    new_max=feature_range['max'])
+
+    def test_scales_min_and_max(self):
+        batch = FaceBatch(np.array([np.zeros(15), np.ones(15)]), CFace.feature_ranges)
+        assert batch.scaled_feature('eyebrow_angle').tolist() == [-20, 20]
+        assert batch.scaled_feature('mouth_length').tolist() == [10, 100]
+
+class TestFaceBatchGeometry:
+
+    def test_eyes_are_mirrored(self, features):
+        batch = FaceBatch(features, CFace.feature_ranges)
+        assert np.array_equal(batch.left_eye_center[:, 0], -batch.right_eye_center[:, 0])
+        assert np.array_equal(batch.left_eye_angle, -batch.right_eye_angle)
+        assert np.array_equal(batch.left_eyebrow[:, :, 0], -batch.right_eyebrow[:, :, 0])
+
+    def test_pupils_are_centered_on_eyes(self, features):
+        batch = FaceBatch(features, CFace.feature_ranges)
+        assert np.array_equal(batch.right_pupil_center, batch.right_eye_center)
+        assert np.array_equal(batch.left_pupil_center, batch.left_eye_center)
+
+    def test_matches_scalar_geometry(self, features):
+        batch = FaceBatch(features, CFace.feature_ranges)
+        for row in range(len(features)):
+            scaled = dict(zip(CFace.feature_ranges, batch.scaled[row]))
+
+            eyebrow_opp = math.sin(math.radians(scaled['eyebrow_angle'])) * scaled['eyebrow_length']
+            eyebrow_adj = math.cos(math.radians(scaled['eyebrow_angle'])) * scaled['eyebrow_length']
+            eyebrow_spacing = scaled['eye_spacing'] + scaled['eye_width']/2 - scaled['eyebrow_length']/2
+            eyebrow_height = scaled['eye_height'] + scaled['eyebrow_height'] + scaled['eye_width']/2 + 0.05
+            mouth_distance = min(scaled['mouth_height'], scaled['head_length']/2 - scaled['head_length']/6)
+
+            assert batch.nose_center[row].tolist() == [0, scaled['nose_length']/4]
+            assert batch.right_eye_center[row].tolist() == [scaled['eye_spacing'] + scaled['eye_width']/2,
+                                                            scaled['eye_height']]
+            assert np.allclose(batch.right_eyebrow[row],
+                               [[eyebrow_spacing, eyebrow_height],
+                                [eyebrow_spacing + eyebrow_adj, eyebrow_height + eyebrow_opp]])
+            assert batch.mouth_center[row].tolist() == [0, -mouth_distance + 0.01]
+            assert batch.mouth_angle[row] == -90 - scaled['mouth_length']/2
@@ -0,0 +1,70 @@
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+
+from cface import CFace
+from face_batch import FaceBatch
+from face_cache import GeometryCache
+
+class TestGeometryCache:
+
+    def test_rejects_invalid_maxsize(self):
+        with pytest.raises(ValueError):
+            GeometryCache(maxsize=0)
+
+    def test_rejects_invalid_resolution(self):
+        with pytest.raises(ValueError):
+            GeometryCache(resolution=0)
+
+    def test_counts_hits_and_misses(self):
+        cache = GeometryCache()
+        first = cache.get(np.full(15, 0.5))
+        second = cache.get(np.full(15, 0.5))
+        assert first is second
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_nearby_features_share_entry(self):
+        cache = GeometryCache(resolution=0.01)
+        first = cache.get(np.full(15, 0.5))
+        second = cache.get(np.full(15, 0.501))
+        assert first is second
+        assert len(cache) == 1
+
+    def test_distinct_features_without_quantization(self):
+        cache = GeometryCache(resolution=None)
+        cache.get(np.full(15, 0.5))
+        cache.get(np.full(15, 0.501))
+        assert len(cache) == 2
+
+    def test_computes_geometry_from_quantized_features(self):
+        cache = GeometryCache(resolution=0.1)
+        geometry = cache.get(np.full(15, 0.52))
+        expected = FaceBatch(np.full((1, 15), 0.5), CFace.feature_ranges)
+        assert np.allclose(geometry.scaled, expected.scaled)
+
+    def test_evicts_least_recently_used(self):
+        cache = GeometryCache(maxsize=2)
+        cache.get(np.full(15, 0.1))
+        cache.get(np.full(15, 0.2))
+        cache.get(np.full(15, 0.1))
+        cache.get(np.full(15, 0.3))
+        assert cache.evictions == 1
+        assert cache.quantize(np.full(15, 0.2)) not in cache._entries
+        assert cache.quantize(np.full(15, 0.1)) in cache._entries
+
+    def test_clear_resets_counters(self):
+        cache = GeometryCache()
+        cache.get(np.full(15, 0.5))
+        cache.clear()
+        assert cache.stats() == {'hits': 0, 'misses': 0, 'evictions': 0, 'size': 0, 'maxsize': 1024}
+
+class TestCFacePlotWithCache:
+
+    def test_uses_cache(self):
+        cache = GeometryCache()
+        fig, axes = plt.subplots(1, 2)
+        CFace().plot(axes[0], cache=cache)
+        CFace().plot(axes[1], cache=cache)
+        assert (cache.hits, cache.misses) == (1, 1)
+        assert axes[0].patches[0].get_width() == axes[1].patches[0].get_width()
+        plt.close(fig)
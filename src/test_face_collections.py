@@ -0,0 +1,139 @@
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+
+from cface import CFace
+from face_batch import FaceBatch
+from cface_array import CFaceArray
+from face_collections import (cface_scatter, face_parts, face_paths, grid_offsets, mouth_arcs, plot_face_grid,
+                              plot_faces, select_parts)
+
+def make_batch(count):
+    return FaceBatch(np.random.default_rng(0).random((count, 15)), CFace.feature_ranges)
+
+class TestPlotFaces:
+
+    @pytest.mark.parametrize('count', [1, 10, 1000])
+    def test_number_of_artists_independent_of_faces(self, count):
+        fig, ax = plt.subplots()
+        plot_faces(ax, make_batch(count), grid_offsets(count, 10))
+        assert len(ax.collections) == 6
+        assert len(ax.patches) == 0
+        assert len(ax.lines) == 0
+        plt.close(fig)
+
+    def test_offsets_faces(self):
+        fig, ax = plt.subplots()
+        batch = make_batch(2)
+        collections = plot_faces(ax, batch, [[10, 20], [-5, 3]])
+        assert np.allclose(collections['heads'].get_offsets(), [[10, 20], [-5, 3]])
+        assert np.allclose(collections['noses'].get_offsets(), batch.nose_center + [[10, 20], [-5, 3]])
+        assert np.allclose(collections['eyebrows'].get_segments()[0], batch.right_eyebrow[0] + [10, 20])
+        plt.close(fig)
+
+    def test_draws_both_eyes_and_pupils(self):
+        fig, ax = plt.subplots()
+        collections = plot_faces(ax, make_batch(3), grid_offsets(3, 3))
+        assert len(collections['eyes'].get_offsets()) == 6
+        assert len(collections['pupils'].get_offsets()) == 6
+        assert len(collections['eyebrows'].get_segments()) == 6
+        assert len(collections['mouths'].get_segments()) == 3
+        plt.close(fig)
+
+class TestFaceParts:
+
+    def test_one_entry_per_face(self):
+        parts = face_parts(make_batch(5), grid_offsets(5, 5))
+        for geometry in parts.values():
+            for values in geometry.values():
+                assert len(values) == 5
+
+    def test_select_parts(self):
+        batch = make_batch(5)
+        parts = face_parts(batch, grid_offsets(5, 5))
+        selected = select_parts(parts, np.array([False, True, False, True, False]))
+        assert np.allclose(selected['heads']['centers'], [[2, 0], [6, 0]])
+        assert np.allclose(selected['eyebrows']['segments'][0, 1], batch.left_eyebrow[1] + [2, 0])
+
+class TestCFaceScatter:
+
+    def test_number_of_artists_independent_of_faces(self):
+        fig, ax = plt.subplots()
+        features = np.random.default_rng(0).random((500, 15))
+        collections = cface_scatter(ax, np.arange(500), np.arange(500), features)
+        assert sorted(collections) == ['eyebrows', 'outlines', 'pupils']
+        assert len(ax.collections) == 3
+        assert len(ax.patches) == 0
+        assert len(collections['outlines'].get_paths()) == 500
+        plt.close(fig)
+
+    def test_places_faces_at_data_coordinates(self):
+        fig, ax = plt.subplots()
+        collections = cface_scatter(ax, [10, 20], [-5, 3], CFaceArray(np.full((2, 15), 0.5)))
+        assert np.allclose(collections['outlines'].get_offsets(), [[10, -5], [20, 3]])
+        assert ax.get_xlim()[0] <= 10 and ax.get_xlim()[1] >= 20
+        assert ax.get_ylim()[0] <= -5 and ax.get_ylim()[1] >= 3
+        plt.close(fig)
+
+    def test_faces_sized_in_points(self):
+        fig, ax = plt.subplots(dpi=100)
+        collections = cface_scatter(ax, [0], [0], np.ones((1, 15)), size=72)
+        fig.canvas.draw()
+        extent = collections['outlines'].get_paths()[0].transformed(collections['outlines'].get_transform())
+        # Widest head is 2 face units, ie. the full 72 points (one inch, 100 pixels) across
+        assert np.ptp(extent.vertices[:, 0]) == pytest.approx(100)
+        plt.close(fig)
+
+    def test_per_face_sizes(self):
+        fig, ax = plt.subplots()
+        collections = cface_scatter(ax, [0, 1], [0, 1], np.ones((2, 15)), size=[10, 20])
+        first, second = collections['outlines'].get_paths()
+        assert np.allclose(2 * first.vertices, second.vertices)
+        plt.close(fig)
+
+    def test_rejects_mismatched_positions(self):
+        fig, ax = plt.subplots()
+        with pytest.raises(ValueError):
+            cface_scatter(ax, [0, 1], [0, 1], np.ones((3, 15)))
+        plt.close(fig)
+
+class TestFacePaths:
+
+    def test_shared_codes(self):
+        paths = face_paths(make_batch(3))
+        for vertices, codes in paths.values():
+            assert vertices.shape[:2] == (3, len(codes))
+
+class TestPlotFaceGrid:
+
+    def test_sets_axis_limits(self):
+        fig, ax = plt.subplots()
+        ax = plot_face_grid(ax, make_batch(7), ncols=3)
+        assert ax.get_xlim() == (-1.0, 5.0)
+        assert ax.get_ylim() == (-5.0, 1.0)
+        plt.close(fig)
+
+    def test_ticks_removed(self):
+        fig, ax = plt.subplots()
+        ax = plot_face_grid(ax, make_batch(4))
+        assert ax.get_xticks().size == 0
+        assert ax.get_yticks().size == 0
+        plt.close(fig)
+
+class TestGridOffsets:
+
+    def test_fills_rows_left_to_right(self):
+        assert grid_offsets(5, 2).tolist() == [[0, 0], [2, 0], [0, -2], [2, -2], [0, -4]]
+
+class TestMouthArcs:
+
+    def test_arc_endpoints_match_theta(self):
+        batch = make_batch(4)
+        arcs = mouth_arcs(batch)
+        radius = batch.mouth_width / 2
+        start_angle = np.radians(batch.mouth_angle + batch.mouth_theta1)
+        end_angle = np.radians(batch.mouth_angle + batch.mouth_theta2)
+        assert np.allclose(arcs[:, 0], batch.mouth_center + np.column_stack([radius * np.cos(start_angle),
+                                                                             radius * np.sin(start_angle)]))
+        assert np.allclose(arcs[:, -1], batch.mouth_center + np.column_stack([radius * np.cos(end_angle),
+                                                                              radius * np.sin(end_angle)]))
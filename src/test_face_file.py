@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cface import CFace
+from cface_array import CFaceArray
+from face_file import FaceFile
+from face_normaliser import FaceNormaliser
+from face_render import render_pages
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(size=(50, 15)), columns=[f'col{i}' for i in range(15)])
+    df['name'] = [f'row {i}' for i in range(50)]
+    return df
+
+@pytest.fixture
+def face_file(df):
+    normaliser = FaceNormaliser()
+    normalised_df = normaliser.fit_transform(df)
+    faces = CFaceArray.from_df(normalised_df, normaliser.feature_map)
+    return FaceFile(faces, labels=df['name'], feature_map=normaliser.feature_map, normaliser=normaliser)
+
+class TestFaceFile:
+
+    def test_rejects_wrong_number_of_labels(self):
+        with pytest.raises(ValueError):
+            FaceFile(np.full((3, 15), 0.5), labels=['a', 'b'])
+
+    @pytest.mark.parametrize('mmap', [True, False])
+    def test_round_trips(self, face_file, df, tmp_path, mmap):
+        face_file.save(tmp_path / 'faces.cfaces')
+        loaded = FaceFile.load(tmp_path / 'faces.cfaces', mmap=mmap)
+        assert np.array_equal(loaded.faces.features, face_file.faces.features)
+        assert loaded.labels.tolist() == df['name'].tolist()
+        assert loaded.feature_map == face_file.feature_map
+        pd.testing.assert_frame_equal(loaded.normaliser.transform(df), face_file.normaliser.transform(df))
+
+    def test_memory_maps_aligned_arrays(self, face_file, tmp_path):
+        face_file.save(tmp_path / 'faces.cfaces')
+        loaded = FaceFile.load(tmp_path / 'faces.cfaces')
+        assert isinstance(loaded.faces.features.base, np.memmap)
+        assert isinstance(loaded.labels.base, np.memmap)
+        assert loaded.faces.features.base.offset % 64 == 0
+        assert loaded.labels.base.offset % 64 == 0
+
+    def test_saves_in_chunks(self, face_file, tmp_path, monkeypatch):
+        monkeypatch.setattr('face_file.WRITE_CHUNKSIZE', 1000)
+        face_file.save(tmp_path / 'faces.cfaces')
+        # Resaving memory mapped faces writes them a chunk at a time, never reading them in whole
+        FaceFile.load(tmp_path / 'faces.cfaces').save(tmp_path / 'resaved.cfaces')
+        loaded = FaceFile.load(tmp_path / 'resaved.cfaces')
+        assert np.array_equal(loaded.faces.features, face_file.faces.features)
+        assert loaded.labels.tolist() == face_file.labels.tolist()
+
+    def test_keeps_dtype(self, tmp_path):
+        FaceFile(CFaceArray(np.full((4, 15), 0.25), dtype=np.float32)).save(tmp_path / 'faces.cfaces')
+        loaded = FaceFile.load(tmp_path / 'faces.cfaces')
+        assert loaded.faces.features.dtype == np.float32
+        assert loaded.labels is None
+        assert loaded.normaliser is None
+
+    def test_numeric_labels(self, tmp_path):
+        FaceFile(np.full((3, 15), 0.5), labels=[10, 20, 30]).save(tmp_path / 'faces.cfaces')
+        assert FaceFile.load(tmp_path / 'faces.cfaces').labels.tolist() == [10, 20, 30]
+
+    def test_empty(self, tmp_path):
+        FaceFile(np.empty((0, 15)), labels=[]).save(tmp_path / 'faces.cfaces')
+        loaded = FaceFile.load(tmp_path / 'faces.cfaces')
+        assert len(loaded.faces) == 0
+
+    def test_rejects_other_files(self, tmp_path):
+        (tmp_path / 'data.csv').write_text('a,b\n1,2\n')
+        with pytest.raises(ValueError):
+            FaceFile.load(tmp_path / 'data.csv')
+
+    def test_loaded_faces_render(self, face_file, tmp_path):
+        face_file.save(tmp_path / 'faces.cfaces')
+        loaded = FaceFile.load(tmp_path / 'faces.cfaces')
+        assert isinstance(loaded.faces[0], CFace)
+        paths = render_pages(loaded.faces[:4], tmp_path / 'pages', nrows=2, ncols=2, names=loaded.labels[:4],
+                             processes=1, figsize=(2, 2), dpi=20)
+        assert len(paths) == 1
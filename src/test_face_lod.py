@@ -0,0 +1,85 @@
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+
+from cface import CFace
+from face_batch import FaceBatch
+from face_collections import grid_offsets
+from face_lod import FaceLOD
+
+def make_lod(count, ncols=10, **kwargs):
+    fig, ax = plt.subplots(figsize=(4, 4), dpi=100)
+    nrows = int(np.ceil(count / ncols))
+    ax.set_xlim(-1, 2 * ncols - 1)
+    ax.set_ylim(-2 * nrows + 1, 1)
+    batch = FaceBatch(np.random.default_rng(0).random((count, 15)), CFace.feature_ranges)
+    return fig, ax, FaceLOD(ax, batch, grid_offsets(count, ncols), **kwargs)
+
+class TestFaceLOD:
+
+    def test_full_detail_when_zoomed_in(self):
+        fig, ax, lod = make_lod(4, ncols=2)
+        assert lod.level == 'faces'
+        assert sorted(lod.collections) == ['eyebrows', 'eyes', 'heads', 'mouths', 'noses', 'pupils']
+        assert len(ax.collections) == 6
+        plt.close(fig)
+
+    def test_outlines_when_small(self):
+        fig, ax, lod = make_lod(400, ncols=20)
+        assert lod.level == 'outlines'
+        assert list(lod.collections) == ['heads']
+        assert len(lod.collections['heads'].get_offsets()) == 400
+        plt.close(fig)
+
+    def test_dots_when_tiny(self):
+        fig, ax, lod = make_lod(10_000, ncols=100)
+        assert lod.level == 'dots'
+        assert len(ax.collections) == 1
+        assert len(lod.collections['dots'].get_offsets()) == 10_000
+        plt.close(fig)
+
+    def test_zooming_changes_level(self):
+        fig, ax, lod = make_lod(400, ncols=20)
+        ax.set_xlim(-1, 3)
+        ax.set_ylim(-3, 1)
+        assert lod.level == 'faces'
+        assert lod.visible.sum() == 4
+        assert len(lod.collections['heads'].get_offsets()) == 4
+        assert len(ax.collections) == 6
+        plt.close(fig)
+
+    def test_skips_faces_outside_view(self):
+        fig, ax, lod = make_lod(400, ncols=20)
+        ax.set_xlim(100, 200)
+        assert lod.visible.sum() == 0
+        assert len(lod.collections['heads'].get_offsets()) == 0
+        plt.close(fig)
+
+    def test_keeps_collections_when_view_unchanged(self):
+        fig, ax, lod = make_lod(400, ncols=20)
+        collections = lod.collections
+        ax.set_xlim(-1, 39)
+        assert lod.update() is collections
+        plt.close(fig)
+
+    def test_thresholds(self):
+        fig, ax, lod = make_lod(4, ncols=2, dot_size=1000, detail_size=2000)
+        assert lod.level == 'dots'
+        plt.close(fig)
+
+    def test_remove(self):
+        fig, ax, lod = make_lod(4, ncols=2)
+        lod.remove()
+        assert len(ax.collections) == 0
+        ax.set_xlim(-100, 100)
+        assert lod.level is None
+        plt.close(fig)
+
+    def test_draws(self):
+        fig, ax, lod = make_lod(100)
+        fig.canvas.draw()
+        ax.set_xlim(-1, 3)
+        ax.set_ylim(-3, 1)
+        fig.canvas.draw()
+        assert lod.level == 'faces'
+        plt.close(fig)
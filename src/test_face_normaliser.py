@@ -0,0 +1,193 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cface import CFace
+from face_normaliser import FaceNormaliser
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({'A': [1, 5, 3], 'label': ['x', 'y', 'z'], 'B': [0.5, -0.5, 0.0]})
+
+class TestFaceNormaliser:
+
+    def test_fit_transform_matches_normalise_df(self, df):
+        normaliser = FaceNormaliser()
+        expected_df, expected_feature_map = CFace.normalise_df(df)
+        pd.testing.assert_frame_equal(normaliser.fit_transform(df), expected_df)
+        assert normaliser.feature_map == expected_feature_map
+
+    def test_rejects_transform_before_fit(self, df):
+        with pytest.raises(ValueError):
+            FaceNormaliser().transform(df)
+
+    def test_transforms_new_rows_with_fitted_ranges(self, df):
+        normaliser = FaceNormaliser().fit(df)
+        normalised_df = normaliser.transform(pd.DataFrame({'A': [2], 'label': ['w'], 'B': [0.25]}))
+        assert normalised_df['A'].tolist() == [0.25]
+        assert normalised_df['B'].tolist() == [0.75]
+
+    def test_clips_values_outside_fitted_range(self, df):
+        normaliser = FaceNormaliser().fit(df)
+        new_rows = pd.DataFrame({'A': [0, 9], 'label': ['v', 'w'], 'B': [0, 0]})
+        assert normaliser.transform(new_rows)['A'].tolist() == [0, 1]
+        normaliser.clip = False
+        assert normaliser.transform(new_rows)['A'].tolist() == [-0.25, 2]
+
+    def test_fit_discards_previous_fit(self, df):
+        normaliser = FaceNormaliser().fit(df)
+        normaliser.fit(pd.DataFrame({'C': [1, 2]}))
+        assert normaliser.columns == ['C']
+        assert normaliser.rows_seen == 2
+
+class TestFaceNormaliserPartialFit:
+
+    def test_partial_fit_matches_fit(self, df):
+        normaliser = FaceNormaliser()
+        for start in range(len(df)):
+            normaliser.partial_fit(df.iloc[start:start+1])
+        fitted = FaceNormaliser().fit(df)
+        assert normaliser.data_min.tolist() == fitted.data_min.tolist()
+        assert normaliser.data_max.tolist() == fitted.data_max.tolist()
+        assert normaliser.rows_seen == 3
+
+    def test_partial_fit_extends_range(self, df):
+        normaliser = FaceNormaliser().fit(df)
+        normaliser.partial_fit(pd.DataFrame({'A': [9], 'label': ['w'], 'B': [0.0]}))
+        assert normaliser.data_max.tolist() == [9, 0.5]
+
+    def test_drops_columns_that_become_non_numeric(self, df):
+        normaliser = FaceNormaliser().fit(df)
+        normaliser.partial_fit(pd.DataFrame({'A': ['a'], 'label': ['w'], 'B': [0.0]}))
+        assert normaliser.columns == ['B']
+        assert normaliser.feature_map == {'nose_width': 'B'}
+
+class TestFaceNormaliserPersistence:
+
+    def test_round_trips_through_file(self, df, tmp_path):
+        normaliser = FaceNormaliser().fit(df)
+        normaliser.feature_map['mouth_length'] = 'A'
+        normaliser.save(str(tmp_path / 'normaliser.json'))
+
+        loaded = FaceNormaliser.load(str(tmp_path / 'normaliser.json'))
+        assert loaded.get_state() == normaliser.get_state()
+        pd.testing.assert_frame_equal(loaded.transform(df), normaliser.transform(df))
+
+    def test_round_trips_unfitted(self):
+        state = FaceNormaliser().get_state()
+        assert FaceNormaliser.from_state(state).get_state() == state
+
+class TestMatrixValues:
+
+    def test_partial_fit_values_matches_partial_fit(self, df):
+        expected = FaceNormaliser().fit(df)
+        normaliser = FaceNormaliser().partial_fit_values(df[['A', 'B']].to_numpy(), ['A', 'B'])
+        assert normaliser.columns == expected.columns
+        assert np.array_equal(normaliser.data_min, expected.data_min)
+        assert normaliser.feature_map == expected.feature_map
+
+    def test_partial_fit_values_reorders_columns(self, df):
+        normaliser = FaceNormaliser().fit(df)
+        normaliser.partial_fit_values(np.array([[-1.0, 10.0]]), ['B', 'A'])
+        assert normaliser.data_max.tolist() == [10, 0.5]
+        assert normaliser.data_min.tolist() == [1, -1]
+
+    def test_transform_values_writes_to_out(self, df):
+        normaliser = FaceNormaliser().fit(df)
+        values = df[['A', 'B']].to_numpy(dtype=np.float64)
+        out = np.empty_like(values)
+        assert normaliser.transform_values(values, out=out) is out
+        assert np.array_equal(out, normaliser.transform(df)[['A', 'B']].to_numpy())
+
+    def test_transform_values_subset_of_columns(self, df):
+        normaliser = FaceNormaliser().fit(df)
+        normalised = normaliser.transform_values(df[['B']].to_numpy(), columns=['B'])
+        assert normalised[:, 0].tolist() == [1, 0, 0.5]
+
+@pytest.fixture
+def df_outlier():
+    values = np.arange(1000, dtype=np.float64)
+    values[-1] = 1e9
+    return pd.DataFrame({'A': values, 'label': 'x', 'B': np.linspace(-1, 1, 1000)})
+
+class TestRobustModes:
+
+    def test_rejects_unknown_mode(self):
+        with pytest.raises(ValueError):
+            FaceNormaliser(mode='zscore')
+
+    def test_rejects_invalid_quantiles(self):
+        with pytest.raises(ValueError):
+            FaceNormaliser(mode='quantile', quantiles=(0.9, 0.1))
+
+    def test_minmax_squashes_outlier_column(self, df_outlier):
+        normalised = FaceNormaliser().fit_transform(df_outlier)
+        assert normalised['A'].iloc[:-1].max() < 0.001
+
+    def test_quantile_mode_spreads_outlier_column(self, df_outlier):
+        normalised = FaceNormaliser(mode='quantile').fit_transform(df_outlier)
+        assert normalised['A'].iloc[500] == pytest.approx(0.5, abs=0.02)
+        assert normalised['A'].min() == 0
+        assert normalised['A'].max() == 1
+
+    def test_quantile_mode_computes_quantiles_once_per_transform(self, monkeypatch):
+        df = pd.DataFrame(np.random.default_rng(0).normal(size=(100, 50)))
+        normaliser = FaceNormaliser(mode='quantile').fit(df)
+        calls = []
+        data_range = normaliser.data_range
+        monkeypatch.setattr(normaliser, 'data_range', lambda: calls.append(1) or data_range())
+        normaliser.transform(df)
+        assert len(calls) == 1
+
+    def test_transform_values_rejects_unfitted_columns(self, df_outlier):
+        normaliser = FaceNormaliser(mode='quantile').fit(df_outlier)
+        with pytest.raises(ValueError):
+            normaliser.transform_values(np.zeros((2, 1)), columns=['missing'])
+
+    def test_rank_mode(self, df_outlier):
+        normalised = FaceNormaliser(mode='rank').fit_transform(df_outlier)
+        assert np.allclose(normalised['A'], np.linspace(0, 1, 1000), atol=0.02)
+        assert normalised['A'].iloc[0] == 0
+        assert normalised['A'].iloc[-1] == 1
+
+    def test_keeps_feature_map(self, df_outlier):
+        normaliser = FaceNormaliser(mode='rank').fit(df_outlier)
+        assert normaliser.feature_map == CFace.normalise_df(df_outlier)[1]
+
+    def test_partial_fit_matches_fit(self, df_outlier):
+        fitted = FaceNormaliser(mode='quantile').fit(df_outlier)
+        partial = FaceNormaliser(mode='quantile')
+        for start in range(0, 1000, 100):
+            partial.partial_fit(df_outlier.iloc[start:start + 100])
+        assert np.allclose(partial.transform(df_outlier)[['A', 'B']], fitted.transform(df_outlier)[['A', 'B']],
+                           atol=0.02)
+
+    def test_merge(self, df_outlier):
+        first = FaceNormaliser(mode='rank').fit(df_outlier.iloc[:500])
+        second = FaceNormaliser(mode='rank').fit(df_outlier.iloc[500:])
+        merged = first.merge(second)
+        assert merged.rows_seen == 1000
+        assert merged.sketches[0].count == 1000
+        assert np.allclose(merged.transform(df_outlier)['A'], np.linspace(0, 1, 1000), atol=0.02)
+
+    def test_merge_into_unfitted(self, df_outlier):
+        fitted = FaceNormaliser(mode='rank').fit(df_outlier)
+        merged = FaceNormaliser(mode='rank').merge(fitted)
+        assert merged.columns == fitted.columns
+        assert merged.sketches[0] is not fitted.sketches[0]
+
+    def test_merge_drops_columns_missing_from_either(self, df_outlier):
+        first = FaceNormaliser().fit(df_outlier)
+        second = FaceNormaliser().fit(df_outlier[['B']])
+        assert first.merge(second).columns == ['B']
+
+    def test_rejects_merging_different_modes(self, df_outlier):
+        with pytest.raises(ValueError):
+            FaceNormaliser().fit(df_outlier).merge(FaceNormaliser(mode='rank').fit(df_outlier))
+
+    def test_round_trips_through_file(self, df_outlier, tmp_path):
+        normaliser = FaceNormaliser(mode='quantile', quantiles=(0.05, 0.95)).fit(df_outlier)
+        normaliser.save(tmp_path / 'normaliser.json')
+        loaded = FaceNormaliser.load(tmp_path / 'normaliser.json')
+        assert loaded.quantiles == (0.05, 0.95)
+        pd.testing.assert_frame_equal(loaded.transform(df_outlier), normaliser.transform(df_outlier))
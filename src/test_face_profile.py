@@ -0,0 +1,88 @@
+import gc
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import matplotlib.pyplot as plt
+import pandas as pd
+
+from cface import CFace
+from face_profile import profile, stage
+
+class TestProfile:
+
+    def test_records_pipeline_stages(self):
+        fig, ax = plt.subplots()
+        with profile() as profiler:
+            df_faces, feature_map = CFace.normalise_df(pd.DataFrame({'A': [1, 2], 'B': [3, 5]}))
+            cface = CFace.create_cface_from_row(df_faces.iloc[0], feature_map)
+            cface.plot(ax)
+        plt.close(fig)
+
+        assert profiler.stats['normalise_df']['calls'] == 1
+        assert profiler.stats['create_cface_from_row']['calls'] == 1
+        assert profiler.stats['plot.geometry']['calls'] == 1
+        assert profiler.stats['plot.add_artist']['calls'] == 9
+        assert all(stats['time'] >= 0 for stats in profiler.stats.values())
+
+    def test_records_nothing_when_inactive(self):
+        with profile() as profiler:
+            pass
+        CFace.normalise_df(pd.DataFrame({'A': [1, 2]}))
+        assert profiler.stats == {}
+
+    def test_calls_callback(self):
+        calls = []
+        with profile(callback=lambda *args: calls.append(args), trace_memory=False):
+            CFace.normalise_df(pd.DataFrame({'A': [1, 2]}))
+        assert [call[0] for call in calls] == ['normalise_df']
+        assert calls[0][2] == 0
+
+    def test_records_memory(self):
+        gc.collect()
+        with profile() as profiler:
+            with stage('allocate'):
+                data = bytearray(1_000_000)
+        assert profiler.stats['allocate']['memory'] >= 1_000_000
+        del data
+
+    def test_records_stages_from_threads(self):
+        def run_stages(_):
+            for _ in range(100):
+                with stage('threaded'):
+                    pass
+
+        with profile(trace_memory=False) as profiler:
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                list(executor.map(run_stages, range(8)))
+        assert profiler.stats['threaded']['calls'] == 800
+
+    def test_stops_tracemalloc_it_started(self):
+        assert not tracemalloc.is_tracing()
+        with profile():
+            assert tracemalloc.is_tracing()
+        assert not tracemalloc.is_tracing()
+
+    def test_keeps_tracing_until_last_profiler_exits(self):
+        first, second = profile(), profile()
+        first.__enter__()
+        second.__enter__()
+        # Exited out of order, eg. by profilers in different threads
+        first.__exit__(None, None, None)
+        assert tracemalloc.is_tracing()
+        with stage('allocate'):
+            data = bytearray(1_000_000)
+        second.__exit__(None, None, None)
+        assert not tracemalloc.is_tracing()
+        assert second.stats['allocate']['memory'] >= 1_000_000
+        del data
+
+    def test_report_lists_stages(self):
+        with profile() as profiler:
+            with stage('example'):
+                pass
+        assert 'example' in profiler.report()
+
+class TestStage:
+
+    def test_shared_no_op_when_inactive(self):
+        assert stage('a') is stage('b')
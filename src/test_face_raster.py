@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from cface import CFace
+from cface_array import CFaceArray
+from face_raster import rasterize
+
+@pytest.fixture
+def face_count():
+    return 6
+
+def render_with_plot(features, size, dpi=100):
+    fig = Figure(figsize=(size / dpi, size / dpi), dpi=dpi)
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_axes([0, 0, 1, 1])
+    CFace(**dict(zip(CFace.feature_ranges, features))).plot(ax)
+    ax.set_axis_off()
+    canvas.draw()
+    return np.asarray(canvas.buffer_rgba())[:, :, 0]
+
+class TestRasterize:
+
+    def test_returns_uint8_thumbnails(self, features):
+        images = rasterize(CFaceArray(features), size=16)
+        assert images.shape == (6, 16, 16)
+        assert images.dtype == np.uint8
+
+    def test_rasterizes_empty_batch(self):
+        assert rasterize(np.zeros((0, 15)), size=8).shape == (0, 8, 8)
+
+    def test_rasterizes_in_chunks(self, features):
+        assert np.array_equal(rasterize(features, size=16, chunksize=4), rasterize(features, size=16))
+
+    def test_background_is_white(self, features):
+        images = rasterize(features, size=32)
+        assert (images[:, 0, 0] == 255).all()
+
+    @pytest.mark.parametrize('size', [32, 64])
+    def test_close_to_plot(self, features, size):
+        images = rasterize(features, size=size)
+        for image, row in zip(images, features):
+            expected = render_with_plot(row, size)
+            assert np.abs(image.astype(int) - expected.astype(int)).mean() < 6
@@ -0,0 +1,118 @@
+import io
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+from matplotlib.image import imread
+
+from cface import CFace
+from cface_array import CFaceArray
+from face_render import render_page, render_pages, render_pdf, render_png, render_rgba
+
+@pytest.fixture
+def face_count():
+    return 7
+
+@pytest.fixture
+def faces(features):
+    return CFaceArray(features)
+
+class TestRenderPage:
+
+    def test_writes_png(self, faces, tmp_path):
+        path = render_page(faces.features, str(tmp_path / 'page.png'), nrows=2, ncols=4, figsize=(4, 2))
+        with open(path, 'rb') as png:
+            assert png.read(8) == b'\x89PNG\r\n\x1a\n'
+
+    def test_rejects_wrong_number_of_names(self, faces, tmp_path):
+        with pytest.raises(ValueError, match='one name per face'):
+            render_page(faces.features, str(tmp_path / 'page.png'), nrows=2, ncols=4, names=['a', 'b'])
+
+class TestRenderPages:
+
+    def test_writes_one_file_per_page(self, faces, tmp_path):
+        paths = render_pages(faces, str(tmp_path), nrows=1, ncols=3, processes=1, figsize=(3, 1))
+        assert paths == [str(tmp_path / f'faces_{page}.png') for page in range(3)]
+        assert all(os.path.exists(path) for path in paths)
+
+    def test_accepts_feature_matrix(self, faces, tmp_path):
+        paths = render_pages(faces.features, str(tmp_path), nrows=2, ncols=2, processes=1, figsize=(2, 2))
+        assert len(paths) == 2
+
+    def test_writes_nothing_for_no_faces(self, tmp_path):
+        assert render_pages(np.zeros((0, 15)), str(tmp_path), processes=1) == []
+
+    def test_rejects_wrong_number_of_names(self, faces, tmp_path):
+        with pytest.raises(ValueError, match='one name per face'):
+            render_pages(faces, str(tmp_path), nrows=2, ncols=2, names=['a'] * 8, processes=1)
+        assert not os.listdir(tmp_path)
+
+    def test_parallel_output_identical_to_serial(self, faces, tmp_path):
+        serial = render_pages(faces, str(tmp_path / 'serial'), nrows=2, ncols=2, processes=1, figsize=(2, 2))
+        parallel = render_pages(faces, str(tmp_path / 'parallel'), nrows=2, ncols=2, processes=2, figsize=(2, 2))
+        for serial_path, parallel_path in zip(serial, parallel):
+            with open(serial_path, 'rb') as serial_png, open(parallel_path, 'rb') as parallel_png:
+                assert serial_png.read() == parallel_png.read()
+
+class TestRenderPdf:
+
+    def test_writes_one_pdf_page_per_page(self, faces, tmp_path):
+        path = render_pdf(faces, str(tmp_path / 'faces.pdf'), nrows=1, ncols=3, figsize=(3, 1))
+        with open(path, 'rb') as pdf:
+            content = pdf.read()
+        assert content.startswith(b'%PDF')
+        assert len(re.findall(rb'/Type /Page\b', content)) == 3
+
+    def test_writes_nothing_for_no_faces(self, tmp_path):
+        assert render_pdf(np.zeros((0, 15)), str(tmp_path / 'faces.pdf')) is None
+        assert not os.path.exists(tmp_path / 'faces.pdf')
+
+    def test_reused_pages_match_fresh_pages(self, faces, tmp_path):
+        # The second page is drawn by updating the faces of the first, and should match a fresh page
+        reused = render_pdf(faces.features[:4], str(tmp_path / 'reused.pdf'), nrows=1, ncols=2, names=list('abcd'),
+                            figsize=(2, 1), metadata={'CreationDate': None})
+        fresh = render_pdf(faces.features[2:4], str(tmp_path / 'fresh.pdf'), nrows=1, ncols=2, names=list('cd'),
+                           figsize=(2, 1), metadata={'CreationDate': None})
+        with open(reused, 'rb') as reused_pdf, open(fresh, 'rb') as fresh_pdf:
+            reused_streams = re.findall(rb'stream\n(.*?)\nendstream', reused_pdf.read(), re.S)
+            fresh_streams = re.findall(rb'stream\n(.*?)\nendstream', fresh_pdf.read(), re.S)
+        assert fresh_streams[0] in reused_streams[1:]
+
+class TestRenderFace:
+
+    def test_renders_rgba(self, faces):
+        image = render_rgba(faces.features[0], size=50, dpi=50)
+        assert image.shape == (50, 50, 4)
+        assert image.dtype == np.uint8
+        assert image.min() < 128
+
+    def test_accepts_cface_and_dict(self, faces):
+        features = dict(zip(CFace.feature_ranges, faces.features[0].tolist()))
+        expected = render_png(faces.features[0], 'a')
+        assert render_png(CFace(**features), 'a') == expected
+        assert render_png(features, 'a') == expected
+
+    def test_rejects_wrong_number_of_features(self):
+        with pytest.raises(ValueError):
+            render_png([0.5] * 14)
+
+    def test_png_matches_rgba(self, faces):
+        png = imread(io.BytesIO(render_png(faces.features[1], 'b', size=80)))
+        assert np.array_equal(np.round(png * 255).astype(np.uint8), render_rgba(faces.features[1], 'b', size=80))
+
+    def test_threaded_rendering_is_deterministic(self):
+        features = np.random.default_rng(1).random((24, 15))
+        names = [f'face {i}' for i in range(len(features))]
+        expected_png = [render_png(row, name, size=100) for row, name in zip(features, names)]
+        expected_rgba = [render_rgba(row, name, size=100) for row, name in zip(features, names)]
+
+        # Each face several times over, interleaved, so that threads draw different faces concurrently
+        tasks = [i for _ in range(4) for i in range(len(features))]
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            pngs = list(executor.map(lambda i: render_png(features[i], names[i], size=100), tasks))
+            rgbas = list(executor.map(lambda i: render_rgba(features[i], names[i], size=100), tasks))
+        for i, png, rgba in zip(tasks, pngs, rgbas):
+            assert png == expected_png[i]
+            assert np.array_equal(rgba, expected_rgba[i])
@@ -0,0 +1,169 @@
+import asyncio
+import http.client
+import json
+import os
+import signal
+import socket
+import threading
+
+import pytest
+
+from cface import CFace
+from face_server import FaceServer, parse_request
+
+def serve(processes):
+    '''
+    Starts a server on an event loop in a thread, yields it, and closes it.
+    '''
+    server = FaceServer(port=0, processes=processes, cache_size=4)
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    asyncio.run_coroutine_threadsafe(server.start(), loop).result(timeout=60)
+    server.loop = loop
+    yield server
+    asyncio.run_coroutine_threadsafe(server.close(), loop).result(timeout=60)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+
+@pytest.fixture(scope='module')
+def server():
+    yield from serve(processes=1)
+
+@pytest.fixture
+def pool_server():
+    yield from serve(processes=2)
+
+def request(server, method, path, body=None):
+    connection = http.client.HTTPConnection('127.0.0.1', server.port, timeout=60)
+    try:
+        connection.request(method, path, body=None if body is None else json.dumps(body))
+        response = connection.getresponse()
+        return response, response.read()
+    finally:
+        connection.close()
+
+def raw_request(server, data):
+    '''
+    Sends raw bytes to the server and returns everything it sends back before closing the connection.
+    '''
+    with socket.create_connection(('127.0.0.1', server.port), timeout=60) as connection:
+        connection.sendall(data)
+        chunks = []
+        while chunk := connection.recv(65536):
+            chunks.append(chunk)
+    return b''.join(chunks)
+
+class TestParseRequest:
+
+    def test_features_list(self):
+        features, name, image_format, size, dpi = parse_request({'features': [0.1] * 15, 'name': 1})
+        assert features == [0.1] * 15
+        assert (name, image_format, size, dpi) == ('1', 'png', 200, 100)
+
+    def test_features_dict_defaults(self):
+        features, *_ = parse_request({'features': {'nose_width': 1}})
+        assert features == [1.0] + [0.5] * 14
+
+    def test_row_and_feature_map(self):
+        features, *_ = parse_request({'row': {'a': 0.25}, 'feature_map': {'head_width': 'a'}})
+        assert features[list(CFace.feature_ranges).index('head_width')] == 0.25
+
+    @pytest.mark.parametrize('request_', [
+        {},
+        {'features': [0.5] * 14},
+        {'features': {'ears': 0.5}},
+        {'features': [2.0] * 15},
+        {'features': [0.5] * 15, 'format': 'gif'},
+        {'features': [0.5] * 15, 'size': 0},
+    ])
+    def test_rejects_invalid_requests(self, request_):
+        with pytest.raises(ValueError):
+            parse_request(request_)
+
+class TestFaceServer:
+
+    def test_renders_png(self, server):
+        response, body = request(server, 'POST', '/render', {'features': [0.5] * 15, 'name': 'png'})
+        assert response.status == 200
+        assert response.getheader('Content-Type') == 'image/png'
+        assert body.startswith(b'\x89PNG')
+
+    def test_renders_svg(self, server):
+        response, body = request(server, 'GET', '/render?features=' + ','.join(['0.2'] * 15) + '&format=svg')
+        assert response.status == 200
+        assert response.getheader('Content-Type') == 'image/svg+xml'
+        assert b'<svg' in body
+
+    def test_caches_responses(self, server):
+        payload = {'features': [0.3] * 15, 'name': 'cached'}
+        first, first_body = request(server, 'POST', '/render', payload)
+        second, second_body = request(server, 'POST', '/render', payload)
+        assert first.getheader('X-Cache') == 'miss'
+        assert second.getheader('X-Cache') == 'hit'
+        assert first.getheader('ETag') == second.getheader('ETag')
+        assert first_body == second_body
+
+    def test_evicts_least_recently_used(self, server):
+        for i in range(server.cache_size + 1):
+            request(server, 'POST', '/render', {'features': [i / 10] * 15, 'name': 'evict'})
+        response, _ = request(server, 'POST', '/render', {'features': [0.0] * 15, 'name': 'evict'})
+        assert response.getheader('X-Cache') == 'miss'
+        assert len(server.cache) == server.cache_size
+
+    def test_concurrent_identical_requests_render_once(self, server):
+        misses, hits = server.misses, server.hits
+
+        async def render_many():
+            return await asyncio.gather(*[server.render([0.7] * 15, 'concurrent') for _ in range(8)])
+
+        results = asyncio.run_coroutine_threadsafe(render_many(), server.loop).result(timeout=60)
+        assert len({body for _, body, _ in results}) == 1
+        assert [hit for _, _, hit in results].count(False) == 1
+        assert (server.misses - misses, server.hits - hits) == (1, 7)
+
+    def test_keeps_connection_alive(self, server):
+        connection = http.client.HTTPConnection('127.0.0.1', server.port, timeout=60)
+        try:
+            for _ in range(3):
+                connection.request('POST', '/render', body=json.dumps({'features': [0.5] * 15}))
+                response = connection.getresponse()
+                response.read()
+                assert response.status == 200
+        finally:
+            connection.close()
+
+    def test_stats(self, server):
+        response, body = request(server, 'GET', '/stats')
+        assert response.status == 200
+        assert set(json.loads(body)) == {'hits', 'misses', 'evictions', 'size', 'restarts'}
+
+    @pytest.mark.parametrize('head, body, status', [
+        (b'POST /render HTTP/1.1', json.dumps({'features': [0.5] * 3}).encode(), 400),
+        (b'POST /render HTTP/1.1', json.dumps([0.5] * 15).encode(), 400),
+        (b'GET /faces HTTP/1.1', b'', 404),
+        (b'DELETE /render HTTP/1.1', b'', 405),
+        (b'POST /render HTTP/1.1\r\nContent-Length: abc', b'', 400),
+        (b'POST /render HTTP/1.1\r\nContent-Length: -5', b'', 400),
+        (b'GARBAGE', b'', 400),
+    ])
+    def test_errors(self, server, head, body, status):
+        if body:
+            head += b'\r\nContent-Length: ' + str(len(body)).encode()
+        response = raw_request(server, head + b'\r\nConnection: close\r\n\r\n' + body)
+        status_line, _, content = response.partition(b'\r\n\r\n')
+        assert status_line.split(b' ')[1] == str(status).encode()
+        assert 'error' in json.loads(content)
+
+class TestWorkerPool:
+
+    def test_every_worker_warmed_up_before_listening(self, pool_server):
+        assert len(pool_server._executor._processes) == 2
+
+    def test_restarts_workers_after_one_dies(self, pool_server):
+        for pid in list(pool_server._executor._processes):
+            os.kill(pid, signal.SIGKILL)
+        statuses = [request(pool_server, 'POST', '/render', {'features': [i / 10] * 15})[0].status for i in range(3)]
+        assert statuses[-1] == 200
+        assert set(statuses) <= {200, 500}
+        assert pool_server.restarts == 1
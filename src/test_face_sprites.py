@@ -0,0 +1,65 @@
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from cface import CFace
+from cface_array import CFaceArray
+from face_sprites import build_sprite_atlas, compose_sprite_grid, plot_face_sprites, quantize_features
+
+@pytest.fixture
+def face_count():
+    return 12
+
+def render_with_plot(features, size):
+    fig = Figure(figsize=(size / 100, size / 100), dpi=100)
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_axes([0, 0, 1, 1])
+    CFace(**dict(zip(CFace.feature_ranges, features))).plot(ax)
+    ax.set_axis_off()
+    canvas.draw()
+    return np.asarray(canvas.buffer_rgba())
+
+class TestQuantizeFeatures:
+
+    def test_quantizes_to_levels(self):
+        assert quantize_features([[0, 0.2, 0.5, 0.9, 1]], levels=3).tolist() == [[0, 0, 1, 2, 2]]
+
+    def test_rejects_too_few_levels(self):
+        with pytest.raises(ValueError):
+            quantize_features([[0.5]], levels=1)
+
+class TestBuildSpriteAtlas:
+
+    def test_renders_each_distinct_face_once(self, features):
+        atlas, inverse = build_sprite_atlas(np.concatenate([features, features]), levels=4, sprite_size=8)
+        assert len(atlas) == len(np.unique(quantize_features(features, 4), axis=0))
+        assert atlas.shape[1:] == (8, 8, 4)
+        assert np.array_equal(inverse[:12], inverse[12:])
+
+    def test_sprite_looks_like_plot(self, features):
+        atlas, inverse = build_sprite_atlas(features[:1], levels=5, sprite_size=64)
+        expected = render_with_plot(quantize_features(features[0], 5) / 4, 64)
+        assert np.abs(atlas[0].astype(int) - expected.astype(int)).mean() < 2
+
+class TestComposeSpriteGrid:
+
+    def test_places_sprites_in_grid(self):
+        atlas = np.arange(3).reshape(3, 1, 1, 1) * np.ones((3, 2, 2, 4), dtype=np.uint8)
+        image = compose_sprite_grid(atlas, np.array([2, 0, 1]), ncols=2)
+        assert image.shape == (4, 4, 4)
+        assert image[0, 0, 0] == 2
+        assert image[0, 2, 0] == 0
+        assert image[2, 0, 0] == 1
+        assert image[2, 2, 0] == 255
+
+class TestPlotFaceSprites:
+
+    def test_draws_single_image(self, features):
+        fig, ax = plt.subplots()
+        image = plot_face_sprites(ax, CFaceArray(features), ncols=4, sprite_size=8)
+        assert len(ax.get_images()) == 1
+        assert image.get_array().shape == (24, 32, 4)
+        assert image.get_extent() == [-1, 7, -5, 1]
+        plt.close(fig)
@@ -0,0 +1,97 @@
+import io
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cface import CFace
+from cface_array import CFaceArray
+from face_render import render_pages
+from face_stream import normalise_csv, render_csv, scan_csv, stream_faces
+
+@pytest.fixture
+def csv_path(tmp_path):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({'A': rng.integers(-50, 50, 23),
+                       'label': [f'row{i}' for i in range(23)],
+                       'B': rng.normal(size=23),
+                       'C': np.full(23, 7)})
+    path = tmp_path / 'data.csv'
+    df.to_csv(path, index=False)
+    return str(path)
+
+class TestScanCSV:
+
+    def test_computes_column_ranges(self, csv_path):
+        df = pd.read_csv(csv_path)
+        normaliser = scan_csv(csv_path, chunksize=5)
+        assert normaliser.columns == ['A', 'B', 'C']
+        assert normaliser.data_min.tolist() == df[normaliser.columns].min().tolist()
+        assert normaliser.data_max.tolist() == df[normaliser.columns].max().tolist()
+        assert normaliser.rows_seen == 23
+
+    def test_drops_columns_not_numeric_in_every_chunk(self, tmp_path):
+        path = tmp_path / 'mixed.csv'
+        path.write_text('A,B\n1,2\n2,3\n3,x\n')
+        normaliser = scan_csv(str(path), chunksize=2)
+        assert normaliser.columns == ['A']
+        assert normaliser.data_min.tolist() == [1]
+
+class TestNormaliseCSV:
+
+    @pytest.mark.parametrize('chunksize', [1, 4, 100])
+    def test_matches_normalise_df(self, csv_path, chunksize):
+        expected_df, expected_feature_map = CFace.normalise_df(pd.read_csv(csv_path))
+        chunks, feature_map = normalise_csv(csv_path, chunksize=chunksize)
+        pd.testing.assert_frame_equal(pd.concat(chunks), expected_df, check_dtype=False)
+        assert feature_map == expected_feature_map
+
+    def test_rereads_file_objects(self, csv_path):
+        expected_df, _ = CFace.normalise_df(pd.read_csv(csv_path))
+        with open(csv_path) as file:
+            chunks, _ = normalise_csv(io.StringIO(file.read()), chunksize=4)
+        pd.testing.assert_frame_equal(pd.concat(chunks), expected_df, check_dtype=False)
+
+    def test_rejects_unseekable_files(self, csv_path):
+        read_fd, write_fd = os.pipe()
+        with open(csv_path, 'rb') as file, os.fdopen(write_fd, 'wb') as pipe:
+            pipe.write(file.read())
+        with os.fdopen(read_fd) as pipe:
+            with pytest.raises(ValueError, match='seekable'):
+                normalise_csv(pipe)
+
+class TestStreamFaces:
+
+    def test_yields_one_cface_array_per_chunk(self, csv_path):
+        faces = list(stream_faces(csv_path, chunksize=10))
+        assert [len(chunk) for chunk in faces] == [10, 10, 3]
+        assert all(type(chunk) is CFaceArray for chunk in faces)
+
+class TestRenderCSV:
+
+    def test_matches_rendering_in_memory(self, csv_path, tmp_path):
+        df_faces, feature_map = CFace.normalise_df(pd.read_csv(csv_path))
+        expected = render_pages(CFaceArray.from_df(df_faces, feature_map), str(tmp_path / 'memory'),
+                                nrows=2, ncols=3, processes=1, figsize=(3, 2))
+        paths = render_csv(csv_path, str(tmp_path / 'stream'), nrows=2, ncols=3, chunksize=4,
+                           processes=1, figsize=(3, 2))
+        assert [os.path.basename(path) for path in paths] == [os.path.basename(path) for path in expected]
+        for path, expected_path in zip(paths, expected):
+            with open(path, 'rb') as png, open(expected_path, 'rb') as expected_png:
+                assert png.read() == expected_png.read()
+
+    def test_uses_supplied_normaliser(self, csv_path, tmp_path):
+        normaliser = scan_csv(csv_path)
+        expected = render_csv(csv_path, str(tmp_path / 'scanned'), nrows=3, ncols=3, processes=1, figsize=(3, 3))
+        paths = render_csv(csv_path, str(tmp_path / 'supplied'), nrows=3, ncols=3, normaliser=normaliser,
+                           processes=1, figsize=(3, 3))
+        for path, expected_path in zip(paths, expected):
+            with open(path, 'rb') as png, open(expected_path, 'rb') as expected_png:
+                assert png.read() == expected_png.read()
+
+    def test_usecols_with_supplied_normaliser(self, csv_path, tmp_path):
+        normaliser = scan_csv(csv_path, usecols=['A', 'B'])
+        paths = render_csv(csv_path, str(tmp_path), nrows=3, ncols=3, normaliser=normaliser, processes=1,
+                           read_csv_kwargs={'usecols': ['A', 'B']}, figsize=(3, 3))
+        assert len(paths) == 3
@@ -0,0 +1,85 @@
+import io
+import re
+import xml.etree.ElementTree as ElementTree
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+
+from cface import CFace
+from cface_array import CFaceArray
+from face_svg import write_svg
+
+SVG = '{http://www.w3.org/2000/svg}'
+
+@pytest.fixture
+def face_count():
+    return 5
+
+def parse_svg(features, **kwargs):
+    return ElementTree.fromstring(write_svg(io.StringIO(), features, **kwargs).getvalue())
+
+def plot_artists(features):
+    fig, ax = plt.subplots()
+    CFace(**dict(zip(CFace.feature_ranges, features))).plot(ax)
+    plt.close(fig)
+    return ax
+
+def floats(text):
+    return [float(value) for value in re.findall(r'-?[\d.]+(?:e-?\d+)?', text)]
+
+class TestWriteSVG:
+
+    def test_writes_one_group_per_face(self, features):
+        svg = parse_svg(CFaceArray(features), ncols=2, face_size=50)
+        assert svg.get('width') == '100'
+        assert svg.get('height') == '150'
+        assert len(svg.findall(f'{SVG}g/{SVG}g')) == 5
+
+    def test_places_faces_in_grid(self, features):
+        svg = parse_svg(features, ncols=2, face_size=50)
+        transforms = [face.get('transform') for face in svg.findall(f'{SVG}g/{SVG}g')]
+        assert transforms[0] == 'translate(25 25) scale(25 -25)'
+        assert transforms[3] == 'translate(75 75) scale(25 -25)'
+
+    def test_writes_in_chunks(self, features):
+        chunked = write_svg(io.StringIO(), features, chunksize=2).getvalue()
+        assert chunked == write_svg(io.StringIO(), features).getvalue()
+
+    def test_writes_empty_document(self):
+        svg = parse_svg(np.zeros((0, 15)))
+        assert len(svg.findall(f'{SVG}g/{SVG}g')) == 0
+
+class TestSVGGeometryMatchesPlot:
+
+    @pytest.mark.parametrize('row', range(5))
+    def test_matches_plot(self, features, row):
+        face = parse_svg(features[row:row+1]).find(f'{SVG}g/{SVG}g')
+        ax = plot_artists(features[row])
+        nose, head, right_eye, left_eye, right_pupil, left_pupil, mouth = ax.patches
+        left_eyebrow, right_eyebrow = ax.lines
+
+        ellipses = face.findall(f'{SVG}ellipse')
+        for element, patch in zip(ellipses, [nose, head, right_eye, left_eye]):
+            assert float(element.get('cx')) == pytest.approx(patch.center[0], abs=1e-5)
+            assert float(element.get('cy')) == pytest.approx(patch.center[1], abs=1e-5)
+            assert float(element.get('rx')) == pytest.approx(patch.width / 2, abs=1e-5)
+            assert float(element.get('ry')) == pytest.approx(patch.height / 2, abs=1e-5)
+            assert floats(element.get('transform'))[0] == pytest.approx(patch.angle, abs=1e-3)
+
+        circles = face.findall(f'{SVG}circle')
+        for element, patch in zip(circles, [right_pupil, left_pupil]):
+            assert float(element.get('cx')) == pytest.approx(patch.center[0], abs=1e-5)
+            assert float(element.get('r')) == pytest.approx(patch.radius, abs=1e-5)
+
+        lines = face.findall(f'{SVG}line')
+        for element, line in zip(lines, [right_eyebrow, left_eyebrow]):
+            assert [float(element.get(name)) for name in ['x1', 'x2']] == pytest.approx(line.get_xdata(), abs=1e-5)
+            assert [float(element.get(name)) for name in ['y1', 'y2']] == pytest.approx(line.get_ydata(), abs=1e-5)
+
+        # The path starts and ends at the ends of the mouth arc
+        vertices = mouth.get_patch_transform().transform(mouth.get_path().vertices)
+        start_x, start_y, rx, ry, angle, _, _, end_x, end_y = floats(face.find(f'{SVG}path').get('d'))
+        assert [start_x, start_y] == pytest.approx(vertices[0], abs=1e-4)
+        assert [end_x, end_y] == pytest.approx(vertices[-1], abs=1e-4)
+        assert [rx, ry, angle] == pytest.approx([mouth.width / 2, mouth.height / 2, mouth.angle], abs=1e-3)
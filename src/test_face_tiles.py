@@ -0,0 +1,99 @@
+import os
+
+import numpy as np
+import pytest
+from matplotlib.image import imread
+
+from face_tiles import FaceTiles
+
+@pytest.fixture
+def face_count():
+    return 50
+
+def tile_files(directory):
+    return sorted(os.path.relpath(os.path.join(root, name), directory)
+                  for root, _, names in os.walk(directory) for name in names if name.endswith('.png'))
+
+class TestFaceTiles:
+
+    def test_rejects_face_size_not_dividing_tile_size(self, features, tmp_path):
+        with pytest.raises(ValueError):
+            FaceTiles(features, str(tmp_path), tile_size=256, face_size=48)
+
+    def test_levels_cover_grid(self, features, tmp_path):
+        tiles = FaceTiles(features, str(tmp_path), tile_size=64, face_size=16)
+        # 50 faces in an 8x7 grid, 4x4 faces per tile at the highest level
+        assert (tiles.ncols, tiles.nrows, tiles.max_zoom) == (8, 7, 1)
+        assert tiles.level(2) == []
+        assert tiles.level(1) == [(0, 0), (1, 0), (0, 1), (1, 1)]
+        assert tiles.level(0) == [(0, 0)]
+        assert not tiles.in_pyramid(1, 2, 0)
+        assert tiles.tile(1, 2, 0) is None
+
+    def test_builds_every_tile(self, features, tmp_path):
+        tiles = FaceTiles(features, str(tmp_path), tile_size=64, face_size=16, detail_levels=1)
+        assert tiles.build(processes=1) == 4 + 1
+        assert tile_files(str(tmp_path)) == sorted(os.path.join(str(z), str(x), f'{y}.png')
+                                                   for z in (0, 1) for x, y in tiles.level(z))
+        assert imread(tiles.tile_path(1, 0, 0)).shape == (64, 64, 4)
+
+    def test_resumes_build(self, features, tmp_path):
+        tiles = FaceTiles(features, str(tmp_path), tile_size=64, face_size=16, detail_levels=1)
+        tiles.build(processes=1)
+        os.remove(tiles.tile_path(1, 1, 1))
+        os.remove(tiles.tile_path(0, 0, 0))
+        assert FaceTiles(features, str(tmp_path), tile_size=64, face_size=16, detail_levels=1).build(processes=1) == 2
+        assert tiles.build(processes=1) == 0
+
+    def test_rejects_resuming_different_pyramid(self, features, tmp_path):
+        FaceTiles(features, str(tmp_path), tile_size=64, face_size=16)
+        with pytest.raises(ValueError, match='features_sha256'):
+            FaceTiles(features[::-1], str(tmp_path), tile_size=64, face_size=16).build(processes=1)
+        with pytest.raises(ValueError, match='face_size'):
+            FaceTiles(features, str(tmp_path), tile_size=64, face_size=8)
+        with pytest.raises(ValueError, match='dtype'):
+            FaceTiles(features.astype(np.float32), str(tmp_path), tile_size=64, face_size=16)
+
+    def test_opening_pyramid_does_not_hash_faces(self, features, tmp_path, monkeypatch):
+        FaceTiles(features, str(tmp_path), tile_size=64, face_size=16)
+        monkeypatch.setattr('face_tiles._features_sha256', lambda features: pytest.fail('hashed the faces'))
+        assert FaceTiles(features, str(tmp_path), tile_size=64, face_size=16).tile(0, 0, 0)
+
+    def test_resumes_memory_mapped_features(self, features, tmp_path):
+        np.save(tmp_path / 'faces.npy', features.astype(np.float32))
+        mapped = np.load(tmp_path / 'faces.npy', mmap_mode='r')
+        FaceTiles(mapped, str(tmp_path / 'tiles'), tile_size=64, face_size=16).build(processes=1)
+        assert FaceTiles(mapped, str(tmp_path / 'tiles'), tile_size=64, face_size=16).build(processes=1) == 0
+
+    def test_generates_tiles_lazily(self, features, tmp_path):
+        tiles = FaceTiles(features, str(tmp_path), tile_size=64, face_size=16, detail_levels=1)
+        tiles.tile(1, 1, 0)
+        assert tile_files(str(tmp_path)) == [os.path.join('1', '1', '0.png')]
+        tiles.tile(0, 0, 0)
+        assert len(tile_files(str(tmp_path))) == 5
+
+    def test_averages_lower_levels(self, features, tmp_path):
+        tiles = FaceTiles(features, str(tmp_path), tile_size=64, face_size=16, detail_levels=1)
+        children = np.full((128, 128, 4), 1.0, dtype=np.float32)
+        for x, y in tiles.level(1):
+            children[y * 64:(y + 1) * 64, x * 64:(x + 1) * 64] = imread(tiles.tile(1, x, y))
+        parent = imread(tiles.tile(0, 0, 0))
+        expected = children.reshape(64, 2, 64, 2, 4).mean(axis=(1, 3))
+        np.testing.assert_allclose(parent, expected, atol=1 / 255)
+
+    def test_draws_detail_levels_in_full(self, features, tmp_path):
+        tiles = FaceTiles(features, str(tmp_path), tile_size=64, face_size=16, detail_levels=2)
+        top = imread(tiles.tile(0, 0, 0))
+        assert top.min() < 0.5
+        assert not os.path.exists(tiles.tile_path(1, 0, 0))
+
+    def test_parallel_build_identical_to_serial(self, features, tmp_path):
+        serial = FaceTiles(features, str(tmp_path / 'serial'), tile_size=64, face_size=16, detail_levels=1)
+        parallel = FaceTiles(features, str(tmp_path / 'parallel'), tile_size=64, face_size=16, detail_levels=1)
+        serial.build(processes=1)
+        parallel.build(processes=2)
+        for z in (0, 1):
+            for x, y in serial.level(z):
+                with open(serial.tile_path(z, x, y), 'rb') as serial_png:
+                    with open(parallel.tile_path(z, x, y), 'rb') as parallel_png:
+                        assert serial_png.read() == parallel_png.read()
@@ -0,0 +1,21 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+SRC = os.path.dirname(os.path.abspath(__file__))
+
+def loaded_modules(module):
+    code = f'import sys, {module}; print(" ".join(sorted(sys.modules)))'
+    output = subprocess.run([sys.executable, '-c', code], cwd=SRC, check=True, capture_output=True, text=True).stdout
+    return set(output.split())
+
+class TestImports:
+
+    @pytest.mark.parametrize('module', ['cface', 'face_batch', 'cface_array', 'face_cache', 'face_raster',
+                                        'quantile_sketch'])
+    def test_does_not_import_matplotlib_or_pandas(self, module):
+        modules = loaded_modules(module)
+        assert 'matplotlib' not in modules
+        assert 'pandas' not in modules
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from quantile_sketch import QuantileSketch
+
+@pytest.fixture
+def values():
+    return np.random.default_rng(0).standard_cauchy(100_000)
+
+def rank_error(sketch, values, q):
+    return np.abs(np.searchsorted(np.sort(values), sketch.quantile(q)) / len(values) - q).max()
+
+class TestQuantileSketch:
+
+    def test_rejects_invalid_k(self):
+        with pytest.raises(ValueError):
+            QuantileSketch(k=1)
+
+    def test_exact_while_small(self):
+        sketch = QuantileSketch().update([3, 1, 2])
+        assert sketch.quantile(0) == 1
+        assert sketch.quantile(0.5) == 2
+        assert sketch.quantile(1) == 3
+
+    def test_bounded_memory(self, values):
+        sketch = QuantileSketch(k=100)
+        for chunk in np.array_split(values, 20):
+            sketch.update(chunk)
+        assert sketch.count == len(values)
+        assert len(sketch) < 3 * 100 + 2 * len(sketch.levels)
+
+    def test_bounded_bytes_after_large_update(self):
+        sketch = QuantileSketch(k=100).update(np.random.default_rng(0).random(1_000_000))
+        retained = sum(level.nbytes + (0 if level.base is None else level.base.nbytes) for level in sketch.levels)
+        assert retained < 2 * 8 * (3 * 100 + 2 * len(sketch.levels))
+
+    @pytest.mark.parametrize('k', [50, 200])
+    def test_accuracy(self, values, k):
+        sketch = QuantileSketch(k=k).update(values)
+        assert rank_error(sketch, values, np.linspace(0.01, 0.99, 99)) < 1.7 / k
+
+    def test_merge_matches_single_sketch_accuracy(self, values):
+        sketches = [QuantileSketch(seed=i).update(chunk) for i, chunk in enumerate(np.array_split(values, 4))]
+        merged = sketches[0]
+        for sketch in sketches[1:]:
+            merged.merge(sketch)
+        assert merged.count == len(values)
+        assert rank_error(merged, values, np.linspace(0.01, 0.99, 99)) < 1.7 / 200
+
+    def test_rank_is_inverse_of_quantile(self, values):
+        sketch = QuantileSketch().update(values)
+        q = np.linspace(0, 1, 11)
+        assert np.allclose(sketch.rank(sketch.quantile(q)), q)
+
+    def test_rank_clips_outside_range(self):
+        sketch = QuantileSketch().update([1, 2, 3])
+        assert sketch.rank([0, 4]).tolist() == [0, 1]
+
+    def test_constant_values_rank_1(self):
+        assert QuantileSketch().update([5, 5, 5]).rank(5) == 1
+
+    def test_ignores_nan(self):
+        sketch = QuantileSketch().update([1, np.nan, 3])
+        assert sketch.count == 2
+        assert np.isnan(sketch.rank(np.nan))
+
+    def test_empty(self):
+        assert np.isnan(QuantileSketch().quantile(0.5))
+
+    def test_round_trips_state(self, values):
+        sketch = QuantileSketch().update(values)
+        restored = QuantileSketch.from_state(sketch.get_state())
+        assert restored.count == sketch.count
+        assert restored.quantile(0.3) == sketch.quantile(0.3)